@@ -0,0 +1,45 @@
+"""
+性能测试公共工具：在无 Windows API 的环境下加载 src.core 中的单个模块
+"""
+
+import os
+import sys
+import types
+import importlib
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def install_fake_module(name, module):
+    """用假实现替换依赖模块（必须在加载被测模块之前调用）"""
+    sys.modules[name] = module
+
+
+def isolate_config():
+    """将配置文件目录指向临时目录，避免读写用户的真实配置"""
+    from src.utils import config
+    config_dir = tempfile.mkdtemp(prefix='custom_settings_bench_')
+    config.CONFIG_DIR = config_dir
+    config.CONFIG_FILE = os.path.join(config_dir, 'config.json')
+    return config
+
+
+def load_core_module(name):
+    """加载 src.core 下的单个模块，跳过 src/core/__init__.py 中对其他平台相关模块的导入"""
+    if 'src.core' not in sys.modules:
+        package = types.ModuleType('src.core')
+        package.__path__ = [os.path.join(ROOT_DIR, 'src', 'core')]
+        sys.modules['src.core'] = package
+    return importlib.import_module(f'src.core.{name}')
+
+
+def percentile(values, pct):
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
@@ -0,0 +1,86 @@
+"""
+屏幕截取后端吞吐测试
+
+对不同大小的区域（100x100 到 4K）报告每个截取后端的每秒截取次数、每次复制的字节数，
+以及把截取结果转换为 PIL 图像的耗时。
+    - synthetic：内存中的合成屏幕，任意平台可用，衡量裁剪与复制本身的开销
+    - generic：PIL.ImageGrab，需要图形界面
+    - gdi：BitBlt + GetDIBits，仅 Windows
+
+用法:
+    python benchmarks/bench_capture_backend.py
+    python benchmarks/bench_capture_backend.py --backends synthetic,gdi --duration 2
+"""
+
+import sys
+import time
+import logging
+import argparse
+
+from _harness import install_fake_module, load_core_module
+from fake_screen import make_win32clipboard
+
+install_fake_module('win32clipboard', make_win32clipboard())
+
+screenshot = load_core_module('screenshot')
+
+# 测试的区域大小
+REGION_SIZES = [(100, 100), (640, 480), (1920, 1080), (3840, 2160)]
+
+BACKENDS = {
+    'synthetic': lambda: screenshot.SyntheticCaptureBackend(3840, 2160),
+    'generic': screenshot.GenericCaptureBackend,
+    'gdi': screenshot.GDICaptureBackend
+}
+
+
+def measure(backend, width, height, duration):
+    """在 duration 秒内反复截取，返回 (每秒截取次数, 每次复制字节数, 转换图像耗时ms)"""
+    left, top = backend.virtual_screen()[:2]
+    capture = backend.capture(left, top, width, height)  # 预热
+    start_bytes = backend.stats['bytes']
+    start_count = backend.stats['captures']
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        capture = backend.capture(left, top, width, height)
+    elapsed = time.perf_counter() - start
+    count = backend.stats['captures'] - start_count
+
+    convert_start = time.perf_counter()
+    capture.to_image()
+    convert_ms = (time.perf_counter() - convert_start) * 1e3
+    return count / elapsed, (backend.stats['bytes'] - start_bytes) / count, convert_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='屏幕截取后端吞吐测试')
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help=f"测试的后端，逗号分隔，可选: {', '.join(BACKENDS)}")
+    parser.add_argument('--duration', type=float, default=1.0, help='每种区域大小的测试时长（秒）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    print(f"{'后端':<10}\t{'区域':>10}\t{'截取/秒':>10}\t{'复制(MB/次)':>12}\t{'吞吐(MB/s)':>10}\t{'转图像(ms)':>10}")
+    for name in args.backends.split(','):
+        name = name.strip()
+        if name not in BACKENDS:
+            print(f"未知的后端: {name}")
+            return 1
+        try:
+            backend = BACKENDS[name]()
+            screen = backend.virtual_screen()
+        except Exception as e:
+            print(f"{name:<10}\t跳过: {str(e)}")
+            continue
+        for width, height in REGION_SIZES:
+            if width > screen[2] or height > screen[3]:
+                print(f"{name:<10}\t{f'{width}x{height}':>10}\t超出屏幕大小 {screen[2]}x{screen[3]}，跳过")
+                continue
+            rate, nbytes, convert_ms = measure(backend, width, height, args.duration)
+            print(f"{name:<10}\t{f'{width}x{height}':>10}\t{rate:>10.1f}\t{nbytes / 1e6:>12.2f}\t"
+                  f"{rate * nbytes / 1e6:>10.1f}\t{convert_ms:>10.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+截图写入剪贴板的内存与耗时测试
+
+对比两种生成 CF_DIB 数据的方式在 4K 截图上的 Python 堆内存峰值（tracemalloc）与耗时：
+    - BMP 编码：转换为 RGB 图像后编码整个 BMP 文件到 BytesIO，再 getvalue()[14:]（原实现）
+    - 直接写入：由截图的像素缓冲区经 memoryview 逐行写入目标内存（write_dib）
+
+两种方式都把最终数据放入一块与剪贴板全局内存等大的缓冲区，这块内存也计入峰值。
+PIL 图像内部的像素内存不经过 Python 内存分配器，tracemalloc 统计不到，因此单独报告其大小。
+
+计时前先检查直接写入的数据：位图头为 BI_BITFIELDS 且颜色掩码正确（第 4 个字节不会被当作透明度），
+按 BMP 文件解码后为不透明的 RGB 图像且像素与截图一致，检查不通过时返回非0。
+
+用法:
+    python benchmarks/bench_clipboard_dib.py
+    python benchmarks/bench_clipboard_dib.py --width 1920 --height 1080 --rounds 10
+"""
+
+import sys
+import time
+import struct
+import argparse
+import tracemalloc
+from io import BytesIO
+
+from PIL import Image
+from _harness import install_fake_module, load_core_module
+from fake_screen import make_win32clipboard
+
+install_fake_module('win32clipboard', make_win32clipboard())
+
+screenshot = load_core_module('screenshot')
+
+
+def bmp_encode(capture):
+    """原实现：RGB 图像 -> BMP 文件 -> 去掉 14 字节文件头"""
+    output = BytesIO()
+    capture.to_image().convert('RGB').save(output, 'BMP')
+    data = output.getvalue()[14:]
+    output.close()
+    return bytearray(data)  # 剪贴板的全局内存
+
+
+def direct_write(capture):
+    """直接由像素缓冲区写入剪贴板的全局内存"""
+    dest = bytearray(screenshot.dib_size(capture))
+    screenshot.write_dib(capture, memoryview(dest))
+    return dest
+
+
+def check_dib(capture):
+    """检查直接写入的 CF_DIB 数据，返回问题列表"""
+    data = direct_write(capture)
+    header = screenshot.BITMAPINFOHEADER.from_buffer_copy(data)
+    header_size = header.biSize
+    problems = []
+    if header.biCompression != screenshot.BI_BITFIELDS:
+        problems.append(f"位图头的压缩方式为 {header.biCompression}，应为 BI_BITFIELDS")
+    masks = struct.unpack_from('<3I', data, header_size)
+    if masks != screenshot.DIB_COLOR_MASKS:
+        problems.append(f"颜色掩码为 {[hex(mask) for mask in masks]}")
+    # 加上 14 字节的 BMP 文件头后按普通 BMP 文件解码
+    offset = 14 + header_size + len(masks) * 4
+    img = Image.open(BytesIO(b'BM' + struct.pack('<IHHI', 14 + len(data), 0, 0, offset) + bytes(data)))
+    if img.mode != 'RGB':
+        problems.append(f"解码后的图像模式为 {img.mode}，应为不透明的 RGB")
+    elif img.tobytes() != capture.to_image().convert('RGB').tobytes():
+        problems.append("解码后的像素与截图不一致")
+    return problems
+
+
+def measure(func, capture, rounds):
+    """返回 (Python 堆内存峰值字节数, 平均耗时ms, 结果大小)"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    result = func(capture)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    size = len(result)
+    del result
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(capture)
+    return peak, (time.perf_counter() - start) / rounds * 1e3, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='截图写入剪贴板的内存与耗时测试')
+    parser.add_argument('--width', type=int, default=3840, help='截图宽度')
+    parser.add_argument('--height', type=int, default=2160, help='截图高度')
+    parser.add_argument('--rounds', type=int, default=5, help='计时的轮数')
+    args = parser.parse_args()
+
+    backend = screenshot.SyntheticCaptureBackend(args.width, args.height)
+    captures = {
+        '自上而下（ImageGrab/合成）': backend.capture_all(),
+    }
+    # GDI 截取的像素行自下而上排列
+    top_down = captures['自上而下（ImageGrab/合成）']
+    rows = [bytes(top_down.data[i * top_down.stride:(i + 1) * top_down.stride]) for i in range(top_down.height)]
+    captures['自下而上（GDI）'] = screenshot.Capture(b''.join(reversed(rows)), 0, 0, top_down.width,
+                                                     top_down.height, top_down.stride, bottom_up=True)
+    del rows
+
+    print(f"截图: {args.width}x{args.height}，像素缓冲区 {top_down.nbytes / 1e6:.1f}MB，"
+          f"BMP 编码另需 PIL 图像内存约 {args.width * args.height * 3 / 1e6:.1f}MB（未计入峰值）")
+    print(f"{'截图':<16}\t{'方式':<8}\t{'内存峰值(MB)':>12}\t{'耗时(ms)':>10}\t{'剪贴板数据(MB)':>14}")
+    failures = []
+    for name, capture in captures.items():
+        failures.extend(f"{name} {problem}" for problem in check_dib(capture))
+        results = {}
+        for method, func in (('BMP编码', bmp_encode), ('直接写入', direct_write)):
+            peak, elapsed, size = measure(func, capture, args.rounds)
+            results[method] = peak
+            print(f"{name:<16}\t{method:<8}\t{peak / 1e6:>12.1f}\t{elapsed:>10.1f}\t{size / 1e6:>14.1f}")
+        print(f"{name:<16}\t内存峰值降低 {(1 - results['直接写入'] / results['BMP编码']) * 100:.0f}%")
+        if results['直接写入'] >= results['BMP编码']:
+            failures.append(f"{name} 直接写入的内存峰值没有低于 BMP 编码")
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
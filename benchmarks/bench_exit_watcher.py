@@ -0,0 +1,219 @@
+"""
+进程退出通知测试（真实子进程）
+
+启动真实的子进程（sys.executable -c "import time; time.sleep(60)"）并结束它们，检查：
+    - ChildWaitWatcher（Popen.wait）与 PidPollWatcher（PID 轮询）都在限定时间内发出退出通知
+    - ProcessMonitor 收到退出通知后按重启策略推迟重新启动：距上次启动不早于 restart_interval，
+      且在间隔到期后很快重新启动，而不是等到下一次定期检查
+
+需要 POSIX 系统（ProcessMonitor 启动的占位程序为 shell 脚本），检查不通过时返回非0。
+
+用法:
+    python benchmarks/bench_exit_watcher.py
+    python benchmarks/bench_exit_watcher.py --children 20 --max-notify-ms 200 --restart-interval 3
+"""
+
+import os
+import sys
+import time
+import stat
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import psutil
+
+from _harness import isolate_config, load_core_module, percentile
+
+isolate_config()
+exit_watcher = load_core_module('exit_watcher')
+process_monitor_module = load_core_module('process_monitor')
+ProcessMonitor = process_monitor_module.ProcessMonitor
+
+# 子进程执行的命令
+CHILD_ARGS = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+# 重启测试中监控的定期检查间隔（秒），远大于重启间隔，确保重新启动由退出通知与重启策略驱动
+CHECK_INTERVAL = 30
+
+# 重新启动允许比 restart_interval 到期晚的时间（秒）
+RELAUNCH_SLACK = 1.0
+
+
+class Notifications:
+    """记录退出通知的时间"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.killed = {}    # 进程名 -> 结束时间（perf_counter）
+        self.latency = {}   # 进程名 -> 结束到收到通知（秒）
+
+    def on_exit(self, process_name, pid):
+        with self.cond:
+            killed_at = self.killed.get(process_name)
+            if killed_at is not None:
+                self.latency[process_name] = time.perf_counter() - killed_at
+                self.cond.notify_all()
+
+    def wait_all(self, count, timeout):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while len(self.latency) < count and time.monotonic() < deadline:
+                self.cond.wait(deadline - time.monotonic())
+            return dict(self.latency)
+
+
+def run_watcher(name, watcher, children, timeout):
+    """用指定的监听后端监听一批子进程，逐个结束后返回每个进程的通知延迟"""
+    notifications = Notifications()
+    watcher.bind(notifications.on_exit)
+    popens = {}
+    try:
+        for i in range(children):
+            popen = subprocess.Popen(CHILD_ARGS)
+            process_name = f'{name}_child_{i}'
+            popens[process_name] = popen
+            if not watcher.watch(process_name, popen.pid, psutil.Process(popen.pid), popen):
+                raise RuntimeError(f"{name} 无法监听子进程 {popen.pid}")
+        for process_name, popen in popens.items():
+            with notifications.cond:
+                notifications.killed[process_name] = time.perf_counter()
+            popen.kill()
+        return notifications.wait_all(children, timeout)
+    finally:
+        watcher.shutdown()
+        for popen in popens.values():
+            if popen.poll() is None:
+                popen.kill()
+            popen.wait()
+
+
+def make_child_script():
+    """创建 ProcessMonitor 启动的占位程序：exec 为长时间休眠的 Python 子进程"""
+    app_dir = tempfile.mkdtemp(prefix='bench_exit_')
+    path = os.path.join(app_dir, 'bench_sleeper')
+    with open(path, 'w') as f:
+        f.write('#!/bin/sh\nexec ' + ' '.join(f"'{arg}'" for arg in CHILD_ARGS) + '\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def run_restart(restart_interval):
+    """结束 ProcessMonitor 启动的子进程，返回 (结束到退出通知, 上次启动到重新启动)，单位秒"""
+    path = make_child_script()
+    process_name = os.path.basename(path)
+    launches = []
+    launched = threading.Condition()
+    notifications = Notifications()
+
+    ProcessMonitor._instance = None
+    monitor = ProcessMonitor()
+    original_spawn = monitor._spawn
+    original_on_exit = monitor._on_process_exit
+
+    def spawn(process_path, minimize_to_tray=False):
+        popen = original_spawn(process_path, minimize_to_tray)
+        with launched:
+            launches.append(time.perf_counter())
+            launched.notify_all()
+        return popen
+
+    def on_exit(name, pid):
+        notifications.on_exit(name, pid)
+        original_on_exit(name, pid)
+
+    monitor._spawn = spawn
+    monitor.exit_watcher.bind(on_exit)
+    try:
+        monitor.start_many([{
+            'path': path,
+            'name': process_name,
+            'check_interval': CHECK_INTERVAL,
+            'restart_interval': restart_interval,
+            'minimize_to_tray': False,
+            'backoff_base': 0
+        }])
+        info = monitor.monitored_processes[process_name]
+        if len(launches) != 1 or info.get('popen') is None:
+            raise RuntimeError("占位程序启动失败")
+
+        time.sleep(min(0.5, restart_interval / 4))
+        with notifications.cond:
+            notifications.killed[process_name] = time.perf_counter()
+        info['popen'].kill()
+
+        with launched:
+            launched.wait_for(lambda: len(launches) > 1, restart_interval + RELAUNCH_SLACK + 5)
+        detect = notifications.wait_all(1, 0).get(process_name)
+        if len(launches) < 2:
+            return detect, None
+        return detect, launches[1] - launches[0]
+    finally:
+        monitor.stop_all()
+        monitor.exit_watcher.shutdown()
+        monitor._launch_executor.shutdown(wait=True)
+        if monitor.monitor_thread is not None:
+            monitor.monitor_thread.join(timeout=2)
+        for proc in psutil.Process().children(recursive=True):
+            try:
+                proc.kill()
+                proc.wait(timeout=2)
+            except psutil.Error:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='进程退出通知测试（真实子进程）')
+    parser.add_argument('--children', type=int, default=10, help='每个监听后端启动的子进程数')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='PidPollWatcher 的轮询间隔（秒）')
+    parser.add_argument('--max-notify-ms', type=float, default=500,
+                        help='结束到收到通知的上限（毫秒），PidPollWatcher 另加一个轮询间隔')
+    parser.add_argument('--restart-interval', type=int, default=2, help='重启测试的最小重启间隔（整数秒）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    if os.name != 'posix':
+        print("跳过: 需要 POSIX 系统")
+        return 0
+
+    failures = []
+    watchers = (
+        ('child', exit_watcher.ChildWaitWatcher(max_workers=args.children), args.max_notify_ms),
+        ('poll', exit_watcher.PidPollWatcher(args.poll_interval), args.max_notify_ms + args.poll_interval * 1e3)
+    )
+    print(f"{'后端':<8}\t{'子进程':>6}\t{'已通知':>6}\t{'p50(ms)':>8}\t{'max(ms)':>8}\t{'上限(ms)':>8}")
+    for name, watcher, limit_ms in watchers:
+        latency = run_watcher(name, watcher, args.children, limit_ms / 1e3 + 5)
+        values = [value * 1e3 for value in latency.values()]
+        worst = max(values) if values else float('inf')
+        print(f"{name:<8}\t{args.children:>6}\t{len(values):>6}\t{percentile(values, 50):>8.1f}\t"
+              f"{worst:>8.1f}\t{limit_ms:>8.0f}")
+        if len(values) < args.children:
+            failures.append(f"{name}: {args.children - len(values)} 个子进程退出后没有收到通知")
+        elif worst > limit_ms:
+            failures.append(f"{name}: 退出通知最慢 {worst:.1f}ms，超过 {limit_ms:.0f}ms")
+
+    detect, since_launch = run_restart(args.restart_interval)
+    print(f"重启测试: 重启间隔 {args.restart_interval}s，"
+          f"退出通知 {detect * 1e3 if detect is not None else float('nan'):.1f}ms，"
+          f"距上次启动 {since_launch if since_launch is not None else float('nan'):.2f}s 后重新启动")
+    if detect is None:
+        failures.append("重启测试: 结束进程后没有收到退出通知")
+    elif detect * 1e3 > args.max_notify_ms:
+        failures.append(f"重启测试: 退出通知耗时 {detect * 1e3:.1f}ms，超过 {args.max_notify_ms:.0f}ms")
+    if since_launch is None:
+        failures.append("重启测试: 进程没有重新启动")
+    elif since_launch < args.restart_interval - 0.05:
+        failures.append(f"重启测试: 距上次启动 {since_launch:.2f}s 即重新启动，早于重启间隔 {args.restart_interval}s")
+    elif since_launch > args.restart_interval + RELAUNCH_SLACK:
+        failures.append(f"重启测试: 距上次启动 {since_launch:.2f}s 才重新启动，重启间隔到期后等待过久")
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+按键轨迹回放测试
+
+把录制的按键轨迹逐条送入 IMEMonitor._handle_keypress，报告每秒处理的按键数与单个事件的处理耗时，
+并对比不同输入法状态缓存方式下的耗时与后端查询次数。只有前台应用中有映射的按键才需要查询输入法状态，
+因此同时报告平均每个映射键的查询次数。
+
+轨迹文件为 JSON lines，每行一个事件：
+    {"key": "/", "event": "down", "time": 12.345}
+    {"key": "/", "event": "up", "time": 12.389, "app": "code.exe", "ime": false}
+    key: 按键名（与 keyboard 库一致）或扫描码；event: down / up；time: 时间戳（秒）
+    app、ime 可选：从该事件起前台应用的进程名、输入法是否为中文状态
+
+回放时输入法状态缓存使用轨迹中的时间戳计时，因此缓存有效期的行为与实际输入一致，但回放本身不等待。
+不指定 --trace 时生成模拟中文输入的轨迹：拼音选词、短句间的标点（含映射的顿号与书名号）、
+不时按 Shift 切换中英文（可用 --save-trace 保存下来供以后对比）。
+
+用法:
+    python benchmarks/bench_ime_replay.py
+    python benchmarks/bench_ime_replay.py --trace typing.jsonl --query-delay-us 200
+    python benchmarks/bench_ime_replay.py --keystrokes 50000 --save-trace typing.jsonl
+    python benchmarks/bench_ime_replay.py --max-p99-us 50
+"""
+
+import sys
+import json
+import time
+import types
+import random
+import logging
+import argparse
+
+from _harness import install_fake_module, isolate_config, load_core_module, percentile
+from fake_keyboard import make_keyboard, KeyboardEvent
+
+keyboard = make_keyboard()
+install_fake_module('keyboard', keyboard)
+config = isolate_config()
+
+from fake_ime import FakeIMEBackend, FakeTrayManager
+
+ime_state = load_core_module('ime_state')
+ime_monitor = load_core_module('ime_monitor')
+output_sink = load_core_module('output_sink')
+
+# 对比的缓存方式：名称 -> 输入法状态有效期（进程名由后台线程查询，不在键盘钩子中查询）
+VARIANTS = {
+    'cached': ime_state.IME_STATE_TTL,
+    'uncached': 0.0
+}
+
+# 生成轨迹时使用的前台应用，code.exe 在测试配置中禁用替换
+TRACE_APPS = ('notepad.exe', 'code.exe', 'wechat.exe')
+
+# 生成轨迹时的拼音音节（用于模拟中文输入）与英文单词（输入法切到英文时输入）
+TRACE_SYLLABLES = ('de', 'shi', 'yi', 'bu', 'le', 'zai', 'ren', 'you', 'wo', 'ta', 'zhe', 'zhong',
+                   'da', 'wei', 'shang', 'ge', 'guo', 'dao', 'shuo', 'men', 'wen', 'jian', 'xiang', 'hao')
+TRACE_WORDS = ('the', 'code', 'file', 'test', 'data', 'user', 'config', 'window', 'key', 'map')
+
+# 一个短句结束时输入的标点及权重：'/'（顿号）与 '['、']'（书名号）为测试配置中映射的按键，
+# 逗号、句号等由输入法自己转换，不经过替换
+TRACE_PUNCTUATION = (('/', 6), (',', 6), ('.', 3), ('[', 3), ('\\', 1), (';', 1))
+
+# 按键间隔范围（秒），约每秒 7 个按键
+TRACE_KEY_GAP = (0.06, 0.2)
+
+
+class TraceClock:
+    """按轨迹时间戳走动的时钟，替换输入法状态缓存使用的 time 模块"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def generate_trace(keystrokes, seed):
+    """生成模拟中文输入的轨迹
+
+    拼音音节后按空格或数字选词，每个短句后输入一个标点（顿号、书名号等映射的标点较常见），
+    不时单独按一下 Shift 在中英文之间切换输入法，每隔一段时间切换前台应用。
+    """
+    rng = random.Random(seed)
+    punctuation = [key for key, weight in TRACE_PUNCTUATION for _ in range(weight)]
+    events = []
+    state = {'now': 0.0, 'count': 0, 'ime': True}
+
+    def tap(key, **extra):
+        state['now'] += rng.uniform(*TRACE_KEY_GAP)
+        events.append(dict(extra, key=key, event='down', time=state['now']))
+        events.append({'key': key, 'event': 'up', 'time': state['now'] + rng.uniform(0.03, 0.08)})
+        state['count'] += 1
+
+    def type_word(word):
+        for char in word:
+            tap(char)
+
+    first = True
+    while state['count'] < keystrokes:
+        if first or rng.random() < 0.01:
+            # 切换前台应用，新应用中输入法处于中文状态
+            state['ime'] = True
+            tap(rng.choice('abcdefghijklmnopqrstuvwxyz'), app=rng.choice(TRACE_APPS), ime=True)
+            first = False
+        if rng.random() < 0.08:
+            # 单独按一下 Shift 切换中英文，释放 Shift 时输入法状态已改变
+            state['now'] += rng.uniform(*TRACE_KEY_GAP)
+            state['ime'] = not state['ime']
+            events.append({'key': 'left shift', 'event': 'down', 'time': state['now']})
+            events.append({'key': 'left shift', 'event': 'up', 'time': state['now'] + 0.05, 'ime': state['ime']})
+            state['now'] += 0.05
+        if state['ime']:
+            for _ in range(rng.randint(1, 3)):
+                for _ in range(rng.randint(1, 2)):
+                    type_word(rng.choice(TRACE_SYLLABLES))
+                tap(rng.choice(('space', 'space', 'space', '1', '2')))  # 空格或数字选词
+        else:
+            for _ in range(rng.randint(1, 3)):
+                type_word(rng.choice(TRACE_WORDS))
+                tap('space')
+        key = rng.choice(punctuation)
+        tap(key)
+        if key == '[':
+            # 书名号成对出现
+            type_word(rng.choice(TRACE_SYLLABLES))
+            tap('space')
+            tap(']')
+    events.sort(key=lambda item: item['time'])
+    return events
+
+
+def load_trace(path):
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events
+
+
+def save_trace(path, events):
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+
+def compile_trace(events):
+    """把轨迹转换为 (时间戳, 按键事件, 前台应用, 输入法状态)，避免回放时解析"""
+    compiled = []
+    for item in events:
+        key = item['key']
+        scan_code = key if isinstance(key, int) else keyboard.key_to_scan_codes(key)[0]
+        event = KeyboardEvent(item['event'], scan_code, event_time=item['time'])
+        compiled.append((item['time'], event, item.get('app'), item.get('ime')))
+    return compiled
+
+
+def replay(trace, variant, query_delay):
+    """用指定的缓存方式回放轨迹，返回统计结果"""
+    ttl = VARIANTS[variant]
+    hwnds = {app: hwnd for hwnd, app in enumerate(TRACE_APPS, 1)}
+    backend = FakeIMEBackend(ime_open={hwnd: True for hwnd in hwnds.values()},
+                             windows={hwnd: app for app, hwnd in hwnds.items()},
+                             query_delay=query_delay)
+    sink = output_sink.RecordingSink()
+    monitor = ime_monitor.IMEMonitor(FakeTrayManager(), backend, output_sink=sink)
+    monitor.ime_state = ime_state.IMEStateCache(backend, ttl=ttl)
+    monitor.toggle_ime_conversion(True)
+
+    clock = TraceClock()
+    ime_state.time = types.SimpleNamespace(monotonic=clock.monotonic)
+    handle = monitor._hook_callback
+    table = monitor.conversion_table
+    mapping = table.default
+    mapped = 0  # 在前台应用中有映射的按键按下次数，只有这些按键需要查询输入法状态
+    latencies = []
+    try:
+        start = time.perf_counter()
+        for timestamp, event, app, ime in trace:
+            if app is not None:
+                mapping = table.for_process(app)
+                if app not in hwnds:
+                    hwnds[app] = len(hwnds) + 1
+                    backend.windows[hwnds[app]] = app
+                backend.foreground = hwnds[app]
+                # 模拟后台线程在前台窗口变化时预先查询进程名
+                monitor.ime_state.prefetch()
+            if ime is not None:
+                backend.ime_open[backend.foreground] = ime
+            clock.now = timestamp
+            if event.event_type == 'down' and event.scan_code in mapping:
+                mapped += 1
+            event_start = time.perf_counter_ns()
+            handle(event)
+            latencies.append(time.perf_counter_ns() - event_start)
+        elapsed = time.perf_counter() - start
+    finally:
+        ime_state.time = time
+        monitor.toggle_ime_conversion(False)
+
+    return {
+        'events': len(trace),
+        'elapsed': elapsed,
+        'latencies': latencies,
+        'replaced': len(sink.sent),
+        'mapped': mapped,
+        'ime_queries': backend.queries,
+        'process_queries': backend.process_queries
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按键轨迹回放测试')
+    parser.add_argument('--trace', help='轨迹文件（JSON lines），不指定时随机生成')
+    parser.add_argument('--save-trace', help='把生成的轨迹保存到文件')
+    parser.add_argument('--keystrokes', type=int, default=20000, help='生成轨迹的按键次数')
+    parser.add_argument('--seed', type=int, default=1, help='生成轨迹的随机种子')
+    parser.add_argument('--variants', default=','.join(VARIANTS),
+                        help=f"对比的缓存方式，逗号分隔，可选: {', '.join(VARIANTS)}")
+    parser.add_argument('--query-delay-us', type=float, default=0.0,
+                        help='模拟每次查询输入法状态的耗时（微秒）')
+    parser.add_argument('--rounds', type=int, default=3, help='每种方式回放的轮数，取最快的一轮')
+    parser.add_argument('--max-p99-us', type=float, default=None,
+                        help='单个事件 p99 耗时上限（微秒），超过时返回非0')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    # 测试配置：全局把 '['、']' 替换为书名号，在 code.exe 中禁用替换，在 wechat.exe 中额外替换反斜杠
+    settings = config.Config()
+    settings.config_data.setdefault('key_conversion', {})['mappings'] = [
+        {'source_key': '[', 'target_char': '【'},
+        {'source_key': ']', 'target_char': '】'}
+    ]
+    settings.set_key_conversion_profile('code.exe', enabled=False)
+    settings.set_key_conversion_profile('wechat.exe', mappings=[{'source_key': '\\', 'target_char': '、'}])
+
+    if args.trace:
+        events = load_trace(args.trace)
+    else:
+        events = generate_trace(args.keystrokes, args.seed)
+        if args.save_trace:
+            save_trace(args.save_trace, events)
+    trace = compile_trace(events)
+    print(f"轨迹: {len(trace)} 个事件, 时长 {trace[-1][0] - trace[0][0]:.1f}s" if trace else "轨迹为空")
+    if not trace:
+        return 1
+
+    print(f"{'方式':<10}\t{'按键/秒':>10}\t{'p50(us)':>8}\t{'p99(us)':>8}\t{'max(us)':>8}\t"
+          f"{'映射键':>6}\t{'替换':>6}\t{'输入法查询':>10}\t{'查询/映射键':>10}\t{'进程查询':>8}")
+    failures = []
+    for variant in args.variants.split(','):
+        variant = variant.strip()
+        if variant not in VARIANTS:
+            print(f"未知的缓存方式: {variant}")
+            return 1
+        result = min((replay(trace, variant, args.query_delay_us / 1e6) for _ in range(args.rounds)),
+                     key=lambda item: item['elapsed'])
+        latencies = result['latencies']
+        p99 = percentile(latencies, 99) / 1e3
+        print(f"{variant:<10}\t{result['events'] / result['elapsed']:>10.0f}\t"
+              f"{percentile(latencies, 50) / 1e3:>8.2f}\t{p99:>8.2f}\t{max(latencies) / 1e3:>8.2f}\t"
+              f"{result['mapped']:>6}\t{result['replaced']:>6}\t{result['ime_queries']:>10}\t"
+              f"{result['ime_queries'] / max(1, result['mapped']):>10.2f}\t{result['process_queries']:>8}")
+        if args.max_p99_us is not None and p99 > args.max_p99_us:
+            failures.append(f"{variant} 的 p99 耗时 {p99:.2f}us 超过 {args.max_p99_us}us")
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
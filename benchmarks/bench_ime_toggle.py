@@ -0,0 +1,84 @@
+"""
+IMEMonitor 开关测试
+
+使用假 keyboard 模块反复开启、关闭按键替换，检查：
+    - 关闭后没有遗留的键盘钩子
+    - 每次开关的耗时有上限
+    - 开启状态下替换仍然生效
+
+用法:
+    python benchmarks/bench_ime_toggle.py
+    python benchmarks/bench_ime_toggle.py --toggles 5000 --max-toggle-ms 5
+"""
+
+import sys
+import time
+import logging
+import argparse
+
+from _harness import install_fake_module, isolate_config, load_core_module, percentile
+from fake_keyboard import make_keyboard
+
+keyboard = make_keyboard()
+install_fake_module('keyboard', keyboard)
+isolate_config()
+
+from fake_ime import FakeIMEBackend, FakeTrayManager
+
+ime_monitor = load_core_module('ime_monitor')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='IMEMonitor 开关测试')
+    parser.add_argument('--toggles', type=int, default=1000, help='开关次数')
+    parser.add_argument('--max-toggle-ms', type=float, default=10.0,
+                        help='单次开关允许的最大耗时（毫秒）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    monitor = ime_monitor.IMEMonitor(FakeTrayManager(), FakeIMEBackend())
+    baseline_hooks = keyboard.hook_count()
+    baseline_entries = len(keyboard._hooks)
+
+    enable_times = []
+    disable_times = []
+    failures = []
+    for i in range(args.toggles):
+        start = time.perf_counter()
+        monitor.toggle_ime_conversion(True)
+        enable_times.append(time.perf_counter() - start)
+
+        # 开启状态下源按键应被替换
+        if keyboard.tap('/'):
+            failures.append(f"第 {i} 次开启后源按键未被替换")
+
+        start = time.perf_counter()
+        monitor.toggle_ime_conversion(False)
+        disable_times.append(time.perf_counter() - start)
+
+        if keyboard.hook_count() != baseline_hooks or len(keyboard._hooks) != baseline_entries:
+            failures.append(f"第 {i} 次关闭后遗留钩子: 回调 {keyboard.hook_count()} 个, "
+                            f"钩子表 {len(keyboard._hooks)} 项")
+            break
+
+    # 关闭状态下源按键应放行
+    if not keyboard.tap('/'):
+        failures.append("关闭后源按键仍被阻止")
+    if len(keyboard.written) != args.toggles:
+        failures.append(f"替换次数 {len(keyboard.written)} 与开启次数 {args.toggles} 不一致")
+
+    for name, times in (('开启', enable_times), ('关闭', disable_times)):
+        print(f"{name}: n={len(times)} p50={percentile(times, 50) * 1e3:.3f}ms "
+              f"p99={percentile(times, 99) * 1e3:.3f}ms max={max(times) * 1e3:.3f}ms")
+        if max(times) * 1e3 > args.max_toggle_ms:
+            failures.append(f"{name}最大耗时 {max(times) * 1e3:.3f}ms 超过 {args.max_toggle_ms}ms")
+    print(f"遗留钩子: 回调 {keyboard.hook_count() - baseline_hooks} 个, "
+          f"钩子表 {len(keyboard._hooks) - baseline_entries} 项")
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
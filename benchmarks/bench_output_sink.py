@@ -0,0 +1,139 @@
+"""
+替换字符输出方式对比测试
+
+对比每次替换的耗时与 SendInput 调用次数：
+    - keyboard.write：keyboard 库的通用文本输出路径（Windows 分支）。平台相关层替换为
+      与 keyboard._winkeyboard.type_unicode 相同的实现（逐字符构建 INPUT 结构），
+      并模拟钩子中源按键处于按下状态（write 会先释放所有按下的键）。
+    - UnicodeInputSink：编译转换表时预先构建 INPUT 序列，每次替换只调用一次 SendInput。
+
+两者最终都调用同一个计数用的假 SendInput，因此对比的是 Python 侧的开销。
+
+用法:
+    python benchmarks/bench_output_sink.py
+    python benchmarks/bench_output_sink.py --iterations 50000
+"""
+
+import sys
+import time
+import types
+import ctypes
+import argparse
+
+from _harness import load_core_module
+from fake_keyboard import SCAN_CODES
+
+import keyboard
+
+output_sink = load_core_module('output_sink')
+INPUT = output_sink.INPUT
+KEYBDINPUT = output_sink.KEYBDINPUT
+_INPUTUNION = output_sink._INPUTUNION
+
+# 测试用的目标字符：单字符、多字符、需要代理对的字符
+TARGETS = ['、', '【】', '……', '😀']
+
+# 钩子中处于按下状态的源按键扫描码（'/'）
+SOURCE_SCAN_CODE = 53
+
+
+class FakeSendInput:
+    """计数用的 SendInput"""
+
+    def __init__(self):
+        self.calls = 0
+        self.inputs = 0
+
+    def __call__(self, count, inputs, size):
+        self.calls += 1
+        self.inputs += count
+        return count
+
+
+def make_win_keyboard_stub(send_input):
+    """与 keyboard._winkeyboard 相同方式构建输入的平台层"""
+
+    def send_key(scan_code, flags):
+        inputs = (INPUT * 1)()
+        inputs[0].type = output_sink.INPUT_KEYBOARD
+        inputs[0].union.ki.wScan = scan_code
+        inputs[0].union.ki.dwFlags = flags
+        send_input(1, inputs, ctypes.sizeof(INPUT))
+
+    def type_unicode(character):
+        surrogates = bytearray(character.encode('utf-16le'))
+        presses = []
+        releases = []
+        for i in range(0, len(surrogates), 2):
+            higher, lower = surrogates[i:i + 2]
+            structure = KEYBDINPUT(0, (lower << 8) + higher, output_sink.KEYEVENTF_UNICODE, 0, 0)
+            presses.append(INPUT(output_sink.INPUT_KEYBOARD, _INPUTUNION(ki=structure)))
+            structure = KEYBDINPUT(0, (lower << 8) + higher,
+                                   output_sink.KEYEVENTF_UNICODE | output_sink.KEYEVENTF_KEYUP, 0, 0)
+            releases.append(INPUT(output_sink.INPUT_KEYBOARD, _INPUTUNION(ki=structure)))
+        inputs = presses + releases
+        n_inputs = len(inputs)
+        p_inputs = (INPUT * n_inputs)(*inputs)
+        send_input(n_inputs, p_inputs, ctypes.c_int(ctypes.sizeof(INPUT)))
+
+    def map_name(name):
+        if name not in SCAN_CODES:
+            raise ValueError(name)
+        yield SCAN_CODES[name], ()
+
+    return types.SimpleNamespace(
+        map_name=map_name,
+        type_unicode=type_unicode,
+        press=lambda scan_code: send_key(scan_code, 0),
+        release=lambda scan_code: send_key(scan_code, output_sink.KEYEVENTF_KEYUP)
+    )
+
+
+def measure(send, payload, iterations):
+    """测量单次输出的平均耗时（微秒）"""
+    for _ in range(min(1000, iterations)):
+        send(payload)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        send(payload)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='替换字符输出方式对比测试')
+    parser.add_argument('--iterations', type=int, default=20000, help='每种输出方式的替换次数')
+    args = parser.parse_args()
+
+    # keyboard.write 使用 Windows 分支，源按键处于按下状态
+    write_send_input = FakeSendInput()
+    keyboard._os_keyboard = make_win_keyboard_stub(write_send_input)
+    keyboard._platform = types.SimpleNamespace(system=lambda: 'Windows')
+    keyboard._pressed_events[SOURCE_SCAN_CODE] = None
+
+    write_sink = output_sink.KeyboardWriteSink()
+    unicode_send_input = FakeSendInput()
+    unicode_sink = output_sink.UnicodeInputSink(send_input=unicode_send_input)
+
+    print(f"{'目标':<6}\t{'keyboard.write(us)':>18}\t{'SendInput次数':>12}\t"
+          f"{'预构建(us)':>10}\t{'SendInput次数':>12}\t{'加速':>6}")
+    slower = []
+    for target in TARGETS:
+        write_send_input.calls = unicode_send_input.calls = 0
+        write_us = measure(write_sink.send, write_sink.prepare(target), args.iterations)
+        write_calls = write_send_input.calls / (args.iterations + min(1000, args.iterations))
+
+        unicode_us = measure(unicode_sink.send, unicode_sink.prepare(target), args.iterations)
+        unicode_calls = unicode_send_input.calls / (args.iterations + min(1000, args.iterations))
+
+        print(f"{target:<6}\t{write_us:>18.2f}\t{write_calls:>12.1f}\t"
+              f"{unicode_us:>10.2f}\t{unicode_calls:>12.1f}\t{write_us / unicode_us:>5.1f}x")
+        if unicode_us >= write_us:
+            slower.append(target)
+
+    for target in slower:
+        print(f"失败: {target} 的预构建输出没有比 keyboard.write 更快")
+    return 1 if slower else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
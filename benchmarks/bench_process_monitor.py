@@ -0,0 +1,247 @@
+"""
+ProcessMonitor 扩展性测试
+
+使用合成进程表（假 psutil）驱动真实的 ProcessMonitor，可在无 Windows 环境下运行。
+对每组 (进程表大小, 监控应用数) 报告：
+    - 每轮监控检查的 CPU 时间
+    - 检查延迟（实际检查时间相对调度截止时间的滞后）
+    - 进程被结束到收到退出通知、到重新启动的延迟
+
+用法:
+    python benchmarks/bench_process_monitor.py
+    python benchmarks/bench_process_monitor.py --table-sizes 500,5000 --apps 1,50,200 --duration 5
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+
+from _harness import install_fake_module, isolate_config, load_core_module, percentile
+from fake_psutil import FakeProcessTable, FakePopen, make_psutil
+
+# 所有场景共享同一张合成进程表，切换场景时清空
+TABLE = FakeProcessTable()
+install_fake_module('psutil', make_psutil(TABLE))
+isolate_config()
+process_monitor_module = load_core_module('process_monitor')
+ProcessMonitor = process_monitor_module.ProcessMonitor
+
+# 每轮结束进程后等待重新启动的最长时间（秒）
+RELAUNCH_TIMEOUT = 10
+
+# 每轮最多结束的进程数
+KILLS_PER_ROUND = 10
+
+
+class Recorder:
+    """收集监控线程的耗时与延迟数据"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tick_cpu = []       # 每轮 monitor() 的线程 CPU 时间（秒）
+        self.tick_due = []       # 每轮到期的进程数
+        self.lateness = []       # 检查相对截止时间的滞后（秒）
+        self.killed = {}         # 进程名 -> 结束时间（perf_counter）
+        self.detect = []         # 结束 -> 退出通知（秒）
+        self.relaunch = []       # 结束 -> 重新启动（秒）
+        self.relaunched = threading.Condition(self.lock)
+
+
+def make_app_dir(app_count):
+    """创建监控应用的占位文件（start_many 会检查路径是否存在）"""
+    app_dir = tempfile.mkdtemp(prefix='bench_apps_')
+    paths = []
+    for i in range(app_count):
+        path = os.path.join(app_dir, f'bench_app_{i}.exe')
+        with open(path, 'w'):
+            pass
+        paths.append(path)
+    return paths
+
+
+def new_monitor(recorder):
+    """创建新的 ProcessMonitor 实例，并替换进程启动与检查入口以收集数据"""
+    ProcessMonitor._instance = None
+    monitor = ProcessMonitor()
+
+    def spawn(process_path, minimize_to_tray=False):
+        process_name = os.path.basename(process_path)
+        popen = FakePopen(TABLE, TABLE.spawn(process_name))
+        with recorder.lock:
+            killed_at = recorder.killed.pop(process_name, None)
+            if killed_at is not None:
+                recorder.relaunch.append(time.perf_counter() - killed_at)
+                recorder.relaunched.notify_all()
+        return popen
+
+    original_pop_due = monitor._pop_due
+    original_monitor = monitor.monitor
+    original_on_exit = monitor._on_process_exit
+
+    def pop_due():
+        due = original_pop_due()
+        now = time.monotonic()
+        with recorder.lock:
+            recorder.lateness.extend(now - deadline for _, _, deadline in due)
+            recorder.tick_due.append(len(due))
+        return due
+
+    def timed_monitor():
+        start = time.thread_time()
+        original_monitor()
+        with recorder.lock:
+            recorder.tick_cpu.append(time.thread_time() - start)
+
+    def on_exit(process_name, pid):
+        with recorder.lock:
+            killed_at = recorder.killed.get(process_name)
+            if killed_at is not None:
+                recorder.detect.append(time.perf_counter() - killed_at)
+        original_on_exit(process_name, pid)
+
+    monitor._spawn = spawn
+    monitor._pop_due = pop_due
+    monitor.monitor = timed_monitor
+    monitor.exit_watcher.bind(on_exit)
+    return monitor
+
+
+def shutdown_monitor(monitor):
+    """停止监控并释放线程"""
+    monitor.stop_all()
+    monitor.exit_watcher.shutdown()
+    monitor._launch_executor.shutdown(wait=True)
+    if monitor.monitor_thread is not None:
+        monitor.monitor_thread.join(timeout=2)
+
+
+def run_scenario(table_size, app_count, duration, check_interval, rounds):
+    """运行一组场景并返回统计结果"""
+    TABLE.clear()
+    TABLE.fill(table_size)
+    recorder = Recorder()
+    monitor = new_monitor(recorder)
+    paths = make_app_dir(app_count)
+    app_configs = [{
+        'path': path,
+        'name': os.path.basename(path),
+        'check_interval': check_interval,
+        'restart_interval': 1,
+        'minimize_to_tray': False,
+        'backoff_base': 0,
+        'stable_after': 0,
+        'max_restarts': 1000
+    } for path in paths]
+
+    try:
+        monitor.start_many(app_configs)
+
+        # 稳态：所有进程都在运行，只测量检查开销
+        time.sleep(duration)
+        with recorder.lock:
+            steady_cpu = list(recorder.tick_cpu)
+            steady_due = list(recorder.tick_due)
+            lateness = list(recorder.lateness)
+
+        # 结束进程并测量检测与重启延迟
+        names = [config['name'] for config in app_configs]
+        for _ in range(rounds):
+            time.sleep(1.1)  # 等待超过最小重启间隔
+            victims = random.sample(names, min(KILLS_PER_ROUND, len(names)))
+            for name in victims:
+                info = monitor.monitored_processes[name]
+                pid = info.get('pid')
+                if pid is None:
+                    continue
+                with recorder.lock:
+                    recorder.killed[name] = time.perf_counter()
+                TABLE.kill(pid)
+            deadline = time.monotonic() + RELAUNCH_TIMEOUT
+            with recorder.lock:
+                while recorder.killed and time.monotonic() < deadline:
+                    recorder.relaunched.wait(deadline - time.monotonic())
+                missed = len(recorder.killed)
+                recorder.killed.clear()
+            if missed:
+                logging.warning(f"{missed} 个进程未在 {RELAUNCH_TIMEOUT} 秒内重新启动")
+    finally:
+        shutdown_monitor(monitor)
+
+    checks = sum(steady_due)
+    cpu_total = sum(steady_cpu)
+    return {
+        'table': table_size,
+        'apps': app_count,
+        'ticks': len(steady_cpu),
+        'cpu_per_tick_us': cpu_total / len(steady_cpu) * 1e6 if steady_cpu else 0.0,
+        'cpu_per_check_us': cpu_total / checks * 1e6 if checks else 0.0,
+        'cpu_percent': cpu_total / duration * 100,
+        'late_p50_ms': percentile(lateness, 50) * 1e3,
+        'late_p99_ms': percentile(lateness, 99) * 1e3,
+        'detect_p50_ms': percentile(recorder.detect, 50) * 1e3,
+        'detect_p99_ms': percentile(recorder.detect, 99) * 1e3,
+        'relaunch_p50_ms': percentile(recorder.relaunch, 50) * 1e3,
+        'relaunch_p99_ms': percentile(recorder.relaunch, 99) * 1e3,
+        'snapshot_scans': monitor.get_snapshot_stats()['scans']
+    }
+
+
+COLUMNS = [
+    ('table', '进程表', '{:>6}'),
+    ('apps', '应用数', '{:>6}'),
+    ('ticks', '轮数', '{:>6}'),
+    ('cpu_per_tick_us', 'CPU/轮(us)', '{:>10.1f}'),
+    ('cpu_per_check_us', 'CPU/检查(us)', '{:>12.1f}'),
+    ('cpu_percent', 'CPU%', '{:>6.2f}'),
+    ('late_p50_ms', '滞后p50(ms)', '{:>11.2f}'),
+    ('late_p99_ms', '滞后p99(ms)', '{:>11.2f}'),
+    ('detect_p50_ms', '检测p50(ms)', '{:>11.1f}'),
+    ('detect_p99_ms', '检测p99(ms)', '{:>11.1f}'),
+    ('relaunch_p50_ms', '重启p50(ms)', '{:>11.1f}'),
+    ('relaunch_p99_ms', '重启p99(ms)', '{:>11.1f}'),
+    ('snapshot_scans', '扫描次数', '{:>8}')
+]
+
+
+def print_results(results):
+    """打印结果表格"""
+    print('\t'.join(title for _, title, _ in COLUMNS))
+    for result in results:
+        print('\t'.join(fmt.format(result[key]) for key, _, fmt in COLUMNS))
+
+
+def parse_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ProcessMonitor 扩展性测试')
+    parser.add_argument('--table-sizes', type=parse_list, default=[500, 5000],
+                        help='合成进程表大小，逗号分隔')
+    parser.add_argument('--apps', type=parse_list, default=[1, 20, 200],
+                        help='监控应用数，逗号分隔')
+    parser.add_argument('--duration', type=float, default=3.0,
+                        help='每个场景稳态测量的时长（秒）')
+    parser.add_argument('--check-interval', type=float, default=1.0,
+                        help='监听间隔（秒）')
+    parser.add_argument('--rounds', type=int, default=3,
+                        help='结束进程测量重启延迟的轮数')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    results = []
+    for table_size in args.table_sizes:
+        for app_count in args.apps:
+            results.append(run_scenario(table_size, app_count, args.duration,
+                                        args.check_interval, args.rounds))
+    print_results(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
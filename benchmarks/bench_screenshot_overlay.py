@@ -0,0 +1,148 @@
+"""
+截图选择窗口显示延迟测试
+
+测量从按下截图快捷键（在快捷键线程中调用 take_screenshot）到全屏选择窗口显示（<Map> 事件）的延迟：
+    - 每次新建：每次按键新建 tk.Tk 与全屏 Toplevel，结束后销毁并 gc.collect（原实现）
+    - 常驻窗口：选择窗口挂在主窗口下预先创建，快捷键线程通过虚拟事件通知主线程显示
+
+需要图形界面（Linux 下需设置 DISPLAY，可配合 Xvfb 使用）。
+
+用法:
+    python benchmarks/bench_screenshot_overlay.py
+    python benchmarks/bench_screenshot_overlay.py --rounds 50
+"""
+
+import gc
+import sys
+import time
+import queue
+import logging
+import argparse
+import threading
+import tkinter as tk
+
+from _harness import install_fake_module, load_core_module, percentile
+from fake_screen import make_win32clipboard
+
+install_fake_module('win32clipboard', make_win32clipboard())
+
+screenshot = load_core_module('screenshot')
+
+# 等待选择窗口显示的超时时间（秒）
+SHOW_TIMEOUT = 5.0
+
+# 测试结束后通知主线程的虚拟事件
+CANCEL_EVENT = '<<BenchCancel>>'
+QUIT_EVENT = '<<BenchQuit>>'
+
+
+def measure_legacy(rounds):
+    """原实现：每次按键新建 Tk 解释器与全屏窗口，返回 (显示延迟列表, 清理耗时列表)"""
+    show_times = []
+    cleanup_times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        shown = []
+        root = tk.Tk()
+        root.withdraw()
+        selection_root = tk.Toplevel(root)
+        selection_root.title("截图")
+        selection_root.attributes("-fullscreen", True, "-alpha", 0.3, "-topmost", True)
+        selection_root.overrideredirect(1)
+        selection_root.lift()
+        selection_root.focus_force()
+        canvas = tk.Canvas(selection_root, cursor="cross", bg='#1e1e1e', highlightthickness=0)
+        canvas.pack(fill="both", expand=True)
+        selection_root.bind('<Map>', lambda e: shown.append(time.perf_counter()))
+        deadline = start + SHOW_TIMEOUT
+        while not shown and time.perf_counter() < deadline:
+            root.update()
+        if shown:
+            show_times.append(shown[0] - start)
+
+        start = time.perf_counter()
+        selection_root.destroy()
+        root.destroy()
+        gc.collect()
+        cleanup_times.append(time.perf_counter() - start)
+    return show_times, cleanup_times
+
+
+def measure_persistent(rounds):
+    """常驻窗口：快捷键线程调用 take_screenshot，返回 (显示延迟列表, 预创建耗时)"""
+    root = tk.Tk()
+    root.withdraw()
+    start = time.perf_counter()
+    taker = screenshot.ScreenshotTaker(queue.Queue(), root, screenshot.SyntheticCaptureBackend())
+    root.update()
+    create_time = time.perf_counter() - start
+
+    shown = threading.Event()
+    shown_at = []
+    taker.selection_root.bind('<Map>', lambda e: (shown_at.append(time.perf_counter()), shown.set()))
+    root.bind(CANCEL_EVENT, lambda e: taker.cancel_screenshot())
+    root.bind(QUIT_EVENT, lambda e: root.quit())
+
+    show_times = []
+
+    def hotkey_thread():
+        try:
+            for _ in range(rounds):
+                shown.clear()
+                del shown_at[:]
+                start = time.perf_counter()
+                taker.take_screenshot()
+                if shown.wait(SHOW_TIMEOUT):
+                    show_times.append(shown_at[0] - start)
+                root.event_generate(CANCEL_EVENT, when='tail')
+                time.sleep(0.05)  # 等待窗口隐藏
+        finally:
+            root.event_generate(QUIT_EVENT, when='tail')
+
+    root.after(100, threading.Thread(target=hotkey_thread, daemon=True).start)
+    root.mainloop()
+    taker.cleanup()
+    root.destroy()
+    return show_times, create_time
+
+
+def report(name, times):
+    if not times:
+        print(f"{name}: 选择窗口未显示")
+        return
+    print(f"{name}: n={len(times)} p50={percentile(times, 50) * 1e3:.1f}ms "
+          f"p99={percentile(times, 99) * 1e3:.1f}ms max={max(times) * 1e3:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='截图选择窗口显示延迟测试')
+    parser.add_argument('--rounds', type=int, default=20, help='每种方式的截图次数')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        print(f"无法创建窗口（需要图形界面）: {str(e)}")
+        return 1
+
+    legacy_times, cleanup_times = measure_legacy(args.rounds)
+    persistent_times, create_time = measure_persistent(args.rounds)
+
+    report("每次新建", legacy_times)
+    report("每次新建的清理耗时", cleanup_times)
+    report("常驻窗口", persistent_times)
+    print(f"常驻窗口预创建耗时: {create_time * 1e3:.1f}ms（启动时一次）")
+
+    failures = []
+    if len(persistent_times) < args.rounds:
+        failures.append(f"常驻窗口只显示了 {len(persistent_times)}/{args.rounds} 次")
+    if legacy_times and persistent_times and percentile(persistent_times, 50) >= percentile(legacy_times, 50):
+        failures.append("常驻窗口的显示延迟没有低于每次新建")
+    for failure in failures:
+        print(f"失败: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+IMEMonitor 的测试替身：假的输入法状态后端与托盘
+"""
+
+import time
+
+from _harness import load_core_module
+
+ime_state = load_core_module('ime_state')
+
+
+class FakeIMEBackend(ime_state.IMEBackend):
+    """可编程的输入法状态后端
+
+    ime_open: hwnd -> 是否中文状态（None 表示查询超时）
+    windows: hwnd -> 所属进程名
+    query_delay: 每次查询的耗时（秒），用于模拟无响应的窗口
+    """
+
+    def __init__(self, ime_open=None, windows=None, foreground=1, query_delay=0.0):
+        self.ime_open = dict(ime_open or {1: True})
+        self.windows = dict(windows or {1: 'notepad.exe'})
+        self.foreground = foreground
+        self.query_delay = query_delay
+        self.queries = 0
+        self.process_queries = 0
+
+    def get_foreground_window(self):
+        return self.foreground
+
+    def query_ime_open(self, hwnd):
+        self.queries += 1
+        if self.query_delay:
+            time.sleep(self.query_delay)
+        return self.ime_open.get(hwnd, False)
+
+    def get_window_process_id(self, hwnd):
+        # 用 hwnd 充当 PID
+        return hwnd if hwnd in self.windows else None
+
+    def get_process_name(self, pid):
+        self.process_queries += 1
+        return self.windows.get(pid)
+
+
+class FakeTrayManager:
+    """只记录状态的托盘"""
+
+    def __init__(self):
+        self.ime_enabled = False
+
+    def update_ime_status(self, enabled):
+        self.ime_enabled = enabled
+
+    def refresh_menu(self):
+        pass
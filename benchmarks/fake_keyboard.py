@@ -0,0 +1,163 @@
+"""
+假的 keyboard 模块：按 keyboard 库的方式维护钩子表，支持注入按键事件，不需要系统权限
+"""
+
+import time
+import types
+from collections import defaultdict
+
+KEY_DOWN = 'down'
+KEY_UP = 'up'
+
+# 常用按键的扫描码（美式键盘布局，扩展键加 0xE000）
+SCAN_CODES = {
+    'esc': 1, '1': 2, '2': 3, '3': 4, '4': 5, '5': 6, '6': 7, '7': 8, '8': 9, '9': 10, '0': 11,
+    '-': 12, '=': 13, 'backspace': 14, 'tab': 15,
+    'q': 16, 'w': 17, 'e': 18, 'r': 19, 't': 20, 'y': 21, 'u': 22, 'i': 23, 'o': 24, 'p': 25,
+    '[': 26, ']': 27, 'enter': 28, 'left ctrl': 29,
+    'a': 30, 's': 31, 'd': 32, 'f': 33, 'g': 34, 'h': 35, 'j': 36, 'k': 37, 'l': 38,
+    ';': 39, "'": 40, '`': 41, 'left shift': 42, '\\': 43,
+    'z': 44, 'x': 45, 'c': 46, 'v': 47, 'b': 48, 'n': 49, 'm': 50,
+    ',': 51, '.': 52, '/': 53, 'right shift': 54, 'left alt': 56, 'space': 57, 'caps lock': 58,
+    'right ctrl': 0xE01D, 'right alt': 0xE038, 'left windows': 0xE05B, 'right windows': 0xE05C
+}
+
+# 与 keyboard 库一致：不分左右的修饰键对应左右两个扫描码
+ALIASES = {
+    'ctrl': ('left ctrl', 'right ctrl'),
+    'shift': ('left shift', 'right shift'),
+    'alt': ('left alt', 'right alt'),
+    'win': ('left windows', 'right windows'),
+    'windows': ('left windows', 'right windows'),
+    'left win': ('left windows',),
+    'right win': ('right windows',)
+}
+
+NAMES = {scan_code: name for name, scan_code in SCAN_CODES.items()}
+
+
+class KeyboardEvent:
+    def __init__(self, event_type, scan_code, name=None, event_time=None):
+        self.event_type = event_type
+        self.scan_code = scan_code
+        self.name = name if name is not None else NAMES.get(scan_code)
+        self.time = event_time if event_time is not None else time.time()
+        self.is_keypad = False
+        self.device = None
+        self.modifiers = None
+
+
+def make_keyboard():
+    """创建一个新的假 keyboard 模块"""
+
+    module = types.ModuleType('keyboard')
+    module.KEY_DOWN = KEY_DOWN
+    module.KEY_UP = KEY_UP
+    module.KeyboardEvent = KeyboardEvent
+    module._hooks = {}
+    module.written = []          # write 输出的文本
+    module.blocking_hooks = []   # suppress=True 的全局钩子
+    module.handlers = []         # 非阻塞的全局钩子
+    module.blocking_keys = defaultdict(list)
+    module.nonblocking_keys = defaultdict(list)
+    hooks = module._hooks
+
+    def key_to_scan_codes(key, error_if_missing=True):
+        if isinstance(key, int):
+            return (key,)
+        if isinstance(key, (list, tuple)):
+            return sum((key_to_scan_codes(item) for item in key), ())
+        normalized = key.lower()
+        names = ALIASES.get(normalized, (normalized,))
+        scan_codes = tuple(SCAN_CODES[name] for name in names if name in SCAN_CODES)
+        if not scan_codes and error_if_missing:
+            raise ValueError(f"Key {key!r} is not mapped to any known key.")
+        return scan_codes
+
+    def hook(callback, suppress=False, on_remove=lambda: None):
+        target = module.blocking_hooks if suppress else module.handlers
+        target.append(callback)
+
+        def remove_():
+            del hooks[callback]
+            del hooks[remove_]
+            target.remove(callback)
+            on_remove()
+        hooks[callback] = hooks[remove_] = remove_
+        return remove_
+
+    def unhook(remove):
+        hooks[remove]()
+
+    def hook_key(key, callback, suppress=False):
+        store = module.blocking_keys if suppress else module.nonblocking_keys
+        scan_codes = key_to_scan_codes(key)
+        for scan_code in scan_codes:
+            store[scan_code].append(callback)
+
+        def remove_():
+            del hooks[callback]
+            del hooks[key]
+            del hooks[remove_]
+            for scan_code in scan_codes:
+                store[scan_code].remove(callback)
+        hooks[callback] = hooks[key] = hooks[remove_] = remove_
+        return remove_
+
+    def on_press_key(key, callback, suppress=False):
+        return hook_key(key, lambda e: e.event_type == KEY_UP or callback(e), suppress=suppress)
+
+    def on_release_key(key, callback, suppress=False):
+        return hook_key(key, lambda e: e.event_type == KEY_DOWN or callback(e), suppress=suppress)
+
+    def unhook_all():
+        module.blocking_hooks.clear()
+        module.handlers.clear()
+        module.blocking_keys.clear()
+        module.nonblocking_keys.clear()
+        hooks.clear()
+
+    def write(text, delay=0, restore_state_after=True, exact=None):
+        module.written.append(text)
+
+    def feed(event_type, key):
+        """注入一个按键事件，返回事件是否放行（未被阻止）"""
+        scan_code = key if isinstance(key, int) else key_to_scan_codes(key)[0]
+        event = KeyboardEvent(event_type, scan_code)
+        allowed = True
+        for callback in list(module.blocking_hooks):
+            if callback(event) is False:
+                allowed = False
+        for callback in list(module.blocking_keys.get(scan_code, ())):
+            if callback(event) is False:
+                allowed = False
+        for callback in list(module.nonblocking_keys.get(scan_code, ())):
+            callback(event)
+        for callback in list(module.handlers):
+            callback(event)
+        return allowed
+
+    def tap(key):
+        """按下并释放一个按键，返回按下事件是否放行"""
+        allowed = feed(KEY_DOWN, key)
+        feed(KEY_UP, key)
+        return allowed
+
+    def hook_count():
+        """当前注册的回调总数，用于检查钩子泄漏"""
+        return (len(module.blocking_hooks) + len(module.handlers)
+                + sum(len(callbacks) for callbacks in module.blocking_keys.values())
+                + sum(len(callbacks) for callbacks in module.nonblocking_keys.values()))
+
+    module.key_to_scan_codes = key_to_scan_codes
+    module.hook = hook
+    module.unhook = unhook
+    module.hook_key = hook_key
+    module.on_press_key = on_press_key
+    module.on_release_key = on_release_key
+    module.unhook_all = unhook_all
+    module.write = write
+    module.feed = feed
+    module.tap = tap
+    module.hook_count = hook_count
+    return module
@@ -0,0 +1,187 @@
+"""
+假的 psutil 实现：内存中的合成进程表，用于在 Linux 上无依赖地驱动 ProcessMonitor
+"""
+
+import time
+import types
+import itertools
+import threading
+from contextlib import contextmanager
+
+STATUS_RUNNING = 'running'
+STATUS_ZOMBIE = 'zombie'
+
+
+class Error(Exception):
+    pass
+
+
+class NoSuchProcess(Error):
+    def __init__(self, pid, name=None, msg=None):
+        super().__init__(msg or f"process no longer exists (pid={pid})")
+        self.pid = pid
+        self.name = name
+
+
+class ZombieProcess(NoSuchProcess):
+    pass
+
+
+class AccessDenied(Error):
+    pass
+
+
+class TimeoutExpired(Error):
+    pass
+
+
+class _Entry:
+    """合成进程表中的一条记录"""
+
+    def __init__(self, pid, name):
+        self.pid = pid
+        self.name = name
+        self.create_time = time.time()
+        self.exited = threading.Event()
+        self.rss = 32 * 1024 * 1024
+
+
+class FakeProcessTable:
+    """合成进程表，pid -> _Entry"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pids = itertools.count(1000)
+
+    def spawn(self, name):
+        """添加一个进程，返回 _Entry"""
+        with self._lock:
+            entry = _Entry(next(self._pids), name)
+            self._entries[entry.pid] = entry
+        return entry
+
+    def kill(self, pid):
+        """移除一个进程并唤醒等待它的线程"""
+        with self._lock:
+            entry = self._entries.pop(pid, None)
+        if entry is not None:
+            entry.exited.set()
+        return entry is not None
+
+    def clear(self):
+        """清空进程表（切换测试场景时使用）"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.exited.set()
+
+    def get(self, pid):
+        with self._lock:
+            return self._entries.get(pid)
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    def fill(self, count, prefix='background'):
+        """填充指定数量的无关进程"""
+        for i in range(count):
+            self.spawn(f"{prefix}_{i % 97}.exe")
+
+
+class _IterProcess:
+    """process_iter 返回的对象"""
+
+    __slots__ = ('pid', 'info')
+
+    def __init__(self, entry):
+        self.pid = entry.pid
+        self.info = {'name': entry.name}
+
+
+class _MemoryInfo:
+    def __init__(self, rss):
+        self.rss = rss
+
+
+class FakePopen:
+    """subprocess.Popen 的替代品，对应合成进程表中的一个进程"""
+
+    def __init__(self, table, entry):
+        self._table = table
+        self._entry = entry
+        self.pid = entry.pid
+        self.returncode = None
+
+    def poll(self):
+        if self._entry.exited.is_set():
+            self.returncode = -9
+        return self.returncode
+
+    def wait(self, timeout=None):
+        self._entry.exited.wait(timeout)
+        return self.poll()
+
+
+def make_psutil(table):
+    """创建绑定到指定进程表的假 psutil 模块"""
+
+    module = types.ModuleType('psutil')
+
+    class Process:
+        def __init__(self, pid):
+            entry = table.get(pid)
+            if entry is None:
+                raise NoSuchProcess(pid)
+            self.pid = pid
+            self._entry = entry
+
+        def is_running(self):
+            return table.get(self.pid) is self._entry
+
+        def status(self):
+            if not self.is_running():
+                raise NoSuchProcess(self.pid)
+            return STATUS_RUNNING
+
+        def create_time(self):
+            return self._entry.create_time
+
+        @contextmanager
+        def oneshot(self):
+            yield
+
+        def cpu_percent(self, interval=None):
+            return 1.0
+
+        def memory_info(self):
+            return _MemoryInfo(self._entry.rss)
+
+        def num_fds(self):
+            return 16
+
+        def terminate(self):
+            table.kill(self.pid)
+
+        def kill(self):
+            table.kill(self.pid)
+
+        def wait(self, timeout=None):
+            self._entry.exited.wait(timeout)
+
+    def process_iter(attrs=None):
+        for entry in table.entries():
+            yield _IterProcess(entry)
+
+    module.Process = Process
+    module.process_iter = process_iter
+    module.Error = Error
+    module.NoSuchProcess = NoSuchProcess
+    module.ZombieProcess = ZombieProcess
+    module.AccessDenied = AccessDenied
+    module.TimeoutExpired = TimeoutExpired
+    module.STATUS_RUNNING = STATUS_RUNNING
+    module.STATUS_ZOMBIE = STATUS_ZOMBIE
+    return module
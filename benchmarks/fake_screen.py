@@ -0,0 +1,35 @@
+"""
+假的剪贴板模块：替代 win32clipboard，用于在 Linux 上加载截图模块
+"""
+
+import types
+
+
+def make_win32clipboard():
+    """创建一个只记录写入内容的假 win32clipboard 模块"""
+    module = types.ModuleType('win32clipboard')
+    module.CF_DIB = 8
+    module.data = {}
+    module.writes = 0
+    state = {'open': False}
+
+    def OpenClipboard():
+        state['open'] = True
+
+    def CloseClipboard():
+        state['open'] = False
+
+    def EmptyClipboard():
+        module.data.clear()
+
+    def SetClipboardData(fmt, data):
+        if not state['open']:
+            raise RuntimeError('clipboard is not open')
+        module.data[fmt] = data
+        module.writes += 1
+
+    module.OpenClipboard = OpenClipboard
+    module.CloseClipboard = CloseClipboard
+    module.EmptyClipboard = EmptyClipboard
+    module.SetClipboardData = SetClipboardData
+    return module
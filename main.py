@@ -2,7 +2,6 @@ import logging
 import sys
 import tkinter as tk
 import threading
-import queue
 import keyboard
 from tkinter import messagebox
 import os
@@ -16,10 +15,13 @@ from src.utils import (
     Config,
     save_config
 )
-from src.core import ScreenshotTaker, IMEMonitor, ProcessMonitor
+from src.core import ScreenshotTaker, ScreenshotPipeline, IMEMonitor, ProcessMonitor
 from src.ui import OptionsWindow, TrayManager
 from src.utils.autostart import check_auto_start
 
+# 有新截图等待显示时发送到主窗口的虚拟事件
+SCREENSHOT_READY_EVENT = '<<ScreenshotReady>>'
+
 class MainApplication:
     instance = None
     _config = None
@@ -67,8 +69,16 @@ class MainApplication:
             
             # 初始化截图功能
             try:
-                self.screenshot_queue = queue.Queue()
-                self.screenshot_taker = ScreenshotTaker(self.screenshot_queue)
+                # 有上限的截图流水线，放入截图时通过虚拟事件唤醒主线程显示
+                pipeline_config = self.config.get_screenshot_pipeline()
+                self.screenshot_queue = ScreenshotPipeline(
+                    pipeline_config['max_in_flight'],
+                    pipeline_config['policy'],
+                    notify=lambda: self.root.event_generate(SCREENSHOT_READY_EVENT, when='tail')
+                )
+                self.root.bind(SCREENSHOT_READY_EVENT, lambda e: self.display_options_from_queue())
+                # 选择窗口挂在主窗口下预先创建，快捷键按下时直接显示
+                self.screenshot_taker = ScreenshotTaker(self.screenshot_queue, self.root)
                 logging.info("截图功能已初始化")
             except Exception as e:
                 logging.error(f"初始化截图功能失败: {str(e)}")
@@ -90,11 +100,20 @@ class MainApplication:
                 self.tray_manager = TrayManager(
                     screenshot_enabled_callback=self.toggle_screenshot,
                     ime_conversion_callback=self.toggle_ime_conversion,
-                    app_monitor_callback=self.toggle_app_monitor
+                    app_monitor_callback=self.toggle_app_monitor,
+                    app_status_callback=self.process_monitor.get_app_status,
+                    app_reset_callback=self.process_monitor.reset_restart_policy
                 )
+                self.process_monitor.set_status_listener(self.tray_manager.refresh_menu)
+                self.screenshot_queue.set_status_listener(self.tray_manager.refresh_menu)
+                self.tray_manager.set_screenshot_status_callback(self.screenshot_queue.get_status)
                 
                 # 初始化输入法监控
                 self.ime_monitor = IMEMonitor(self.tray_manager)
+                self.tray_manager.set_ime_latency_callbacks(
+                    self.ime_monitor.set_latency_tracking,
+                    self.ime_monitor.get_latency_summary
+                )
                 logging.info("输入法监控已初始化")
                 
             except Exception as e:
@@ -208,9 +227,6 @@ class MainApplication:
         try:
             logging.info("开始启动应用程序")
             
-            # 启动截图队列监听
-            self.root.after(100, self.display_options_from_queue)
-            
             try:
                 self.toggle_screenshot(True)
                 logging.info("截图功能已启用")
@@ -257,49 +273,39 @@ class MainApplication:
                 sys.exit(1)  # 如果重启也失败，则退出
 
     def display_options_from_queue(self):
-        """处理截图队列"""
+        """显示流水线中等待的截图（放入截图时由虚拟事件触发）"""
         try:
-            while not self.screenshot_queue.empty():
-                try:
-                    img = self.screenshot_queue.get_nowait()  # 使用非阻塞方式获取
-                    if img:
-                        # 确保在主线程中创建窗口
-                        def show_options():
-                            try:
-                                options_window = OptionsWindow(self.root, img, self.screenshot_queue)
-                                # 确保窗口显示在前面
-                                if hasattr(options_window, 'options_root') and options_window.options_root:
-                                    options_window.options_root.lift()
-                                    options_window.options_root.focus_force()
-                                    # 设置窗口位置
-                                    screen_width = self.root.winfo_screenwidth()
-                                    screen_height = self.root.winfo_screenheight()
-                                    window_width = options_window.options_root.winfo_width()
-                                    window_height = options_window.options_root.winfo_height()
-                                    x = (screen_width - window_width) // 2
-                                    y = (screen_height - window_height) // 2
-                                    options_window.options_root.geometry(f"+{x}+{y}")
-                            except Exception as e:
-                                logging.error(f"创建选项窗口失败: {str(e)}")
-                        
-                        # 使用 after_idle 确保在主线程中创建窗口
-                        self.root.after_idle(show_options)
-                        
-                except queue.Empty:
+            while True:
+                slot = self.screenshot_queue.get_nowait()
+                if slot is None:
                     break
+                try:
+                    options_window = OptionsWindow(self.root, slot.img, self.screenshot_queue,
+                                                   self.screenshot_taker, slot)
+                    # 确保窗口显示在前面
+                    if hasattr(options_window, 'options_root') and options_window.options_root:
+                        options_window.options_root.lift()
+                        options_window.options_root.focus_force()
+                        # 设置窗口位置
+                        screen_width = self.root.winfo_screenwidth()
+                        screen_height = self.root.winfo_screenheight()
+                        window_width = options_window.options_root.winfo_width()
+                        window_height = options_window.options_root.winfo_height()
+                        x = (screen_width - window_width) // 2
+                        y = (screen_height - window_height) // 2
+                        options_window.options_root.geometry(f"+{x}+{y}")
+                    else:
+                        slot.release()
                 except Exception as e:
-                    logging.error(f"处理单个截图失败: {str(e)}")
-                    messagebox.showerror("错误", "处理截图失")
+                    logging.error(f"创建选项窗口失败: {str(e)}")
+                    slot.release()
             
-            # 继续监听队列
-            if self.root and self.root.winfo_exists():
-                self.root.after(100, self.display_options_from_queue)
+            status = self.screenshot_queue.get_status()
+            logging.info(f"截图流水线: 排队 {status['queued']}，已打开 {status['open']}/{status['max_in_flight']}，"
+                         f"占用内存 {status['bytes'] / 1e6:.1f}MB")
                 
         except Exception as e:
             logging.error(f"处理截图队列失败: {str(e)}")
-            # 出错后延长重试时间，避免频繁报错//、
-            if self.root and self.root.winfo_exists():
-                self.root.after(1000, self.display_options_from_queue)
 
     def toggle_screenshot(self, enabled):
         """切换截图功能"""
@@ -363,12 +369,10 @@ class MainApplication:
                 if apps:
                     # 先停止所有监控
                     self.process_monitor.stop_all()
-                    # 重新启动所启用的应用监听
-                    for app in apps:
-                        if app.get('enabled', True):
-                            # 使用配置中的所有设置启动监控
-                            self.process_monitor.start_monitoring(app)
-                            logging.info(f"启动应用监控: {app['name']}")
+                    # 重新启动所启用的应用监听，并发启动
+                    enabled_apps = [app for app in apps if app.get('enabled', True)]
+                    for process_name, success in self.process_monitor.start_many(enabled_apps).items():
+                        logging.info(f"启动应用监控: {process_name}, 结果: {success}")
                     logging.info("已启动应用监听")
                 else:
                     logging.info("没有需要监听的应用")
@@ -452,6 +456,10 @@ class MainApplication:
             if hasattr(self, 'tray_manager'):
                 self.tray_manager.icon.stop()
             
+            # 销毁截图选择窗口
+            if hasattr(self, 'screenshot_taker'):
+                self.screenshot_taker.cleanup()
+            
             # 销毁所有窗口
             if hasattr(self, 'root') and self.root:
                 # 销毁所有子窗口
@@ -472,16 +480,9 @@ class MainApplication:
         try:
             if self.config.get_app_monitor_enabled():
                 apps = self.config.get_monitored_apps()
-                for app in apps:
-                    # 检查进程是否已经在运行
-                    process_name = app['name']
-                    if not self.process_monitor.is_process_running(process_name):
-                        self.process_monitor.start_monitoring(app)
-                        logging.info(f"启动应用监控: {app['name']}")
-                    else:
-                        # 如果进程已经在运行，只添加到监控列表
-                        self.process_monitor.add_to_monitoring(app)
-                        logging.info(f"添加已运行的进程到监控: {app['name']}")
+                # 已运行的进程只加入监控，其余进程并发启动
+                for process_name, success in self.process_monitor.start_many(apps).items():
+                    logging.info(f"启动应用监控: {process_name}, 结果: {success}")
         except Exception as e:
             logging.error(f"启动应用监控失败: {str(e)}")
             raise
@@ -5,9 +5,11 @@
 from .ime_monitor import IMEMonitor
 from .process_monitor import ProcessMonitor
 from .screenshot import ScreenshotTaker
+from .screenshot_pipeline import ScreenshotPipeline
 
 __all__ = [
     'IMEMonitor',
     'ProcessMonitor',
-    'ScreenshotTaker'
+    'ScreenshotTaker',
+    'ScreenshotPipeline'
 ]
@@ -0,0 +1,193 @@
+import logging
+import threading
+import psutil
+
+
+class ExitWatcher:
+    """进程退出监听后端基类
+
+    进程退出时调用 on_exit(process_name, pid)，由 ProcessMonitor 立即安排检查。
+    """
+
+    def __init__(self):
+        self.on_exit = None
+
+    def bind(self, on_exit):
+        """设置进程退出回调"""
+        self.on_exit = on_exit
+
+    def watch(self, process_name, pid, proc=None, popen=None):
+        """开始监听进程退出，无法监听时返回 False"""
+        raise NotImplementedError
+
+    def unwatch(self, process_name):
+        """停止监听指定进程"""
+        raise NotImplementedError
+
+    def shutdown(self):
+        """停止所有监听"""
+        raise NotImplementedError
+
+    def _notify(self, process_name, pid):
+        """通知进程已退出"""
+        if self.on_exit is None:
+            return
+        try:
+            self.on_exit(process_name, pid)
+        except Exception as e:
+            logging.error(f"处理进程退出通知失败: {process_name}, {str(e)}")
+
+
+class ChildWaitWatcher(ExitWatcher):
+    """通过 Popen.wait 阻塞等待自己启动的子进程
+
+    每个子进程占用一个等待线程，线程数受 max_workers 限制，超出时返回 False 由调用方回退。
+    等待线程为守护线程，不会阻塞程序退出。
+    """
+
+    def __init__(self, max_workers=8):
+        super().__init__()
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._watches = {}  # process_name -> (pid, token)
+        self._active = 0
+        self._token_seq = 0
+
+    def watch(self, process_name, pid, proc=None, popen=None):
+        if popen is None:
+            return False
+        with self._lock:
+            if self._active >= self.max_workers:
+                return False
+            self._active += 1
+            self._token_seq += 1
+            token = self._token_seq
+            self._watches[process_name] = (pid, token)
+        threading.Thread(
+            target=self._wait_child,
+            args=(process_name, pid, popen, token),
+            name=f"exit-wait-{pid}",
+            daemon=True
+        ).start()
+        return True
+
+    def _wait_child(self, process_name, pid, popen, token):
+        """阻塞等待子进程退出"""
+        try:
+            popen.wait()
+        except Exception as e:
+            logging.debug(f"等待子进程 {process_name} (PID={pid}) 失败: {str(e)}")
+        finally:
+            with self._lock:
+                self._active -= 1
+                current = self._watches.get(process_name)
+                is_current = current is not None and current[1] == token
+                if is_current:
+                    self._watches.pop(process_name)
+        if is_current:
+            self._notify(process_name, pid)
+
+    def unwatch(self, process_name):
+        # 阻塞中的等待线程无法取消，只丢弃其通知；线程在子进程退出后自行结束
+        with self._lock:
+            self._watches.pop(process_name, None)
+
+    def shutdown(self):
+        with self._lock:
+            self._watches.clear()
+
+
+class PidPollWatcher(ExitWatcher):
+    """通用回退：单线程轮询已绑定的 PID
+
+    没有需要监听的进程时线程无限期休眠，不产生唤醒。
+    """
+
+    def __init__(self, poll_interval=0.5):
+        super().__init__()
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._watches = {}  # process_name -> (pid, psutil.Process)
+        self._thread = None
+        self._running = False
+
+    def watch(self, process_name, pid, proc=None, popen=None):
+        try:
+            if proc is None:
+                proc = psutil.Process(pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+        with self._cond:
+            self._watches[process_name] = (pid, proc)
+            self._running = True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._poll_loop, name="exit-poll", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def _poll_loop(self):
+        """轮询循环"""
+        while True:
+            with self._cond:
+                while self._running and not self._watches:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                watches = list(self._watches.items())
+
+            exited = []
+            for process_name, (pid, proc) in watches:
+                try:
+                    if not proc.is_running() or proc.status() == psutil.STATUS_ZOMBIE:
+                        exited.append((process_name, pid))
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    exited.append((process_name, pid))
+
+            for process_name, pid in exited:
+                with self._cond:
+                    current = self._watches.get(process_name)
+                    if current is None or current[0] != pid:
+                        continue
+                    self._watches.pop(process_name)
+                self._notify(process_name, pid)
+
+            with self._cond:
+                if self._running and self._watches:
+                    self._cond.wait(self.poll_interval)
+
+    def unwatch(self, process_name):
+        with self._cond:
+            self._watches.pop(process_name, None)
+
+    def shutdown(self):
+        with self._cond:
+            self._watches.clear()
+            self._running = False
+            self._cond.notify_all()
+
+
+class HybridExitWatcher(ExitWatcher):
+    """默认后端：自己启动的子进程阻塞等待，其余进程回退为 PID 轮询"""
+
+    def __init__(self, max_workers=8, poll_interval=0.5):
+        super().__init__()
+        self.child_watcher = ChildWaitWatcher(max_workers)
+        self.poll_watcher = PidPollWatcher(poll_interval)
+        self.child_watcher.bind(self._notify)
+        self.poll_watcher.bind(self._notify)
+
+    def watch(self, process_name, pid, proc=None, popen=None):
+        # 同一进程名只保留一个监听，先清除旧的
+        self.unwatch(process_name)
+        if self.child_watcher.watch(process_name, pid, proc, popen):
+            return True
+        return self.poll_watcher.watch(process_name, pid, proc, popen)
+
+    def unwatch(self, process_name):
+        self.child_watcher.unwatch(process_name)
+        self.poll_watcher.unwatch(process_name)
+
+    def shutdown(self):
+        self.child_watcher.shutdown()
+        self.poll_watcher.shutdown()
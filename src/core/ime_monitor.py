@@ -1,23 +1,55 @@
 import keyboard
 import logging
 import threading
-import time
-import ctypes
 from ..utils.config import Config
+from ..utils.hook_log import HookLogger
+from .ime_state import IMEStateCache
+from .key_table import build_conversion_table, build_modifier_scan_codes
+from .latency import LatencyTracker
+from .output_sink import create_default_sink
 
-# 加载需要的 DLL
-imm32 = ctypes.windll.imm32
-user32 = ctypes.windll.user32
+# 按键延迟统计的阶段
+LATENCY_STAGES = {
+    'total': '钩子总耗时',
+    'ime_check': '输入法检查',
+    'write': '输出字符'
+}
+
+# 按键延迟统计日志的输出间隔（秒）
+LATENCY_LOG_INTERVAL = 60
 
 class IMEMonitor:
-    def __init__(self, tray_manager):
+    def __init__(self, tray_manager, ime_backend=None, output_sink=None):
         logging.info("初始化IMEMonitor")
         self.config = Config()
         self.tray_manager = tray_manager
+        # 键盘钩子中的日志通过非阻塞通道输出，不在钩子内做文件 I/O
+        self.hook_log = HookLogger()
+        # 按前台窗口缓存的输入法状态，避免在键盘钩子中每次都同步查询目标窗口
+        self.ime_state = IMEStateCache(ime_backend)
+        # 替换字符的输出方式，输出数据在编译转换表时预先生成
+        self.output_sink = output_sink if output_sink is not None else create_default_sink()
+        # 编译后的按键转换表，配置变化时整体替换
+        self.conversion_table = None
+        self._modifier_scan_codes = frozenset()  # 修饰键的扫描码
+        self.reload_key_conversion()
+        # 按键转换配置保存后自动重新编译，所有映射共用一个按扫描码分发的钩子，无需重新注册
+        self.config.subscribe('key_conversion', self.reload_key_conversion)
+        # 键盘钩子中调用的函数，开启延迟统计时替换为计时包装；钩子本身始终不变，只替换这里的回调
+        self._hook_callback = self._handle_keypress
+        self._check_ime = self._is_chinese_ime
+        self._write_output = self._write_target
+        self._key_hook = None
+        self.keyboard_hooks = []  # 当前注册的全部钩子
+        self._held_modifiers = set()  # 当前按住的修饰键 (扫描码, 按键名)，左右键共用扫描码时分开记录
+        self._hook_lock = threading.Lock()  # 保护钩子的注册与移除
+        self.running = False
+        self.latency = None
+        self._latency_stop = None
+        if self.config.get_ime_latency_tracking():
+            self.set_latency_tracking(True)
         self.enabled = self.config.get_ime_conversion_enabled()
         logging.info(f"IME转换功能初始状态: {self.enabled}")
-        self.running = False
-        self.monitor_thread = None
         self.last_conversion_time = 0  # 添加时间戳记录
         
         # 更新托盘状态
@@ -49,145 +81,179 @@ class IMEMonitor:
         except Exception as e:
             logging.error(f"切换IME转换功能失败: {str(e)}", exc_info=True)
     
+    def reload_key_conversion(self):
+        """重新编译按键转换表并原子替换，无需重新注册键盘钩子"""
+        try:
+            table = build_conversion_table(self.config.get_key_conversion(),
+                                           prepare=self.output_sink.prepare)
+            if not self._modifier_scan_codes:
+                self._modifier_scan_codes = build_modifier_scan_codes()
+            # 新表编译完成后一次性替换，替换前的按键仍由旧表处理，不存在未处理的间隙
+            self.conversion_table = table
+            logging.info(f"按键转换表已更新: {len(table.scan_codes)} 个扫描码, {len(table.profiles)} 个应用配置")
+            return True
+        except Exception as e:
+            logging.error(f"编译按键转换表失败: {str(e)}")
+            return False
+    
+    def set_latency_tracking(self, enabled):
+        """开启或关闭按键延迟统计"""
+        try:
+            if enabled == (self.latency is not None):
+                return
+            if enabled:
+                tracker = LatencyTracker(LATENCY_STAGES)
+                self._check_ime = tracker.timed('ime_check', self._is_chinese_ime)
+                self._write_output = tracker.timed('write', self._write_target)
+                self._hook_callback = tracker.timed('total', self._handle_keypress)
+                self.latency = tracker
+                self._latency_stop = threading.Event()
+                threading.Thread(
+                    target=self._latency_log_loop,
+                    args=(tracker, self._latency_stop),
+                    daemon=True
+                ).start()
+            else:
+                self._latency_stop.set()
+                self._check_ime = self._is_chinese_ime
+                self._write_output = self._write_target
+                self._hook_callback = self._handle_keypress
+                self.latency = None
+            self.config.set_ime_latency_tracking(enabled)
+            logging.info(f"按键延迟统计已{'开启' if enabled else '关闭'}")
+        except Exception as e:
+            logging.error(f"切换按键延迟统计失败: {str(e)}")
+    
+    def get_latency_summary(self):
+        """获取按键延迟统计，未开启时返回 None"""
+        tracker = self.latency
+        return tracker.summary() if tracker is not None else None
+    
+    def _latency_log_loop(self, tracker, stop_event):
+        """定期输出按键延迟统计"""
+        last_count = 0
+        while not stop_event.wait(LATENCY_LOG_INTERVAL):
+            count = tracker.total_count()
+            if count != last_count:
+                last_count = count
+                logging.info(f"按键延迟统计 - {tracker.format_summary()}")
+    
     def start_monitoring(self):
-        """启动监控"""
+        """启动监控：直接注册键盘钩子"""
         try:
-            if not self.running:
+            with self._hook_lock:
+                if self.running:
+                    logging.info("IME监控已在运行中")
+                    return
+                self._register_hooks()
+                self.ime_state.start_prefetch()
                 self.running = True
-                self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-                self.monitor_thread.start()
-                logging.info("IME监控线程已启动")
-            else:
-                logging.info("IME监控已在运行中")
+                logging.info("IME监控已启动")
         except Exception as e:
             logging.error(f"启动IME监控失败: {str(e)}", exc_info=True)
     
     def stop_monitoring(self):
-        """停止监控"""
+        """停止监控：直接移除键盘钩子"""
         try:
-            logging.info("正在停止IME监控")
-            self.running = False
-            if self.monitor_thread:
-                self._safe_unhook_all()  # 使用安全的钩子移除方法
-                self.monitor_thread.join(timeout=1)
-                logging.info("IME监控线程已停止")
+            with self._hook_lock:
+                logging.info("正在停止IME监控")
+                self.running = False
+                self._safe_unhook_all()
+                self.ime_state.stop_prefetch()
+                self._held_modifiers.clear()
+                logging.info("IME监控已停止")
         except Exception as e:
             logging.error(f"停止IME监控失败: {str(e)}")
     
-    def _monitor_loop(self):
-        """监控循环"""
+    def _register_hooks(self):
+        """注册键盘钩子，失败时移除已注册的部分"""
         try:
-            # 获取源按键
-            source_key = self.config.get_source_key()
-            
-            # 注册键盘钩子
-            self.keyboard_hooks = []  # 存储当前类注册的钩子
-            
-            # 使用 try-except 包装每个钩子的注册
-            try:
-                self.keyboard_hooks.append(
-                    keyboard.on_press_key(source_key, self._handle_keypress, suppress=True)
-                )
-
-                # 定义需要注册的按键
-                keys_to_register = ['ctrl', 'alt', 'shift', 'win']
-                for key in keys_to_register:
-                    self.keyboard_hooks.append(
-                        keyboard.on_press_key(key, self._on_keyboard_press)
-                    )
-                    self.keyboard_hooks.append(
-                        keyboard.on_release_key(key, self._on_keyboard_release)
-                    )
-
-            except Exception as e:
-                logging.error(f"注册键盘钩子失败: {str(e)}")
-                self.running = False
-                return
-            
-            while self.running:
-                time.sleep(0.1)
-            
-            # 安全地移除钩子
-            self._safe_unhook_all()
-            
+            # 所有映射与修饰键状态共用一个钩子，按扫描码分发
+            self._key_hook = keyboard.hook(self._dispatch_key, suppress=True)
+            self.keyboard_hooks.append(self._key_hook)
         except Exception as e:
-            logging.error(f"IME监控循环出错: {str(e)}", exc_info=True)
-            self.running = False
+            logging.error(f"注册键盘钩子失败: {str(e)}")
             self._safe_unhook_all()
+            raise
     
     def _safe_unhook_all(self):
         """安全地移除所有钩子"""
-        if hasattr(self, 'keyboard_hooks'):
-            for hook in self.keyboard_hooks:
-                try:
-                    if hook in keyboard._hooks:  # 检查钩子是否仍然存在
-                        keyboard.unhook(hook)
-                except Exception as e:
-                    logging.error(f"移除钩子失败: {str(e)}")
-            self.keyboard_hooks.clear()
-    
-    def _on_keyboard_press(self, event):
-        """处理Shift键按下事件"""
-        self.keyboard_pressed = True
+        for hook in self.keyboard_hooks:
+            try:
+                if hook in keyboard._hooks:  # 检查钩子是否仍然存在
+                    keyboard.unhook(hook)
+            except Exception as e:
+                logging.error(f"移除钩子失败: {str(e)}")
+        self.keyboard_hooks.clear()
+        self._key_hook = None
     
-    def _on_keyboard_release(self, event):
-        """处理Shift键释放事件"""
-        self.keyboard_pressed = False
+    def _dispatch_key(self, event):
+        """键盘钩子入口，每次按键读取当前回调，切换回调时无需重新注册钩子"""
+        return self._hook_callback(event)
     
     def _is_chinese_ime(self):
         """检查当前是否为中文输入法状态"""
         try:
-            # 获取当前窗口句柄
-            hwnd = user32.GetForegroundWindow()
-            # 获取输入法上下文
-            ime_hwnd = imm32.ImmGetDefaultIMEWnd(hwnd)
-            
-            if ime_hwnd:
-                # 获取输入法状态
-                result = user32.SendMessageW(ime_hwnd, 0x0283, 0x0005, 0)
-                
-                # 检查输入法开启状态
-                is_ime_open = user32.SendMessageW(ime_hwnd, 0x0283, 0x0001, 0) != 0
-                
-                # 只要输入法是开启的就返回True
-                return is_ime_open
-            return False
+            return self.ime_state.is_open()
         except Exception as e:
-            logging.error(f"检查输入法状态失败: {str(e)}", exc_info=True)
+            self.hook_log.error(f"检查输入法状态失败: {str(e)}", key='ime_check', exc_info=True)
             return False
     
+    def _write_target(self, output):
+        """输出预先准备好的目标字符"""
+        self.output_sink.send(output)
+    
     def _handle_keypress(self, event):
         """处理按键事件"""
         try:
+            # 未映射的按键直接放行，修饰键只更新按住状态
+            table = self.conversion_table
+            if event.scan_code not in table.scan_codes:
+                if event.scan_code in self._modifier_scan_codes:
+                    key = (event.scan_code, event.name)
+                    if event.event_type == keyboard.KEY_DOWN:
+                        self._held_modifiers.add(key)
+                    else:
+                        if key in self._held_modifiers:
+                            self._held_modifiers.discard(key)
+                        else:
+                            # 释放时的按键名与按下时不一致，清除该扫描码的全部记录，避免修饰键一直处于按住状态
+                            self._held_modifiers = {held for held in self._held_modifiers
+                                                    if held[0] != event.scan_code}
+                        # Shift、Ctrl+空格、Win+空格等组合可能切换了输入法状态
+                        self.ime_state.invalidate()
+                return True
             
             if not self.enabled:
-                logging.info("IME转换功能未启用，不处理按键")
+                self.hook_log.debug("IME转换功能未启用，不处理按键")
                 return True
                 
             if event.event_type != keyboard.KEY_DOWN:
-                logging.info("非按下事件，不处理")
                 return True
 
-            # 检查是否正在按住Shift键
-            if hasattr(self, 'keyboard_pressed') and self.keyboard_pressed:
+            # 按住任一修饰键时不替换
+            if self._held_modifiers:
                 return True  # 让系统处理原始按键
 
-            # 检查是否为中文输入法状态
             try:
-                if self._is_chinese_ime():
-                    # 获取目标字符
-                    target_char = self.config.get_target_char()
-                    keyboard.write(target_char)  # 输入目标字符
+                # 先按前台应用选择映射，禁用替换或未映射该按键的应用不查询输入法状态
+                process_name = self.ime_state.foreground_process()
+                if process_name is None:
+                    return True  # 前台应用尚未查询到，不确定是否禁用替换，原样放行
+                output = table.for_process(process_name).get(event.scan_code)
+                if output is None:
+                    return True
+                # 检查是否为中文输入法状态
+                if self._check_ime():
+                    self._write_output(output)  # 输入目标字符
                     return False  # 阻止原始按键事件
-                else:
-                    pass
             except Exception as e:
-                logging.error(f"检查输入法状态失败: {str(e)}")
+                self.hook_log.error(f"输出目标字符失败: {str(e)}", key='write')
                 return True  # 出错时让系统处理原始按键
                 
             return True
 
         except Exception as e:
-            logging.error(f"处理按键事件失败: {str(e)}")
+            self.hook_log.error(f"处理按键事件失败: {str(e)}", key='keypress')
             # 出错时让系统处理原始按键，避免按键卡死
             return True
\ No newline at end of file
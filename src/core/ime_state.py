@@ -0,0 +1,354 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from ..utils.hook_log import HookLogger
+
+# WM_IME_CONTROL 消息及其子命令
+WM_IME_CONTROL = 0x0283
+IMC_GETCONVERSIONMODE = 0x0001
+
+# SendMessageTimeoutW 参数：目标窗口无响应时立即返回，最长等待时间（毫秒）
+SMTO_ABORTIFHUNG = 0x0002
+IME_QUERY_TIMEOUT_MS = 30
+
+# 查询进程路径所需的访问权限
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+# PID -> 进程名缓存的容量
+PROCESS_NAME_CACHE_SIZE = 64
+
+# 输入法状态缓存的最长有效期（秒），用于兜底通过鼠标点击输入法状态栏等无按键的切换
+IME_STATE_TTL = 1.0
+
+# SetWinEventHook 参数：前台窗口变化事件，回调在注册线程的消息循环中执行
+EVENT_SYSTEM_FOREGROUND = 0x0003
+WINEVENT_OUTOFCONTEXT = 0x0000
+WM_QUIT = 0x0012
+
+
+class IMEBackend:
+    """输入法状态查询后端接口，便于在非 Windows 环境下用假实现替换"""
+
+    def get_foreground_window(self):
+        """获取前台窗口句柄"""
+        raise NotImplementedError
+
+    def query_ime_open(self, hwnd):
+        """查询窗口的输入法是否处于中文输入状态，查询失败或超时返回 None"""
+        raise NotImplementedError
+
+    def get_window_process_id(self, hwnd):
+        """获取窗口所属进程的 PID"""
+        raise NotImplementedError
+
+    def get_process_name(self, pid):
+        """获取进程的可执行文件名，失败时返回 None"""
+        raise NotImplementedError
+
+    def watch_foreground(self, on_change):
+        """前台窗口变化时调用 on_change()，返回停止监听的函数；不支持时返回 None"""
+        return None
+
+
+class Win32IMEBackend(IMEBackend):
+    """基于 Win32 API 的实现，DLL 在首次使用时加载"""
+
+    def __init__(self, timeout_ms=IME_QUERY_TIMEOUT_MS):
+        self.timeout_ms = timeout_ms
+        self._user32 = None
+        self._imm32 = None
+        self._kernel32 = None
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        """加载需要的 DLL 并声明函数签名"""
+        if self._user32 is not None:
+            return
+        with self._load_lock:
+            if self._user32 is not None:
+                return
+            import ctypes
+            from ctypes import wintypes
+            user32 = ctypes.windll.user32
+            imm32 = ctypes.windll.imm32
+            kernel32 = ctypes.windll.kernel32
+
+            user32.GetForegroundWindow.restype = wintypes.HWND
+            user32.GetForegroundWindow.argtypes = []
+            imm32.ImmGetDefaultIMEWnd.restype = wintypes.HWND
+            imm32.ImmGetDefaultIMEWnd.argtypes = [wintypes.HWND]
+            user32.SendMessageTimeoutW.restype = ctypes.c_ssize_t
+            user32.SendMessageTimeoutW.argtypes = [
+                wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM,
+                wintypes.UINT, wintypes.UINT, ctypes.POINTER(ctypes.c_size_t)
+            ]
+            user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+            user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+            kernel32.OpenProcess.restype = wintypes.HANDLE
+            kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+            kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+            kernel32.QueryFullProcessImageNameW.argtypes = [
+                wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)
+            ]
+            kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+            self._win_event_proc = ctypes.WINFUNCTYPE(
+                None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+            )
+            user32.SetWinEventHook.restype = wintypes.HANDLE
+            user32.SetWinEventHook.argtypes = [
+                wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, self._win_event_proc,
+                wintypes.DWORD, wintypes.DWORD, wintypes.DWORD
+            ]
+            user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+            user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+            user32.PostThreadMessageW.argtypes = [wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+            self._msg_type = wintypes.MSG
+            self._result_type = ctypes.c_size_t
+            self._dword = wintypes.DWORD
+            self._byref = ctypes.byref
+            self._unicode_buffer = ctypes.create_unicode_buffer
+            self._kernel32 = kernel32
+            self._imm32 = imm32
+            self._user32 = user32
+
+    def get_foreground_window(self):
+        self._load()
+        return self._user32.GetForegroundWindow()
+
+    def query_ime_open(self, hwnd):
+        self._load()
+        ime_hwnd = self._imm32.ImmGetDefaultIMEWnd(hwnd)
+        if not ime_hwnd:
+            return False
+
+        # 转换模式非0表示处于中文（本地语言）输入状态；目标窗口无响应时超时返回，不阻塞键盘钩子
+        result = self._result_type()
+        ok = self._user32.SendMessageTimeoutW(
+            ime_hwnd, WM_IME_CONTROL, IMC_GETCONVERSIONMODE, 0,
+            SMTO_ABORTIFHUNG, self.timeout_ms, self._byref(result)
+        )
+        if not ok:
+            return None
+        return result.value != 0
+
+    def get_window_process_id(self, hwnd):
+        self._load()
+        pid = self._dword()
+        self._user32.GetWindowThreadProcessId(hwnd, self._byref(pid))
+        return pid.value or None
+
+    def get_process_name(self, pid):
+        self._load()
+        handle = self._kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return None
+        try:
+            size = self._dword(260)
+            buffer = self._unicode_buffer(size.value)
+            if not self._kernel32.QueryFullProcessImageNameW(handle, 0, buffer, self._byref(size)):
+                return None
+            return os.path.basename(buffer.value)
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+    def watch_foreground(self, on_change):
+        """通过 SetWinEventHook 监听前台窗口变化，监听线程阻塞在消息循环中，没有事件时不唤醒"""
+        self._load()
+        ready = threading.Event()
+        state = {'hook': None, 'thread_id': None}
+
+        def callback(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+            try:
+                on_change()
+            except Exception as e:
+                logging.error(f"处理前台窗口变化失败: {str(e)}")
+
+        def run():
+            proc = self._win_event_proc(callback)  # 回调对象需在监听期间保持引用
+            state['thread_id'] = self._kernel32.GetCurrentThreadId()
+            state['hook'] = self._user32.SetWinEventHook(
+                EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, None, proc, 0, 0, WINEVENT_OUTOFCONTEXT
+            )
+            ready.set()
+            if not state['hook']:
+                return
+            try:
+                msg = self._msg_type()
+                while self._user32.GetMessageW(self._byref(msg), None, 0, 0) > 0:
+                    pass
+            finally:
+                self._user32.UnhookWinEvent(state['hook'])
+
+        threading.Thread(target=run, name="foreground-watch", daemon=True).start()
+        ready.wait()
+        if not state['hook']:
+            logging.warning("注册前台窗口变化通知失败")
+            return None
+        return lambda: self._user32.PostThreadMessageW(state['thread_id'], WM_QUIT, 0, 0)
+
+
+class ProcessNameCache:
+    """PID -> 进程名（小写）的 LRU 缓存，同一应用再次获得焦点时无需查询进程
+
+    键盘钩子中只用 peek 读取缓存，查询进程（get）在后台线程中进行。
+    """
+
+    def __init__(self, resolve, capacity=PROCESS_NAME_CACHE_SIZE):
+        self._resolve = resolve
+        self.capacity = capacity
+        self._names = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def peek(self, pid):
+        """只读取缓存，未缓存时返回 None，不查询进程"""
+        if not pid:
+            return None
+        with self._lock:
+            name = self._names.get(pid)
+            if name is None:
+                self.stats['misses'] += 1
+                return None
+            self._names.move_to_end(pid)
+            self.stats['hits'] += 1
+            return name
+
+    def get(self, pid):
+        """读取缓存，未缓存时查询进程并写入缓存"""
+        if not pid:
+            return None
+        with self._lock:
+            name = self._names.get(pid)
+            if name is not None:
+                self._names.move_to_end(pid)
+                return name
+
+        try:
+            name = self._resolve(pid)
+        except Exception:
+            name = None
+        name = name.lower() if name else ''  # 查询失败也缓存，避免反复查询无权限的进程
+        with self._lock:
+            self._names[pid] = name
+            if len(self._names) > self.capacity:
+                self._names.popitem(last=False)
+        return name
+
+    def clear(self):
+        with self._lock:
+            self._names.clear()
+
+
+class IMEStateCache:
+    """按前台窗口缓存输入法状态与前台应用的进程名
+
+    前台窗口变化、按下输入法切换键（invalidate）或超过有效期时重新查询输入法状态；
+    进程名由后台线程在前台窗口变化时查询并写入 PID 缓存，键盘钩子中只读取缓存；
+    后台线程只在收到前台窗口变化通知或钩子遇到未缓存的进程时唤醒，没有定时轮询。
+    """
+
+    def __init__(self, backend=None, ttl=IME_STATE_TTL):
+        self.backend = backend if backend is not None else Win32IMEBackend()
+        self.ttl = ttl
+        self._hwnd = None
+        self._is_open = False
+        self._expires_at = 0.0
+        self._process_hwnd = None
+        self._process_pid = None
+        self.process_name = None  # 前台窗口所属进程名（小写），调用 foreground_process 后更新
+        self.process_names = ProcessNameCache(self.backend.get_process_name)
+        self._prefetch_wake = threading.Event()
+        self._prefetch_stop = None
+        self._stop_foreground_watch = None
+        self.stats = {'hits': 0, 'misses': 0, 'timeouts': 0}
+        self.hook_log = HookLogger()  # 在键盘钩子中调用，日志不能阻塞
+
+    def is_open(self):
+        """获取前台窗口的输入法状态"""
+        hwnd = self.backend.get_foreground_window()
+        now = time.monotonic()
+        if hwnd == self._hwnd and now < self._expires_at:
+            self.stats['hits'] += 1
+            return self._is_open
+
+        self.stats['misses'] += 1
+        is_open = self.backend.query_ime_open(hwnd) if hwnd else False
+        if is_open is None:
+            # 查询超时：窗口可能无响应，按非中文状态处理并缓存，避免每次按键都等待超时
+            self.stats['timeouts'] += 1
+            self.hook_log.debug(f"查询输入法状态超时: hwnd={hwnd}", key='ime_timeout')
+            is_open = False
+        self._hwnd = hwnd
+        self._is_open = is_open
+        self._expires_at = now + self.ttl
+        return is_open
+
+    def invalidate(self):
+        """使缓存失效，下次查询时重新获取"""
+        self._expires_at = 0.0
+
+    def foreground_process(self):
+        """获取前台窗口所属进程名（小写），只读取缓存
+
+        尚未查询到时返回 None 并唤醒后台线程查询，不在键盘钩子中打开进程；查询失败的进程返回空字符串。
+        """
+        hwnd = self.backend.get_foreground_window()
+        if hwnd != self._process_hwnd:
+            self._process_hwnd = hwnd
+            self._process_pid = self.backend.get_window_process_id(hwnd) if hwnd else None
+            self.process_name = None
+        if self.process_name is None and self._process_pid:
+            self.process_name = self.process_names.peek(self._process_pid)
+            if self.process_name is None:
+                self._prefetch_wake.set()
+        return self.process_name
+
+    def prefetch(self):
+        """查询前台窗口所属进程名并写入缓存（在后台线程中调用）"""
+        hwnd = self.backend.get_foreground_window()
+        pid = self.backend.get_window_process_id(hwnd) if hwnd else None
+        return self.process_names.get(pid)
+
+    def start_prefetch(self):
+        """启动后台线程，前台窗口变化时预先查询进程名"""
+        if self._prefetch_stop is not None:
+            return
+        self._prefetch_stop = threading.Event()
+        self._prefetch_wake = threading.Event()
+        threading.Thread(
+            target=self._prefetch_loop,
+            args=(self._prefetch_stop, self._prefetch_wake),
+            name="ime-prefetch",
+            daemon=True
+        ).start()
+        try:
+            self._stop_foreground_watch = self.backend.watch_foreground(self._prefetch_wake.set)
+        except Exception as e:
+            logging.error(f"监听前台窗口变化失败: {str(e)}")
+
+    def stop_prefetch(self):
+        """停止预先查询进程名的后台线程"""
+        if self._prefetch_stop is None:
+            return
+        if self._stop_foreground_watch is not None:
+            try:
+                self._stop_foreground_watch()
+            except Exception as e:
+                logging.error(f"停止监听前台窗口变化失败: {str(e)}")
+            self._stop_foreground_watch = None
+        self._prefetch_stop.set()
+        self._prefetch_wake.set()
+        self._prefetch_stop = None
+
+    def _prefetch_loop(self, stop_event, wake_event):
+        """启动时查询一次，之后只在被唤醒时查询"""
+        while not stop_event.is_set():
+            try:
+                self.prefetch()
+            except Exception as e:
+                logging.debug(f"查询前台进程名失败: {str(e)}")
+            wake_event.wait()
+            wake_event.clear()
@@ -0,0 +1,115 @@
+import logging
+
+# 按住时不做替换的修饰键，左右分开记录
+MODIFIER_KEYS = (
+    'left ctrl', 'right ctrl',
+    'left shift', 'right shift',
+    'left alt', 'right alt',
+    'left windows', 'right windows'
+)
+
+
+class KeyConversionTable:
+    """编译后的按键转换表：扫描码 -> 输出数据
+
+    default 为全局映射，profiles 为按进程名（小写）合并了全局映射后的完整映射，
+    禁用替换的应用对应空映射。scan_codes 为所有映射中出现过的扫描码，用于快速放行无关按键。
+    输出数据由输出方式的 prepare 预先生成（默认为输出字符本身）。
+    表创建后不再修改，配置变化时整体替换，键盘钩子中无需加锁。
+    """
+
+    __slots__ = ('default', 'profiles', 'scan_codes', 'mapping_count')
+
+    def __init__(self, default, profiles=None, mapping_count=0):
+        self.default = default
+        self.profiles = profiles or {}
+        scan_codes = set(default)
+        for mapping in self.profiles.values():
+            scan_codes.update(mapping)
+        self.scan_codes = frozenset(scan_codes)
+        self.mapping_count = mapping_count
+
+    def for_process(self, process_name):
+        """获取指定进程使用的映射，没有覆盖时返回全局映射"""
+        if process_name and self.profiles:
+            return self.profiles.get(process_name.lower(), self.default)
+        return self.default
+
+    def lookup(self, scan_code, process_name=None):
+        """查找扫描码对应的输出字符，未映射时返回 None"""
+        return self.for_process(process_name).get(scan_code)
+
+    def __len__(self):
+        return len(self.default)
+
+
+def _default_resolver(key):
+    import keyboard
+    return keyboard.key_to_scan_codes(key)
+
+
+def compile_mappings(mappings, resolve_scan_codes=None, base=None, prepare=None):
+    """把 [{'source_key', 'target_char'}] 编译为扫描码映射，后面的映射覆盖前面的
+
+    prepare 用于把输出字符转换为输出数据，相同的字符只转换一次。
+    """
+    resolve_scan_codes = resolve_scan_codes or _default_resolver
+    prepared = {}
+    table = dict(base) if base else {}
+    for mapping in mappings:
+        source_key = mapping.get('source_key')
+        target_char = mapping.get('target_char')
+        if not source_key or target_char is None:
+            logging.warning(f"忽略无效的按键映射: {mapping}")
+            continue
+        try:
+            scan_codes = resolve_scan_codes(source_key)
+        except Exception as e:
+            logging.error(f"解析按键 {source_key} 失败: {str(e)}")
+            continue
+        if prepare is not None:
+            if target_char not in prepared:
+                prepared[target_char] = prepare(target_char)
+            output = prepared[target_char]
+        else:
+            output = target_char
+        for scan_code in scan_codes:
+            table[scan_code] = output
+    return table
+
+
+def build_conversion_table(key_conversion, resolve_scan_codes=None, prepare=None):
+    """根据 key_conversion 配置编译按键转换表"""
+    mappings = [{
+        'source_key': key_conversion.get('source_key', '/'),
+        'target_char': key_conversion.get('target_char', '、')
+    }]
+    mappings.extend(key_conversion.get('mappings', []))
+    default = compile_mappings(mappings, resolve_scan_codes, prepare=prepare)
+
+    profiles = {}
+    mapping_count = len(mappings)
+    for process_name, profile in key_conversion.get('profiles', {}).items():
+        if not profile.get('enabled', True):
+            profiles[process_name.lower()] = {}  # 该应用中不做替换
+            continue
+        profile_mappings = profile.get('mappings', [])
+        profiles[process_name.lower()] = compile_mappings(profile_mappings, resolve_scan_codes, default, prepare)
+        mapping_count += len(profile_mappings)
+    return KeyConversionTable(default, profiles, mapping_count)
+
+
+def build_modifier_scan_codes(resolve_scan_codes=None):
+    """解析所有修饰键的扫描码
+
+    左右键可能共用扫描码（取决于键盘布局和驱动，如左右 Ctrl、Alt 仅扩展标志不同），
+    因此按住状态需要按扫描码与按键名一起记录。
+    """
+    resolve_scan_codes = resolve_scan_codes or _default_resolver
+    scan_codes = set()
+    for key in MODIFIER_KEYS:
+        try:
+            scan_codes.update(resolve_scan_codes(key))
+        except Exception as e:
+            logging.debug(f"解析修饰键 {key} 失败: {str(e)}")
+    return frozenset(scan_codes)
@@ -0,0 +1,125 @@
+import time
+import functools
+
+# 直方图精度：每个2的幂区间分为 2^SUB_BUCKET_BITS 个子桶，相对误差约 1/32
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+# 可记录的最大值（纳秒），约 68 秒，超过时记入最后一个桶
+MAX_TRACKABLE_NS = 1 << 36
+
+
+def _bucket_index(value):
+    """计算值所在的桶：小于 2*SUB_BUCKET_COUNT 的值精确记录，之后按对数-线性分桶"""
+    if value < 2 * SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return 2 * SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_COUNT + (value >> shift) - SUB_BUCKET_COUNT
+
+
+def _bucket_upper(index):
+    """桶内的最大值"""
+    if index < 2 * SUB_BUCKET_COUNT:
+        return index
+    shift = (index - 2 * SUB_BUCKET_COUNT) // SUB_BUCKET_COUNT + 1
+    sub = (index - 2 * SUB_BUCKET_COUNT) % SUB_BUCKET_COUNT + SUB_BUCKET_COUNT
+    return ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """HDR 风格的延迟直方图（单位纳秒），记录为 O(1)，内存固定"""
+
+    def __init__(self):
+        self._counts = [0] * (_bucket_index(MAX_TRACKABLE_NS) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        """记录一个值（纳秒）"""
+        if value < 0:
+            value = 0
+        elif value > MAX_TRACKABLE_NS:
+            value = MAX_TRACKABLE_NS
+        self._counts[_bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """计算百分位数（纳秒），返回所在桶的上界，不超过记录到的最大值"""
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * pct / 100 + 0.5))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(_bucket_upper(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def summary(self):
+        """获取统计摘要，时间单位为毫秒"""
+        return {
+            'count': self.count,
+            'p50': self.percentile(50) / 1e6,
+            'p99': self.percentile(99) / 1e6,
+            'max': self.max / 1e6,
+            'mean': self.mean() / 1e6
+        }
+
+
+class LatencyTracker:
+    """一组命名的延迟直方图，通过 timed 包装被测函数"""
+
+    def __init__(self, labels):
+        self.labels = dict(labels)  # 名称 -> 显示名称
+        self.histograms = {name: LatencyHistogram() for name in self.labels}
+
+    def timed(self, name, func):
+        """返回记录耗时的包装函数"""
+        record = self.histograms[name].record
+        perf_counter_ns = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(perf_counter_ns() - start)
+        return wrapper
+
+    def summary(self):
+        """获取所有直方图的统计摘要"""
+        summary = {}
+        for name, label in self.labels.items():
+            summary[name] = self.histograms[name].summary()
+            summary[name]['label'] = label
+        return summary
+
+    def total_count(self):
+        return sum(histogram.count for histogram in self.histograms.values())
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def format_summary(self):
+        """格式化为一行日志"""
+        parts = []
+        for name, stats in self.summary().items():
+            if not stats['count']:
+                continue
+            parts.append(f"{stats['label']}: n={stats['count']} p50={stats['p50']:.3f}ms "
+                         f"p99={stats['p99']:.3f}ms max={stats['max']:.3f}ms")
+        return '; '.join(parts) if parts else '无数据'
@@ -0,0 +1,124 @@
+import ctypes
+import sys
+import threading
+
+# SendInput 常量
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ('wVk', ctypes.c_uint16),
+        ('wScan', ctypes.c_uint16),
+        ('dwFlags', ctypes.c_uint32),
+        ('time', ctypes.c_uint32),
+        ('dwExtraInfo', ctypes.c_size_t)
+    ]
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ('dx', ctypes.c_int32),
+        ('dy', ctypes.c_int32),
+        ('mouseData', ctypes.c_uint32),
+        ('dwFlags', ctypes.c_uint32),
+        ('time', ctypes.c_uint32),
+        ('dwExtraInfo', ctypes.c_size_t)
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    # 联合体需包含最大的 MOUSEINPUT，保证 sizeof(INPUT) 与系统一致
+    _fields_ = [('ki', KEYBDINPUT), ('mi', MOUSEINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_uint32), ('union', _INPUTUNION)]
+
+
+def build_unicode_inputs(text):
+    """把文本编码为 KEYEVENTF_UNICODE 输入序列（每个 UTF-16 码元一次按下和释放）"""
+    data = text.encode('utf-16-le')
+    units = [data[i] | (data[i + 1] << 8) for i in range(0, len(data), 2)]
+    inputs = (INPUT * (len(units) * 2))()
+    for i, unit in enumerate(units):
+        for j, flags in enumerate((KEYEVENTF_UNICODE, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP)):
+            item = inputs[i * 2 + j]
+            item.type = INPUT_KEYBOARD
+            item.union.ki.wScan = unit
+            item.union.ki.dwFlags = flags
+    return inputs
+
+
+class OutputSink:
+    """替换字符的输出方式
+
+    prepare 在编译转换表时调用一次，把文本预先转换为输出所需的数据；
+    send 在键盘钩子中调用，只发送预先准备好的数据。
+    """
+
+    def prepare(self, text):
+        return text
+
+    def send(self, payload):
+        raise NotImplementedError
+
+
+class KeyboardWriteSink(OutputSink):
+    """通过 keyboard.write 输出，适用于所有平台"""
+
+    def send(self, payload):
+        import keyboard
+        keyboard.write(payload)
+
+
+class UnicodeInputSink(OutputSink):
+    """Windows 下用一次 SendInput 调用发送预先构建的 Unicode 输入序列
+
+    与 keyboard.write 相比省去了每次按键的状态保存与恢复，以及逐字符构建输入结构。
+    """
+
+    def __init__(self, send_input=None):
+        self._send_input = send_input
+        self._load_lock = threading.Lock()
+        self._input_size = ctypes.sizeof(INPUT)
+
+    def _load(self):
+        """首次使用时加载 SendInput"""
+        with self._load_lock:
+            if self._send_input is None:
+                user32 = ctypes.windll.user32
+                user32.SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(INPUT), ctypes.c_int]
+                user32.SendInput.restype = ctypes.c_uint
+                self._send_input = user32.SendInput
+        return self._send_input
+
+    def prepare(self, text):
+        inputs = build_unicode_inputs(text)
+        return (len(inputs), inputs)
+
+    def send(self, payload):
+        count, inputs = payload
+        send_input = self._send_input or self._load()
+        sent = send_input(count, inputs, self._input_size)
+        if sent != count:
+            raise OSError(f"SendInput 只发送了 {sent}/{count} 个输入")
+
+
+class RecordingSink(OutputSink):
+    """只记录输出内容，用于非 Windows 环境下的测试"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, payload):
+        self.sent.append(payload)
+
+
+def create_default_sink():
+    """根据平台选择输出方式"""
+    if sys.platform == 'win32':
+        return UnicodeInputSink()
+    return KeyboardWriteSink()
@@ -3,9 +3,29 @@ import time
 import logging
 import subprocess
 import os
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from ..utils.config import Config
+from .process_snapshot import ProcessSnapshot
+from .exit_watcher import HybridExitWatcher
+from .restart_policy import RestartPolicy, STATE_PARKED, STATE_DISABLED
+from .process_telemetry import TelemetrySampler
+from .resource_limits import ResourceLimits
 import threading
 
+# 进程表快照的最长复用时间（秒），超过后重新扫描
+SNAPSHOT_MAX_AGE = 0.5
+
+# 调度合并窗口（秒），截止时间相近的检查合并到同一轮执行
+SCHEDULE_SLACK = 0.05
+
+# 并发启动进程的最大线程数
+LAUNCH_WORKERS = 4
+
+# 资源超限重启时等待进程正常退出的时间（秒），超时后强制结束
+TERMINATE_TIMEOUT = 5
+
 class ProcessMonitor:
     _instance = None
     _lock = threading.Lock()
@@ -23,48 +43,152 @@ class ProcessMonitor:
                     self.monitored_processes = {}
                     self.running = False
                     self.monitor_thread = None
+                    # 按下次检查时间排序的最小堆: (deadline, seq, process_name)
+                    self._schedule = []
+                    self._schedule_seq = itertools.count()
+                    self._schedule_cond = threading.Condition()
+                    self._snapshot = None
+                    self._snapshot_lock = threading.Lock()
+                    self.snapshot_stats = {
+                        'scans': 0,            # 进程表完整遍历次数
+                        'hits': 0,             # 复用快照的查询次数
+                        'misses': 0,           # 需要重新扫描的查询次数
+                        'scan_time_total': 0.0,  # 累计扫描耗时（秒）
+                        'scan_time_last': 0.0    # 最近一次扫描耗时（秒）
+                    }
+                    # 进程退出监听后端，退出时立即安排检查而不必等到下个监听间隔
+                    self.exit_watcher = HybridExitWatcher()
+                    self.exit_watcher.bind(self._on_process_exit)
+                    # 重启策略状态变化时的回调（用于刷新托盘菜单）
+                    self._status_listener = None
+                    # 进程启动线程池，避免启动缓慢的程序阻塞监控线程
+                    self._launch_executor = ThreadPoolExecutor(
+                        max_workers=LAUNCH_WORKERS,
+                        thread_name_prefix="process-launcher"
+                    )
+                    self._launch_lock = threading.Lock()
+                    self.launch_stats = {
+                        'launches': 0,            # 成功启动次数
+                        'failures': 0,            # 启动失败次数
+                        'latency_total': 0.0,     # 累计启动耗时（秒）
+                        'latency_last': 0.0,      # 最近一次启动耗时（秒）
+                        'latency_max': 0.0        # 最大启动耗时（秒）
+                    }
+                    # 资源占用采样，复用监控检查时已绑定的进程
+                    config = Config()
+                    self.telemetry = TelemetrySampler(
+                        config.get_telemetry_interval(),
+                        config.get_telemetry_history()
+                    )
                     self._initialized = True
                     logging.info("进程监控器已初始化")
 
+    def set_exit_watcher(self, watcher):
+        """替换进程退出监听后端，已绑定的进程会注册到新后端"""
+        try:
+            old_watcher = self.exit_watcher
+            watcher.bind(self._on_process_exit)
+            self.exit_watcher = watcher
+            if old_watcher is not None:
+                old_watcher.shutdown()
+            for process_name, info in list(self.monitored_processes.items()):
+                if info.get('pid'):
+                    watcher.watch(process_name, info['pid'], info.get('proc'), info.get('popen'))
+            logging.info(f"进程退出监听后端已切换为: {type(watcher).__name__}")
+        except Exception as e:
+            logging.error(f"切换进程退出监听后端失败: {str(e)}")
+
+    def _on_process_exit(self, process_name, pid):
+        """进程退出通知：立即安排检查，由监控线程负责重启"""
+        info = self.monitored_processes.get(process_name)
+        if info is None or info.get('pid') != pid:
+            return
+        logging.info(f"收到进程退出通知: {process_name} (PID={pid})")
+        self._schedule_check(process_name, time.monotonic())
+
     def start_monitoring(self, app_config):
         """启动一个新的监控进程"""
         try:
-            if not os.path.exists(app_config['path']):
-                logging.error(f"进程路径不存在: {app_config['path']}")
-                return False
+            return self.start_many([app_config]).get(app_config['name'], False)
+        except Exception as e:
+            logging.error(f"启动监控失败: {str(e)}")
+            return False
 
-            process_name = app_config['name']
-            
-            # 检查是否已经在监控此进程
-            if process_name in self.monitored_processes:
-                logging.info(f"进程 {process_name} 已在监控中")
-                return True
+    def start_many(self, app_configs):
+        """并发启动一批应用并加入监控，所有应用共享同一个进程表快照
 
-            # 检查进程是否已经在运行
-            if self.is_process_running(process_name):
-                return self.add_to_monitoring(app_config)
-
-            self.monitored_processes[process_name] = {
-                'path': app_config['path'],
-                'check_interval': app_config['check_interval'],
-                'restart_interval': app_config['restart_interval'],
-                'minimize_to_tray': app_config['minimize_to_tray'],
-                'last_check': 0,  # 初始化最后检查时间
-                'last_restart': 0  # 初始化最后重启时间
-            }
+        Returns:
+            dict: 进程名 -> 是否成功加入监控
+        """
+        results = {}
+        futures = {}
+        try:
+            snapshot = self._get_snapshot()
+            for app_config in app_configs:
+                process_name = app_config.get('name', '')
+                try:
+                    if not os.path.exists(app_config['path']):
+                        logging.error(f"进程路径不存在: {app_config['path']}")
+                        results[process_name] = False
+                        continue
+                    
+                    # 检查是否已经在监控此进程
+                    if process_name in self.monitored_processes:
+                        logging.info(f"进程 {process_name} 已在监控中")
+                        results[process_name] = True
+                        continue
+                    
+                    # 进程已经在运行时只绑定 PID，否则提交到启动线程池
+                    info = self._create_entry(app_config)
+                    self.monitored_processes[process_name] = info
+                    if self._pin_from_snapshot(process_name, info, snapshot):
+                        info['last_restart'] = time.time()
+                        logging.info(f"添加已运行的进程到监控: {process_name}")
+                        results[process_name] = True
+                    else:
+                        futures[process_name] = self._launch_async(process_name, info, snapshot)
+                except Exception as e:
+                    logging.error(f"启动监控 {process_name} 失败: {str(e)}")
+                    results[process_name] = False
             
-            # 启动进程
-            self.start_process(app_config['path'], app_config['minimize_to_tray'])
+            # 等待本批次的启动全部完成
+            for process_name, future in futures.items():
+                try:
+                    results[process_name] = future.result()
+                except Exception as e:
+                    logging.error(f"启动进程 {process_name} 失败: {str(e)}")
+                    results[process_name] = False
             
-            # 如果监控线程未运行，启动它
+            # 加入调度，如果监控线程未运行，启动它
+            now = time.monotonic()
+            for process_name in results:
+                if process_name in self.monitored_processes:
+                    self._schedule_check(process_name, now)
             if not self.running:
                 self.start_monitor_thread()
-            
-            return True
-            
         except Exception as e:
-            logging.error(f"启动监控失败: {str(e)}")
-            return False
+            logging.error(f"批量启动监控失败: {str(e)}")
+        return results
+
+    def _create_entry(self, app_config, last_restart=0):
+        """根据应用配置创建监控表项"""
+        return {
+            'path': app_config['path'],
+            'check_interval': app_config['check_interval'],
+            'restart_interval': app_config['restart_interval'],
+            'minimize_to_tray': app_config['minimize_to_tray'],
+            'last_check': 0,  # 初始化最后检查时间
+            'last_restart': last_restart,  # 初始化最后重启时间
+            'next_check': 0,  # 下次检查的截止时间（monotonic）
+            'pid': None,  # 已绑定的进程 PID
+            'create_time': None,  # 已绑定进程的创建时间
+            'proc': None,
+            'popen': None,
+            'policy': RestartPolicy.from_app_config(app_config),  # 重启策略
+            'limits': ResourceLimits.from_app_config(app_config),  # 资源阈值
+            'terminating': False,  # 是否正在因超限而结束进程
+            'limit_restart': False  # 进程已因超限被结束，等待立即重启
+        }
 
     def start_monitor_thread(self):
         """启动监控线程"""
@@ -74,20 +198,70 @@ class ProcessMonitor:
             self.monitor_thread.start()
 
     def _monitor_loop(self):
-        """监控循环"""
-        while self.running:
+        """监控循环：休眠到最早的检查截止时间，调度变化时被唤醒"""
+        current_thread = threading.current_thread()
+        while self._loop_active(current_thread):
             try:
+                with self._schedule_cond:
+                    while self._loop_active(current_thread):
+                        timeout = self._next_timeout()
+                        if timeout is not None and timeout <= SCHEDULE_SLACK:
+                            break
+                        # 没有待检查的进程时无限期等待，直到被唤醒
+                        self._schedule_cond.wait(timeout)
+                if not self._loop_active(current_thread):
+                    break
                 self.monitor()
-                time.sleep(0.1)  # 短暂休眠以避免CPU使用率过高
             except Exception as e:
                 logging.error(f"监控循环出错: {str(e)}")
                 time.sleep(1)  # 出错时等待较长时间
 
+    def _loop_active(self, thread):
+        """检查监控线程是否仍应继续运行（重启监控后旧线程自动退出）"""
+        return self.running and self.monitor_thread is thread
+
+    def _next_timeout(self):
+        """计算距离最早检查截止时间的秒数，调用方需持有调度锁"""
+        # 丢弃已失效的调度项（进程已移除或截止时间已更新）
+        while self._schedule:
+            deadline, _, process_name = self._schedule[0]
+            info = self.monitored_processes.get(process_name)
+            if info is not None and info.get('next_check') == deadline:
+                return deadline - time.monotonic()
+            heapq.heappop(self._schedule)
+        return None
+
+    def _schedule_check(self, process_name, deadline):
+        """安排进程在指定截止时间检查，并唤醒监控线程"""
+        with self._schedule_cond:
+            info = self.monitored_processes.get(process_name)
+            if info is None:
+                return
+            info['next_check'] = deadline
+            heapq.heappush(self._schedule, (deadline, next(self._schedule_seq), process_name))
+            self._schedule_cond.notify()
+
+    def _pop_due(self):
+        """取出所有已到期的进程"""
+        due = []
+        with self._schedule_cond:
+            now = time.monotonic() + SCHEDULE_SLACK
+            while self._schedule and self._schedule[0][0] <= now:
+                deadline, _, process_name = heapq.heappop(self._schedule)
+                info = self.monitored_processes.get(process_name)
+                if info is not None and info.get('next_check') == deadline:
+                    due.append((process_name, info, deadline))
+        return due
+
     def stop_monitoring(self, process_name):
         """停止监控特定进程"""
         if process_name in self.monitored_processes:
             logging.info(f"停止监控进程: {process_name}")
-            self.monitored_processes.pop(process_name)
+            with self._schedule_cond:
+                self.monitored_processes.pop(process_name, None)
+                self._schedule_cond.notify()
+            self.exit_watcher.unwatch(process_name)
+            self.telemetry.forget(process_name)
 
     def stop_all(self, clear_config=True):
         """停止所有监控"""
@@ -101,29 +275,80 @@ class ProcessMonitor:
             if clear_config:
                 self.monitored_processes.clear()
             
+            # 清空调度并唤醒监控线程使其退出
+            with self._schedule_cond:
+                self._schedule.clear()
+                self._schedule_cond.notify_all()
+            
         except Exception as e:
             logging.error(f"停止监控失败: {str(e)}")
 
-    def is_process_running(self, process_name):
+    def _get_snapshot(self, max_age=SNAPSHOT_MAX_AGE):
+        """获取进程表快照，快照未过期时直接复用"""
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.age() <= max_age:
+                self.snapshot_stats['hits'] += 1
+                return snapshot
+
+            snapshot = ProcessSnapshot.build()
+            self._snapshot = snapshot
+            self.snapshot_stats['misses'] += 1
+            self.snapshot_stats['scans'] += 1
+            self.snapshot_stats['scan_time_total'] += snapshot.scan_duration
+            self.snapshot_stats['scan_time_last'] = snapshot.scan_duration
+            return snapshot
+
+    def get_snapshot_stats(self):
+        """获取进程表快照的命中与扫描耗时统计"""
+        with self._snapshot_lock:
+            stats = dict(self.snapshot_stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['scan_time_avg'] = stats['scan_time_total'] / stats['scans'] if stats['scans'] else 0.0
+        return stats
+
+    def is_process_running(self, process_name, snapshot=None):
         """检查进程是否正在运行"""
         try:
-            for proc in psutil.process_iter(['name']):
-                if proc.info['name'].lower() == process_name.lower():
-                    return True
-            return False
+            if snapshot is None:
+                snapshot = self._get_snapshot()
+            return snapshot.contains(process_name)
         except Exception as e:
             logging.error(f"检查进程状态失败: {str(e)}")
             return False
 
-    def start_process(self, process_path, minimize_to_tray=False):
+    def start_process(self, process_path, minimize_to_tray=False, snapshot=None):
         """启动指定的进程"""
         try:
             # 检查进程是否已经在运行
             process_name = os.path.basename(process_path)
-            if self.is_process_running(process_name):
+            if snapshot is None:
+                snapshot = self._get_snapshot()
+            if self.is_process_running(process_name, snapshot):
                 logging.info(f"进程 {process_name} 已在运行，跳过启动")
                 return True
 
+            process = self._spawn(process_path, minimize_to_tray)
+
+            # 记录到快照中，同一轮内的后续查询无需重新扫描
+            snapshot.add(process_name, process.pid)
+
+            info = self.monitored_processes.get(process_name)
+            if info is not None:
+                info['last_restart'] = time.time()
+                info['policy'].record_restart()
+                self._pin_process(process_name, info, process.pid, process)
+            logging.info(f"成功启动进程: {process_name} {'(托盘启动)' if minimize_to_tray else '(正常启动)'}")
+            return True
+        except Exception as e:
+            logging.error(f"启动进程失败: {str(e)}")
+            return False
+
+    def _spawn(self, process_path, minimize_to_tray=False):
+        """创建进程并记录启动耗时"""
+        start = time.perf_counter()
+        try:
             # 根据launch_mode决定启动方式
             if minimize_to_tray:  # 托盘启动
                 # 以托盘方式启动（全隐藏窗口）
@@ -138,43 +363,155 @@ class ProcessMonitor:
             else:  # 正常启动
                 # 正常启动进程
                 process = subprocess.Popen([process_path])
+        except Exception:
+            with self._launch_lock:
+                self.launch_stats['failures'] += 1
+            raise
+        
+        latency = time.perf_counter() - start
+        with self._launch_lock:
+            self.launch_stats['launches'] += 1
+            self.launch_stats['latency_total'] += latency
+            self.launch_stats['latency_last'] = latency
+            self.launch_stats['latency_max'] = max(self.launch_stats['latency_max'], latency)
+        return process
 
-            if process_name in self.monitored_processes:
-                self.monitored_processes[process_name]['last_restart'] = time.time()
-            logging.info(f"成功启动进程: {process_name} {'(托盘启动)' if minimize_to_tray else '(正常启动)'}")
+    def _launch_async(self, process_name, info, snapshot=None):
+        """在启动线程池中启动进程，返回 Future"""
+        info['launching'] = True
+        
+        def launch():
+            try:
+                return self.start_process(info['path'], info['minimize_to_tray'], snapshot)
+            finally:
+                info['launching'] = False
+        
+        return self._launch_executor.submit(launch)
+
+    def get_launch_stats(self):
+        """获取进程启动次数与耗时统计"""
+        with self._launch_lock:
+            stats = dict(self.launch_stats)
+        stats['latency_avg'] = stats['latency_total'] / stats['launches'] if stats['launches'] else 0.0
+        return stats
+
+    def _pin_process(self, process_name, info, pid, popen=None):
+        """记录进程的 PID 与创建时间，后续通过 PID 直接判断存活"""
+        try:
+            proc = psutil.Process(pid)
+            info['pid'] = pid
+            info['create_time'] = proc.create_time()
+            info['proc'] = proc
+            info['popen'] = popen
+            self.exit_watcher.watch(process_name, pid, proc, popen)
+            logging.debug(f"已绑定进程 {process_name}: PID={pid}")
             return True
-        except Exception as e:
-            logging.error(f"启动进程失败: {str(e)}")
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            logging.debug(f"绑定进程 {process_name} (PID={pid}) 失败: {str(e)}")
+            self._unpin_process(process_name, info)
             return False
 
+    def _unpin_process(self, process_name, info):
+        """清除已绑定的 PID"""
+        self.exit_watcher.unwatch(process_name)
+        info['pid'] = None
+        info['create_time'] = None
+        info['proc'] = None
+        info['popen'] = None
+
+    def _is_pinned_alive(self, info):
+        """通过已绑定的 PID 判断进程是否存活，O(1) 且不会误认同名进程"""
+        proc = info.get('proc')
+        if proc is None:
+            return False
+        try:
+            # 自己启动的子进程先回收退出状态，避免僵尸进程被误判为存活
+            popen = info.get('popen')
+            if popen is not None and popen.poll() is not None:
+                return False
+            # is_running 会比较创建时间，PID 被复用时返回 False
+            return proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def _pin_from_snapshot(self, process_name, info, snapshot):
+        """从快照中按进程名查找并绑定一个 PID"""
+        for pid in snapshot.get_pids(process_name):
+            if self._pin_process(process_name, info, pid):
+                return True
+        return False
+
     def monitor(self):
-        """监控所有注册的进程"""
+        """检查所有已到期的进程，并安排下次检查"""
         try:
             current_time = time.time()
+            snapshot = None  # 本轮共享的进程表快照，首个到期的进程触发构建
             
-            # 遍历所有注册的进程
-            for process_name, info in list(self.monitored_processes.items()):
+            # 遍历所有到期的进程
+            for process_name, info, deadline in self._pop_due():
                 try:
-                    # 检查是否需要检查进程状态（按照监听间隔）
-                    if current_time - info.get('last_check', 0) < info.get('check_interval', 1):
-                        continue
+                    # 按照监听间隔安排下次检查；落后过多时从当前时间重新计算
+                    interval = max(0.1, float(info.get('check_interval', 1)))
+                    next_deadline = deadline + interval
+                    now = time.monotonic()
+                    if next_deadline <= now:
+                        next_deadline = now + interval
+                    self._schedule_check(process_name, next_deadline)
                     
                     # 更新最后检查时间
                     info['last_check'] = current_time
                     
-                    # 检查进程是否在运行
-                    process_running = False
-                    for proc in psutil.process_iter(['name']):
-                        if proc.info['name'].lower() == process_name.lower():
-                            process_running = True
-                            break
+                    # 启动尚未完成时跳过本次检查
+                    if info.get('launching'):
+                        continue
                     
+                    # 检查进程是否在运行：优先探测已绑定的 PID，失效后才按进程名扫描
+                    process_running = self._is_pinned_alive(info)
                     if not process_running:
-                        logging.info(f"检测到进程未运行: {process_name}，准备重新启动")
-                        # 如果进程未运行，立即启动
-                        minimize_to_tray = info['minimize_to_tray']
-                        self.start_process(info['path'], minimize_to_tray)
-                        info['last_restart'] = current_time
+                        if info.get('pid'):
+                            logging.info(f"已绑定的进程 {process_name} (PID={info['pid']}) 已退出")
+                            self._unpin_process(process_name, info)
+                        if snapshot is None:
+                            snapshot = self._get_snapshot(max_age=0)
+                        else:
+                            with self._snapshot_lock:
+                                self.snapshot_stats['hits'] += 1
+                        process_running = self._pin_from_snapshot(process_name, info, snapshot)
+                    
+                    policy = info['policy']
+                    previous_state = policy.state
+                    if process_running:
+                        # 结束后已有同名进程在运行（被重新绑定）时，主动重启的标记不再适用
+                        if not info.get('terminating'):
+                            info['limit_restart'] = False
+                        policy.record_running(now)
+                        self._sample_and_check_limits(process_name, info, now)
+                    else:
+                        # 按重启策略决定是否以及何时重启；因超限被主动结束的不计入崩溃，立即重启
+                        if info.get('limit_restart'):
+                            info['limit_restart'] = False
+                            policy.record_deliberate_exit(now)
+                        else:
+                            policy.record_exit(now)
+                        restart_at = policy.next_restart_time(now)
+                        if restart_at is None:
+                            if policy.state != previous_state:
+                                if policy.state == STATE_PARKED:
+                                    logging.warning(f"进程 {process_name} 重启过于频繁，已暂停自动重启")
+                                elif policy.state == STATE_DISABLED:
+                                    logging.info(f"进程 {process_name} 未运行，重启间隔为0，不自动重启")
+                        elif restart_at > now + SCHEDULE_SLACK:
+                            # 未到允许重启的时间，提前安排一次检查
+                            if restart_at < next_deadline:
+                                self._schedule_check(process_name, restart_at)
+                            if policy.state != previous_state:
+                                logging.info(f"检测到进程未运行: {process_name}，"
+                                           f"{restart_at - now:.1f} 秒后重新启动")
+                        else:
+                            logging.info(f"检测到进程未运行: {process_name}，准备重新启动")
+                            self._launch_async(process_name, info, snapshot)
+                    if policy.state != previous_state:
+                        self._notify_status()
                         
                     logging.debug(f"监控进程 {process_name}: 运行状态={process_running}, "
                                 f"上次检查={info['last_check']}, "
@@ -186,29 +523,193 @@ class ProcessMonitor:
         except Exception as e:
             logging.error(f"监控过程出错: {str(e)}")
 
+    def _sample_and_check_limits(self, process_name, info, now):
+        """记录资源占用；设置了资源阈值的应用每次检查都采样并评估"""
+        proc = info.get('proc')
+        if proc is None or info.get('terminating'):
+            return
+        limits = info['limits']
+        if not limits.active and not self.telemetry.is_due(process_name, now):
+            return
+        
+        sample = self.telemetry.sample(process_name, proc)
+        if sample is None or not limits.active:
+            return
+        
+        reason = limits.evaluate(sample, now)
+        if reason:
+            self._restart_for_limits(process_name, info, reason)
+
+    def _restart_for_limits(self, process_name, info, reason):
+        """资源超限时结束进程，结束后立即重新启动（不受重启间隔与退避限制，仍计入熔断）"""
+        if info['policy'].state == STATE_DISABLED:
+            logging.warning(f"进程 {process_name} {reason}，但重启间隔为0，不主动重启")
+            return
+        
+        logging.warning(f"进程 {process_name} {reason}，主动重启")
+        info['terminating'] = True
+        # 先标记再结束进程，退出通知触发的检查也会按主动重启处理
+        info['limit_restart'] = True
+        proc = info['proc']
+        
+        def terminate():
+            try:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=TERMINATE_TIMEOUT)
+                except psutil.TimeoutExpired:
+                    logging.warning(f"进程 {process_name} 未在 {TERMINATE_TIMEOUT} 秒内退出，强制结束")
+                    proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+            except Exception as e:
+                info['limit_restart'] = False
+                logging.error(f"结束进程 {process_name} 失败: {str(e)}")
+            finally:
+                info['terminating'] = False
+                info['limits'].reset()
+                # 立即检查，进程已退出时重新启动
+                self._schedule_check(process_name, time.monotonic())
+        
+        self._launch_executor.submit(terminate)
+
+    def set_status_listener(self, listener):
+        """设置监控状态变化回调"""
+        self._status_listener = listener
+
+    def _notify_status(self):
+        """通知监控状态变化"""
+        if self._status_listener is None:
+            return
+        try:
+            self._status_listener()
+        except Exception as e:
+            logging.error(f"通知监控状态变化失败: {str(e)}")
+
+    def get_app_status(self):
+        """获取所有监控应用的运行与重启策略状态"""
+        status = {}
+        now = time.monotonic()
+        for process_name, info in list(self.monitored_processes.items()):
+            try:
+                app_status = info['policy'].status(now)
+                app_status['pid'] = info.get('pid')
+                app_status['path'] = info.get('path')
+                status[process_name] = app_status
+            except Exception as e:
+                logging.error(f"获取进程 {process_name} 状态失败: {str(e)}")
+        return status
+
+    def reset_restart_policy(self, process_name):
+        """解除应用的重启暂停状态并立即检查"""
+        info = self.monitored_processes.get(process_name)
+        if info is None:
+            return False
+        info['policy'].reset()
+        logging.info(f"已重置进程 {process_name} 的重启策略")
+        self._schedule_check(process_name, time.monotonic())
+        self._notify_status()
+        return True
+
+    def get_telemetry(self, process_name):
+        """获取应用的资源占用历史样本"""
+        return [sample._asdict() for sample in self.telemetry.get_samples(process_name)]
+
+    def get_telemetry_summary(self):
+        """获取所有监控应用最近一次的资源占用及内存变化"""
+        summary = {}
+        for process_name in list(self.monitored_processes.keys()):
+            ring = self.telemetry.get_ring(process_name)
+            latest = ring.latest() if ring else None
+            if latest is None:
+                continue
+            summary[process_name] = dict(
+                latest._asdict(),
+                rss_growth=ring.rss_growth(),
+                samples=len(ring)
+            )
+        return summary
+
+    def get_telemetry_stats(self):
+        """获取资源采样自身的开销统计"""
+        stats = dict(self.telemetry.stats)
+        stats['effective_interval'] = self.telemetry.effective_interval()
+        stats['cpu_budget'] = self.telemetry.cpu_budget
+        return stats
+
     def reload_config(self):
         """重新加载配置"""
         try:
             # 获取新的配置
             config = Config()
             apps = config.get_monitored_apps()
+            self.telemetry.interval = max(0.5, config.get_telemetry_interval())
+            self.telemetry.enabled = config.get_telemetry_interval() > 0
             
             if config.get_app_monitor_enabled():
-                # 停止所有当前监控
-                self.stop_all(clear_config=False)
-                self.monitored_processes.clear()
-                
-                # 重新启动监控
-                for app in apps:
-                    if app.get('appenabled', False):
-                        self.start_monitoring(app)
-                        logging.info(f"重新启动监控: {app['name']}")
+                self._reconcile([app for app in apps if app.get('enabled', True)])
             else:
                 self.stop_all(clear_config=True)
                 
         except Exception as e:
             logging.error(f"重新加载配置失败: {str(e)}")
 
+    def _reconcile(self, apps):
+        """按路径对比新旧配置，只增删或更新有变化的应用，保留已绑定的 PID 和调度状态"""
+        desired = {app['path']: app for app in apps}
+        current = {info['path']: process_name
+                   for process_name, info in list(self.monitored_processes.items())}
+        
+        # 移除已删除的应用
+        for path in current.keys() - desired.keys():
+            self.stop_monitoring(current[path])
+        
+        # 原地更新仍然存在的应用
+        updated = 0
+        for path in current.keys() & desired.keys():
+            if self._update_entry(current[path], desired[path]):
+                updated += 1
+        
+        # 启动新增的应用
+        added = [desired[path] for path in desired if path not in current]
+        if added:
+            for process_name, success in self.start_many(added).items():
+                logging.info(f"新增应用监控: {process_name}, 结果: {success}")
+        elif self.monitored_processes and not self.running:
+            self.start_monitor_thread()
+        
+        logging.info(f"监控配置已重新加载: 新增 {len(added)} 个, "
+                     f"移除 {len(current.keys() - desired.keys())} 个, 更新 {updated} 个")
+
+    def _update_entry(self, process_name, app_config):
+        """用新配置原地更新监控表项，返回是否有变化"""
+        info = self.monitored_processes.get(process_name)
+        if info is None:
+            return False
+        
+        changes = []
+        for key in ('check_interval', 'restart_interval', 'minimize_to_tray'):
+            if info.get(key) != app_config.get(key):
+                changes.append(f"{key}: {info.get(key)} -> {app_config.get(key)}")
+                info[key] = app_config.get(key)
+        if info['policy'].update(app_config):
+            changes.append("重启策略")
+        new_limits = ResourceLimits.from_app_config(app_config)
+        if not info['limits'].same_as(new_limits):
+            info['limits'] = new_limits
+            changes.append("资源阈值")
+        
+        if not changes:
+            return False
+        
+        logging.info(f"更新应用监控 {process_name}: {', '.join(changes)}")
+        # 监听间隔缩短时提前下次检查
+        next_check = time.monotonic() + max(0.1, float(info.get('check_interval', 1)))
+        if next_check < info.get('next_check', 0):
+            self._schedule_check(process_name, next_check)
+        self._notify_status()
+        return True
+
     def add_to_monitoring(self, app_config):
         """将已运行的进程添加到监控列表"""
         try:
@@ -220,16 +721,15 @@ class ProcessMonitor:
                 return True
 
             # 添加到监控列表但不启动进程
-            self.monitored_processes[process_name] = {
-                'path': app_config['path'],
-                'check_interval': app_config['check_interval'],
-                'restart_interval': app_config['restart_interval'],
-                'last_check': 0,
-                'last_restart': time.time(),
-                'minimize_to_tray': app_config['minimize_to_tray']
-            }
+            self.monitored_processes[process_name] = self._create_entry(app_config, time.time())
+            
+            # 绑定已运行进程的 PID
+            info = self.monitored_processes[process_name]
+            if not self._pin_from_snapshot(process_name, info, self._get_snapshot()):
+                logging.info(f"未找到正在运行的进程 {process_name}，将在下次检查时处理")
             
-            # 如果监控线程未运行，启动它
+            # 加入调度，如果监控线程未运行，启动它
+            self._schedule_check(process_name, time.monotonic())
             if not self.running:
                 self.start_monitor_thread()
             
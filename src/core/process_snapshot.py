@@ -0,0 +1,43 @@
+import time
+import logging
+import psutil
+
+
+class ProcessSnapshot:
+    """进程表快照：一次遍历构建 小写进程名 -> PID 列表 的索引"""
+
+    def __init__(self, index, created_at, scan_duration):
+        self.index = index
+        self.created_at = created_at
+        self.scan_duration = scan_duration
+
+    @classmethod
+    def build(cls):
+        """遍历一次进程表并构建快照"""
+        start = time.perf_counter()
+        index = {}
+        for proc in psutil.process_iter(['name']):
+            try:
+                name = proc.info['name']
+                if not name:
+                    continue
+                index.setdefault(name.lower(), []).append(proc.pid)
+            except Exception as e:
+                logging.debug(f"读取进程信息失败: {str(e)}")
+        return cls(index, time.time(), time.perf_counter() - start)
+
+    def get_pids(self, process_name):
+        """获取指定进程名对应的 PID 列表"""
+        return self.index.get(process_name.lower(), [])
+
+    def contains(self, process_name):
+        """检查快照中是否存在指定进程"""
+        return process_name.lower() in self.index
+
+    def add(self, process_name, pid):
+        """将新启动的进程记录到快照中，避免同一轮内重复扫描"""
+        self.index.setdefault(process_name.lower(), []).append(pid)
+
+    def age(self):
+        """快照已存在的时间（秒）"""
+        return time.time() - self.created_at
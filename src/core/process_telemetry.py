@@ -0,0 +1,115 @@
+import time
+import logging
+from collections import deque, namedtuple
+import psutil
+
+# 默认采样参数，可在 app_monitor 配置中覆盖
+DEFAULT_SAMPLE_INTERVAL = 5   # 采样间隔（秒）
+DEFAULT_HISTORY_SIZE = 120    # 每个应用保留的样本数
+CPU_BUDGET = 0.005            # 采样自身的 CPU 占用上限（单核的 0.5%）
+
+ResourceSample = namedtuple(
+    'ResourceSample',
+    ['timestamp', 'pid', 'cpu_percent', 'rss', 'handles', 'uptime']
+)
+
+
+def sample_process(proc, now=None):
+    """读取单个进程的资源占用，proc 需为同一个 psutil.Process 对象以便计算 CPU 占用"""
+    now = time.time() if now is None else now
+    with proc.oneshot():
+        cpu_percent = proc.cpu_percent(None)
+        rss = proc.memory_info().rss
+        if hasattr(proc, 'num_handles'):
+            handles = proc.num_handles()  # Windows 句柄数
+        else:
+            handles = proc.num_fds()      # 其他平台使用文件描述符数
+        uptime = max(0.0, now - proc.create_time())
+    return ResourceSample(now, proc.pid, cpu_percent, rss, handles, uptime)
+
+
+class TelemetryRing:
+    """固定大小的样本环形缓冲区"""
+
+    def __init__(self, size):
+        self._samples = deque(maxlen=max(1, size))
+
+    def append(self, sample):
+        self._samples.append(sample)
+
+    def latest(self):
+        return self._samples[-1] if self._samples else None
+
+    def samples(self):
+        return list(self._samples)
+
+    def rss_growth(self):
+        """缓冲区内首尾样本的内存变化（字节），用于发现内存泄漏"""
+        if len(self._samples) < 2:
+            return 0
+        return self._samples[-1].rss - self._samples[0].rss
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class TelemetrySampler:
+    """按采样间隔采集监控进程的资源占用，并把自身耗时控制在 CPU 预算内"""
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL, history_size=DEFAULT_HISTORY_SIZE,
+                 cpu_budget=CPU_BUDGET):
+        self.interval = max(0.5, interval)
+        self.history_size = history_size
+        self.cpu_budget = cpu_budget
+        self.enabled = interval > 0
+        self._rings = {}        # process_name -> TelemetryRing
+        self._last_sample = {}  # process_name -> 最近一次采样时间（monotonic）
+        self._sample_cost = 0.0  # 单次采样耗时的滑动平均（秒）
+        self.stats = {'samples': 0, 'errors': 0, 'time_total': 0.0}
+
+    def effective_interval(self):
+        """实际采样间隔：采样总耗时超过 CPU 预算时自动拉长间隔"""
+        apps = max(1, len(self._rings))
+        return max(self.interval, apps * self._sample_cost / self.cpu_budget)
+
+    def is_due(self, process_name, now=None):
+        """检查指定应用是否需要采样"""
+        if not self.enabled:
+            return False
+        now = time.monotonic() if now is None else now
+        last = self._last_sample.get(process_name)
+        return last is None or now - last >= self.effective_interval()
+
+    def sample(self, process_name, proc):
+        """采集一次样本并写入环形缓冲区"""
+        self._last_sample[process_name] = time.monotonic()
+        start = time.perf_counter()
+        try:
+            sample = sample_process(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            self.stats['errors'] += 1
+            logging.debug(f"采集进程 {process_name} 资源占用失败: {str(e)}")
+            return None
+        finally:
+            cost = time.perf_counter() - start
+            self._sample_cost = cost if not self.stats['samples'] else self._sample_cost * 0.9 + cost * 0.1
+            self.stats['time_total'] += cost
+
+        ring = self._rings.get(process_name)
+        if ring is None:
+            ring = self._rings[process_name] = TelemetryRing(self.history_size)
+        ring.append(sample)
+        self.stats['samples'] += 1
+        return sample
+
+    def get_samples(self, process_name):
+        ring = self._rings.get(process_name)
+        return ring.samples() if ring else []
+
+    def get_ring(self, process_name):
+        return self._rings.get(process_name)
+
+    def forget(self, process_name):
+        """移除应用的采样数据"""
+        self._rings.pop(process_name, None)
+        self._last_sample.pop(process_name, None)
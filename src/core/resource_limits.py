@@ -0,0 +1,66 @@
+import time
+
+# 默认 CPU 持续超限时间（秒），超过该时间才触发重启
+DEFAULT_CPU_SUSTAIN_SECONDS = 60
+
+
+class ResourceLimits:
+    """单个应用的资源阈值：内存超限或 CPU 持续超限时主动重启
+
+    在 app_monitor.apps 的应用配置中设置：
+        max_memory_mb: 内存（RSS）上限，单位 MB
+        max_cpu_percent: CPU 占用上限（百分比，多核可超过100）
+        cpu_sustain_seconds: CPU 持续超限多长时间后重启
+    """
+
+    def __init__(self, max_memory_mb=None, max_cpu_percent=None,
+                 cpu_sustain_seconds=DEFAULT_CPU_SUSTAIN_SECONDS):
+        self.max_memory_mb = max_memory_mb if max_memory_mb and max_memory_mb > 0 else None
+        self.max_cpu_percent = max_cpu_percent if max_cpu_percent and max_cpu_percent > 0 else None
+        self.cpu_sustain_seconds = max(0, cpu_sustain_seconds)
+        self._cpu_over_since = None  # CPU 开始超限的时间（monotonic）
+
+    @classmethod
+    def from_app_config(cls, app_config):
+        """根据应用配置创建资源阈值"""
+        max_memory_mb = app_config.get('max_memory_mb')
+        max_cpu_percent = app_config.get('max_cpu_percent')
+        return cls(
+            float(max_memory_mb) if max_memory_mb else None,
+            float(max_cpu_percent) if max_cpu_percent else None,
+            float(app_config.get('cpu_sustain_seconds', DEFAULT_CPU_SUSTAIN_SECONDS))
+        )
+
+    @property
+    def active(self):
+        """是否设置了任何阈值"""
+        return self.max_memory_mb is not None or self.max_cpu_percent is not None
+
+    def same_as(self, other):
+        """阈值设置是否相同"""
+        return (self.max_memory_mb, self.max_cpu_percent, self.cpu_sustain_seconds) == \
+            (other.max_memory_mb, other.max_cpu_percent, other.cpu_sustain_seconds)
+
+    def evaluate(self, sample, now=None):
+        """用一个资源样本评估阈值，需要重启时返回原因，否则返回 None"""
+        now = time.monotonic() if now is None else now
+
+        if self.max_memory_mb is not None:
+            rss_mb = sample.rss / 1024 / 1024
+            if rss_mb > self.max_memory_mb:
+                return f"内存 {rss_mb:.1f} MB 超过上限 {self.max_memory_mb:.0f} MB"
+
+        if self.max_cpu_percent is not None:
+            if sample.cpu_percent > self.max_cpu_percent:
+                if self._cpu_over_since is None:
+                    self._cpu_over_since = now
+                elif now - self._cpu_over_since >= self.cpu_sustain_seconds:
+                    return (f"CPU {sample.cpu_percent:.1f}% 持续 {now - self._cpu_over_since:.0f} 秒"
+                            f"超过上限 {self.max_cpu_percent:.0f}%")
+            else:
+                self._cpu_over_since = None
+        return None
+
+    def reset(self):
+        """进程重启后清除持续超限计时"""
+        self._cpu_over_since = None
@@ -0,0 +1,183 @@
+import time
+import random
+from collections import deque
+
+# 默认重启策略参数，可在 app_monitor.apps 的单个应用配置中覆盖
+DEFAULT_MAX_RESTARTS = 5      # 统计窗口内允许的最大重启次数，超过后暂停重启
+DEFAULT_RESTART_WINDOW = 600  # 熔断统计窗口（秒）
+DEFAULT_BACKOFF_BASE = 5      # 连续崩溃时的初始退避时间（秒）
+DEFAULT_BACKOFF_MAX = 900     # 退避时间上限（秒）
+DEFAULT_BACKOFF_JITTER = 0.2  # 退避时间的随机抖动比例
+DEFAULT_STABLE_AFTER = 60     # 进程运行超过该时间视为稳定，清零连续崩溃计数
+
+# 策略状态
+STATE_RUNNING = 'running'    # 正常运行
+STATE_WAITING = 'waiting'    # 已退出，等待重启间隔或退避结束
+STATE_PARKED = 'parked'      # 重启过于频繁，已暂停重启
+STATE_DISABLED = 'disabled'  # 重启间隔为0，不自动重启
+
+STATE_LABELS = {
+    STATE_RUNNING: '运行中',
+    STATE_WAITING: '等待重启',
+    STATE_PARKED: '已暂停',
+    STATE_DISABLED: '不重启'
+}
+
+
+class RestartPolicy:
+    """单个应用的重启策略：最小重启间隔、指数退避加抖动、频繁重启熔断"""
+
+    def __init__(self, restart_interval, max_restarts=DEFAULT_MAX_RESTARTS,
+                 restart_window=DEFAULT_RESTART_WINDOW, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX, backoff_jitter=DEFAULT_BACKOFF_JITTER,
+                 stable_after=DEFAULT_STABLE_AFTER):
+        self.restart_interval = max(0, restart_interval)
+        self.max_restarts = max(1, max_restarts)
+        self.restart_window = max(1, restart_window)
+        self.backoff_base = max(0, backoff_base)
+        self.backoff_max = max(self.backoff_base, backoff_max)
+        self.backoff_jitter = min(max(0, backoff_jitter), 1)
+        self.stable_after = max(0, stable_after)
+
+        self.state = STATE_RUNNING if self.restart_interval > 0 else STATE_DISABLED
+        self.failures = 0                # 连续崩溃次数
+        self.total_restarts = 0          # 累计重启次数
+        self.last_restart = None         # 最近一次启动时间（monotonic）
+        self.next_restart = None         # 计划的下次重启时间（monotonic）
+        self._restart_times = deque()    # 统计窗口内的启动时间
+        self._exit_recorded = False
+
+    @classmethod
+    def from_app_config(cls, app_config):
+        """根据应用配置创建重启策略"""
+        return cls(
+            int(app_config.get('restart_interval', 60)),
+            max_restarts=int(app_config.get('max_restarts', DEFAULT_MAX_RESTARTS)),
+            restart_window=float(app_config.get('restart_window', DEFAULT_RESTART_WINDOW)),
+            backoff_base=float(app_config.get('backoff_base', DEFAULT_BACKOFF_BASE)),
+            backoff_max=float(app_config.get('backoff_max', DEFAULT_BACKOFF_MAX)),
+            stable_after=float(app_config.get('stable_after', DEFAULT_STABLE_AFTER))
+        )
+
+    def update(self, app_config):
+        """用新的应用配置更新策略参数，保留运行状态与重启记录，返回是否有变化"""
+        new_policy = RestartPolicy.from_app_config(app_config)
+        params = ('restart_interval', 'max_restarts', 'restart_window',
+                  'backoff_base', 'backoff_max', 'backoff_jitter', 'stable_after')
+        changed = False
+        for name in params:
+            if getattr(self, name) != getattr(new_policy, name):
+                setattr(self, name, getattr(new_policy, name))
+                changed = True
+        if not changed:
+            return False
+        
+        # 重启间隔在0与非0之间切换时更新状态，并重新计算等待时间
+        if self.restart_interval == 0:
+            self.state = STATE_DISABLED
+        elif self.state == STATE_DISABLED:
+            self.state = STATE_RUNNING
+        self.next_restart = None
+        return True
+
+    def record_running(self, now=None):
+        """记录进程正在运行，运行足够久后清零连续崩溃计数"""
+        now = time.monotonic() if now is None else now
+        self._exit_recorded = False
+        self.next_restart = None
+        # 已暂停的应用被手动启动后恢复正常状态，熔断计数仍保留在窗口内
+        if self.state in (STATE_WAITING, STATE_PARKED):
+            self.state = STATE_RUNNING
+        if self.failures and self.last_restart is not None \
+                and now - self.last_restart >= self.stable_after:
+            self.failures = 0
+
+    def record_exit(self, now=None):
+        """记录进程退出（同一次退出只记录一次）"""
+        now = time.monotonic() if now is None else now
+        if self._exit_recorded:
+            return
+        self._exit_recorded = True
+        # 启动后很快退出视为崩溃，累计退避
+        if self.last_restart is not None and now - self.last_restart < self.stable_after:
+            self.failures += 1
+        else:
+            self.failures = 0
+
+    def record_deliberate_exit(self, now=None):
+        """记录主动结束进程（如资源超限）：不计入连续崩溃，跳过重启间隔与退避，仍受熔断限制"""
+        now = time.monotonic() if now is None else now
+        self._exit_recorded = True
+        self.next_restart = None
+        if self.state == STATE_DISABLED:
+            return
+        self._prune(now)
+        if len(self._restart_times) >= self.max_restarts:
+            self.state = STATE_PARKED
+            return
+        self.next_restart = now
+
+    def next_restart_time(self, now=None):
+        """计算允许重启的时间，返回 None 表示不应重启"""
+        now = time.monotonic() if now is None else now
+        if self.state in (STATE_PARKED, STATE_DISABLED):
+            return None
+        if self.next_restart is not None:
+            return self.next_restart
+
+        # 熔断：统计窗口内重启次数达到上限时暂停重启
+        self._prune(now)
+        if len(self._restart_times) >= self.max_restarts:
+            self.state = STATE_PARKED
+            return None
+
+        restart_at = now
+        if self.last_restart is not None:
+            restart_at = max(restart_at, self.last_restart + self.restart_interval)
+        if self.failures:
+            backoff = min(self.backoff_max, self.backoff_base * (2 ** (self.failures - 1)))
+            backoff *= 1 + random.uniform(-self.backoff_jitter, self.backoff_jitter)
+            restart_at = max(restart_at, now + backoff)
+
+        self.next_restart = restart_at
+        if restart_at > now:
+            self.state = STATE_WAITING
+        return restart_at
+
+    def record_restart(self, now=None):
+        """记录一次启动"""
+        now = time.monotonic() if now is None else now
+        self.last_restart = now
+        self.next_restart = None
+        self.total_restarts += 1
+        self._restart_times.append(now)
+        self._prune(now)
+        self._exit_recorded = False
+        if self.state == STATE_WAITING:
+            self.state = STATE_RUNNING
+
+    def reset(self):
+        """解除暂停并清零崩溃计数"""
+        self.failures = 0
+        self.next_restart = None
+        self._restart_times.clear()
+        self._exit_recorded = False
+        self.state = STATE_RUNNING if self.restart_interval > 0 else STATE_DISABLED
+
+    def _prune(self, now):
+        """移除统计窗口之外的启动记录"""
+        while self._restart_times and now - self._restart_times[0] > self.restart_window:
+            self._restart_times.popleft()
+
+    def status(self, now=None):
+        """获取策略状态"""
+        now = time.monotonic() if now is None else now
+        self._prune(now)
+        return {
+            'state': self.state,
+            'state_label': STATE_LABELS.get(self.state, self.state),
+            'failures': self.failures,
+            'total_restarts': self.total_restarts,
+            'recent_restarts': len(self._restart_times),
+            'next_restart_in': max(0.0, self.next_restart - now) if self.next_restart is not None else None
+        }
@@ -1,8 +1,11 @@
 import tkinter as tk
 from tkinter import Toplevel
-import pyautogui
 import logging
-from io import BytesIO
+import sys
+import ctypes
+import threading
+from ctypes import wintypes
+from PIL import Image, ImageGrab, ImageTk
 from win32clipboard import (
     OpenClipboard,
     EmptyClipboard,
@@ -10,148 +13,574 @@ from win32clipboard import (
     CloseClipboard,
     CF_DIB
 )
-from ..utils.config import DARK_THEME
+from ..utils.config import Config, DARK_THEME
 from ..utils.utils import safe_destroy
+
+# 请求显示截图选择窗口的虚拟事件，由快捷键线程发送到主窗口
+SCREENSHOT_EVENT = '<<TakeScreenshot>>'
+
+# 截图方式：在实时桌面上框选后截取 / 按下快捷键时冻结整个屏幕后从内存中裁剪
+SCREENSHOT_MODE_LIVE = 'live'
+SCREENSHOT_MODE_FREEZE = 'freeze'
+
+# 选择窗口的透明度：实时模式半透明覆盖桌面，冻结模式完整显示冻结的画面
+LIVE_OVERLAY_ALPHA = 0.3
+FREEZE_OVERLAY_ALPHA = 1.0
+
+# GetSystemMetrics 参数：主显示器的大小，虚拟屏幕（所有显示器）的位置与大小
+SM_CXSCREEN = 0
+SM_CYSCREEN = 1
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+
+# BitBlt / GetDIBits 参数
+SRCCOPY = 0x00CC0020
+CAPTUREBLT = 0x40000000  # 包含分层窗口（如半透明的提示框）
+BI_RGB = 0
+BI_BITFIELDS = 3
+DIB_RGB_COLORS = 0
+
+# 剪贴板 CF_DIB 的 R、G、B 颜色掩码：显式声明第 4 个字节不是透明度，避免部分程序粘贴出透明图像
+DIB_COLOR_MASKS = (0x00FF0000, 0x0000FF00, 0x000000FF)
+
+# GlobalAlloc 参数：剪贴板数据需使用可移动的全局内存
+GMEM_MOVEABLE = 0x0002
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ('biSize', ctypes.c_uint32),
+        ('biWidth', ctypes.c_int32),
+        ('biHeight', ctypes.c_int32),
+        ('biPlanes', ctypes.c_uint16),
+        ('biBitCount', ctypes.c_uint16),
+        ('biCompression', ctypes.c_uint32),
+        ('biSizeImage', ctypes.c_uint32),
+        ('biXPelsPerMeter', ctypes.c_int32),
+        ('biYPelsPerMeter', ctypes.c_int32),
+        ('biClrUsed', ctypes.c_uint32),
+        ('biClrImportant', ctypes.c_uint32)
+    ]
+
+
+def make_bitmap_header(width, height, compression=BI_RGB):
+    """32 位位图头，height 为正表示像素行自下而上排列"""
+    return BITMAPINFOHEADER(ctypes.sizeof(BITMAPINFOHEADER), width, height, 1, 32, compression,
+                            abs(width * height) * 4, 0, 0, 0, 0)
+
+
+class Capture:
+    """一次截取的像素数据：每像素 4 字节（BGRX），left、top 为左上角的屏幕坐标
+
+    bottom_up 为 True 时像素行自下而上排列（与 GDI 位图一致）。
+    """
+
+    __slots__ = ('data', 'left', 'top', 'width', 'height', 'stride', 'bottom_up')
+
+    def __init__(self, data, left, top, width, height, stride=None, bottom_up=False):
+        self.data = data
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.stride = stride or width * 4
+        self.bottom_up = bottom_up
+
+    @property
+    def nbytes(self):
+        return self.stride * self.height
+
+    def crop(self, left, top, width, height):
+        """按屏幕坐标裁剪（超出部分被截掉），只复制选中的像素行"""
+        x0 = max(left - self.left, 0)
+        y0 = max(top - self.top, 0)
+        x1 = min(left - self.left + width, self.width)
+        y1 = min(top - self.top + height, self.height)
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError(f"裁剪区域不在截图范围内: {(left, top, width, height)}")
+        # 按存储顺序取出选中的行
+        rows = range(self.height - y1, self.height - y0) if self.bottom_up else range(y0, y1)
+        view = memoryview(self.data)
+        row_bytes = (x1 - x0) * 4
+        if x0 == 0 and row_bytes == self.stride:
+            data = bytearray(view[rows.start * self.stride:rows.stop * self.stride])
+        else:
+            data = bytearray(row_bytes * len(rows))
+            offset = 0
+            for row in rows:
+                start = row * self.stride + x0 * 4
+                data[offset:offset + row_bytes] = view[start:start + row_bytes]
+                offset += row_bytes
+        return Capture(data, self.left + x0, self.top + y0, x1 - x0, y1 - y0, row_bytes, self.bottom_up)
+
+    def to_image(self):
+        """转换为 RGB 的 PIL 图像"""
+        return Image.frombuffer('RGB', (self.width, self.height), self.data, 'raw', 'BGRX',
+                                self.stride, -1 if self.bottom_up else 1)
+
+    @classmethod
+    def from_image(cls, img, left=0, top=0):
+        """由 PIL 图像构建"""
+        data = img.convert('RGB').tobytes('raw', 'BGRX')
+        return cls(data, left, top, img.width, img.height)
+
+
+def dib_size(capture):
+    """CF_DIB 数据的字节数：位图头 + 颜色掩码 + 32 位像素"""
+    return ctypes.sizeof(BITMAPINFOHEADER) + len(DIB_COLOR_MASKS) * 4 + capture.width * capture.height * 4
+
+
+def write_dib(capture, dest):
+    """把截图写为 CF_DIB（BI_BITFIELDS 位图头 + 颜色掩码 + 自下而上的像素行）
+
+    dest 为可写的 memoryview，像素直接从截图缓冲区逐行复制过去，中间不生成 BMP 文件或临时副本。
+    截取的像素第 4 个字节为 0，由颜色掩码表明其不含透明度，无需逐像素改写。
+    """
+    header = make_bitmap_header(capture.width, capture.height, BI_BITFIELDS)
+    masks = (ctypes.c_uint32 * len(DIB_COLOR_MASKS))(*DIB_COLOR_MASKS)
+    header_size = ctypes.sizeof(header)
+    dest[:header_size] = memoryview(header).cast('B')
+    dest[header_size:header_size + ctypes.sizeof(masks)] = memoryview(masks).cast('B')
+    header_size += ctypes.sizeof(masks)
+    source = memoryview(capture.data)
+    row_bytes = capture.width * 4
+    if capture.bottom_up and capture.stride == row_bytes:
+        # GDI 截取的像素已是自下而上排列，整块复制
+        dest[header_size:header_size + row_bytes * capture.height] = source[:row_bytes * capture.height]
+        return
+    offset = header_size
+    for row in range(capture.height):
+        # 目标第 row 行对应图像自下而上的第 row 行
+        index = row if capture.bottom_up else capture.height - 1 - row
+        start = index * capture.stride
+        dest[offset:offset + row_bytes] = source[start:start + row_bytes]
+        offset += row_bytes
+
+
+def set_clipboard_dib(capture):
+    """把截图作为 CF_DIB 写入 Windows 剪贴板，像素只复制一次（直接写入剪贴板的全局内存）"""
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = ctypes.c_void_p
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+
+    size = dib_size(capture)
+    handle = kernel32.GlobalAlloc(GMEM_MOVEABLE, size)
+    if not handle:
+        raise ctypes.WinError()
+    try:
+        address = kernel32.GlobalLock(handle)
+        if not address:
+            raise ctypes.WinError()
+        try:
+            write_dib(capture, memoryview((ctypes.c_char * size).from_address(address)).cast('B'))
+        finally:
+            kernel32.GlobalUnlock(handle)
+
+        OpenClipboard()
+        try:
+            EmptyClipboard()
+            SetClipboardData(CF_DIB, handle)  # 成功后内存归剪贴板所有
+            handle = None
+        finally:
+            CloseClipboard()
+    finally:
+        if handle:
+            kernel32.GlobalFree(handle)
+
+
+class ClipboardWriter:
+    """在后台线程中把截图写入剪贴板，不占用 Tk 主线程
+
+    尚未写入时又有新的截图，只写入最新的一张。
+    """
+
+    def __init__(self, set_dib=None):
+        self._set_dib = set_dib or set_clipboard_dib
+        self._condition = threading.Condition()
+        self._pending = None
+        self._thread = None
+        self._running = True
+        self._busy = False  # 正在写入剪贴板
+        self.stats = {'written': 0, 'replaced': 0, 'failed': 0}
+
+    def submit(self, capture):
+        """提交截图，立即返回"""
+        with self._condition:
+            if not self._running:
+                return
+            if self._pending is not None:
+                self.stats['replaced'] += 1
+            self._pending = capture
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clipboard-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                capture, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._set_dib(capture)
+                self.stats['written'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logging.error(f"复制到剪贴板失败: {str(e)}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """等待已提交的截图写入完成，返回是否在超时前完成"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self):
+        """停止后台线程，未写入的截图被丢弃"""
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify_all()
+
+
+class CaptureBackend:
+    """屏幕截取后端接口，stats 记录截取次数与复制的字节数"""
+
+    def __init__(self):
+        self.stats = {'captures': 0, 'bytes': 0}
+
+    def virtual_screen(self):
+        """获取所有显示器组成的虚拟屏幕 (left, top, width, height)"""
+        raise NotImplementedError
+
+    def capture(self, left, top, width, height):
+        """截取屏幕区域，返回 Capture"""
+        raise NotImplementedError
+
+    def primary_screen(self):
+        """获取主显示器 (left, top, width, height)，原点为 (0, 0)"""
+        raise NotImplementedError
+
+    def capture_all(self):
+        """截取所有显示器"""
+        return self.capture(*self.virtual_screen())
+
+    def capture_primary(self):
+        """截取主显示器"""
+        return self.capture(*self.primary_screen())
+
+    def _record(self, capture):
+        self.stats['captures'] += 1
+        self.stats['bytes'] += capture.nbytes
+        return capture
+
+
+class GDICaptureBackend(CaptureBackend):
+    """Windows 下通过 BitBlt 把屏幕复制到内存位图，再用 GetDIBits 直接读入 Capture 的缓冲区
+
+    像素只复制一次（位图 -> 缓冲区），行顺序与剪贴板的 CF_DIB 一致，无需再转换。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._load_lock = threading.Lock()
+        self._gdi32 = None
+        self._user32 = None
+
+    def _load(self):
+        """首次使用时加载 GDI 函数"""
+        with self._load_lock:
+            if self._gdi32 is None:
+                user32 = ctypes.windll.user32
+                gdi32 = ctypes.windll.gdi32
+                user32.GetDC.argtypes = [wintypes.HWND]
+                user32.GetDC.restype = wintypes.HDC
+                user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+                gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+                gdi32.CreateCompatibleDC.restype = wintypes.HDC
+                gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+                gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+                gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+                gdi32.SelectObject.restype = wintypes.HGDIOBJ
+                gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                         wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+                gdi32.GetDIBits.argtypes = [wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT,
+                                            ctypes.c_void_p, ctypes.POINTER(BITMAPINFOHEADER), wintypes.UINT]
+                gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+                gdi32.DeleteDC.argtypes = [wintypes.HDC]
+                self._user32 = user32
+                self._gdi32 = gdi32
+        return self._gdi32, self._user32
+
+    def virtual_screen(self):
+        gdi32, user32 = self._load()
+        return (user32.GetSystemMetrics(SM_XVIRTUALSCREEN), user32.GetSystemMetrics(SM_YVIRTUALSCREEN),
+                user32.GetSystemMetrics(SM_CXVIRTUALSCREEN), user32.GetSystemMetrics(SM_CYVIRTUALSCREEN))
+
+    def primary_screen(self):
+        gdi32, user32 = self._load()
+        return (0, 0, user32.GetSystemMetrics(SM_CXSCREEN), user32.GetSystemMetrics(SM_CYSCREEN))
+
+    def capture(self, left, top, width, height):
+        gdi32, user32 = self._load()
+        screen_dc = user32.GetDC(None)
+        mem_dc = gdi32.CreateCompatibleDC(screen_dc)
+        bitmap = gdi32.CreateCompatibleBitmap(screen_dc, width, height)
+        try:
+            previous = gdi32.SelectObject(mem_dc, bitmap)
+            copied = gdi32.BitBlt(mem_dc, 0, 0, width, height, screen_dc, left, top, SRCCOPY | CAPTUREBLT)
+            gdi32.SelectObject(mem_dc, previous)  # GetDIBits 要求位图未被选入设备上下文
+            if not copied:
+                raise ctypes.WinError()
+            data = bytearray(width * height * 4)
+            buffer = (ctypes.c_char * len(data)).from_buffer(data)
+            header = make_bitmap_header(width, height)
+            if gdi32.GetDIBits(mem_dc, bitmap, 0, height, buffer, ctypes.byref(header), DIB_RGB_COLORS) != height:
+                raise ctypes.WinError()
+        finally:
+            gdi32.DeleteObject(bitmap)
+            gdi32.DeleteDC(mem_dc)
+            user32.ReleaseDC(None, screen_dc)
+        return self._record(Capture(data, left, top, width, height, width * 4, bottom_up=True))
+
+
+class GenericCaptureBackend(CaptureBackend):
+    """通过 PIL.ImageGrab 截取，适用于 Windows 以外的平台"""
+
+    def virtual_screen(self):
+        if sys.platform == 'win32':
+            # 副显示器在主显示器左侧或上方时虚拟屏幕的原点为负值
+            user32 = ctypes.windll.user32
+            return (user32.GetSystemMetrics(SM_XVIRTUALSCREEN), user32.GetSystemMetrics(SM_YVIRTUALSCREEN),
+                    user32.GetSystemMetrics(SM_CXVIRTUALSCREEN), user32.GetSystemMetrics(SM_CYVIRTUALSCREEN))
+        img = ImageGrab.grab()
+        return (0, 0, img.width, img.height)
+
+    def primary_screen(self):
+        if sys.platform == 'win32':
+            user32 = ctypes.windll.user32
+            return (0, 0, user32.GetSystemMetrics(SM_CXSCREEN), user32.GetSystemMetrics(SM_CYSCREEN))
+        img = ImageGrab.grab()
+        return (0, 0, img.width, img.height)
+
+    def capture(self, left, top, width, height):
+        img = ImageGrab.grab(bbox=(left, top, left + width, top + height), all_screens=sys.platform == 'win32')
+        return self._record(Capture.from_image(img, left, top))
+
+    def capture_all(self):
+        """只截取一次，原点取自虚拟屏幕"""
+        if sys.platform == 'win32':
+            left, top = self.virtual_screen()[:2]
+            img = ImageGrab.grab(all_screens=True)
+        else:
+            left, top = 0, 0
+            img = ImageGrab.grab()
+        return self._record(Capture.from_image(img, left, top))
+
+    def capture_primary(self):
+        """只截取一次，Windows 下不带 all_screens 时截取的即为主显示器"""
+        return self._record(Capture.from_image(ImageGrab.grab(), 0, 0))
+
+
+class SyntheticCaptureBackend(CaptureBackend):
+    """内存中的合成屏幕，用于在没有图形界面的环境下测试"""
+
+    def __init__(self, width=1920, height=1080, left=0, top=0):
+        super().__init__()
+        self.screen = Capture(self._pattern(width, height), left, top, width, height)
+
+    @staticmethod
+    def _pattern(width, height):
+        """水平渐变的测试画面"""
+        row = bytearray(width * 4)
+        row[0::4] = bytes(x & 0xFF for x in range(width))
+        row[1::4] = bytes((x >> 8) & 0xFF for x in range(width))
+        row[2::4] = b'\x80' * width
+        return bytes(row) * height
+
+    def virtual_screen(self):
+        return (self.screen.left, self.screen.top, self.screen.width, self.screen.height)
+
+    def primary_screen(self):
+        # 合成屏幕中原点右下方的部分视为主显示器
+        return (0, 0, self.screen.width + self.screen.left, self.screen.height + self.screen.top)
+
+    def capture(self, left, top, width, height):
+        return self._record(self.screen.crop(left, top, width, height))
+
+
+def create_default_backend():
+    """根据平台选择截取后端"""
+    if sys.platform == 'win32':
+        return GDICaptureBackend()
+    return GenericCaptureBackend()
+
 class ScreenshotTaker:
-    def __init__(self, screenshot_queue):
-        self.screenshot_queue = screenshot_queue
+    def __init__(self, screenshot_queue, root, capture_backend=None):
+        self.screenshot_queue = screenshot_queue  # 截好的图放入其中（ScreenshotPipeline）
+        self.root = root  # 主程序的 Tk 根窗口，选择窗口挂在它下面
+        self.capture_backend = capture_backend if capture_backend is not None else create_default_backend()
+        self.clipboard = ClipboardWriter()  # 剪贴板在后台线程中写入
         self.start_x = 0
         self.start_y = 0
         self.rect = None
-        self.root = None
         self.selection_root = None
+        self.canvas = None
+        self.active = False  # 选择窗口是否正在显示
+        self.config = Config()
+        self.frame = None  # 冻结模式下按下快捷键时截取的主显示器（Capture）
+        self._pending_frame = None  # 快捷键线程截取、尚未显示的冻结画面
+        self._frame_photo = None
+        self._frame_item = None
+        # 选择窗口只创建一次，不用时隐藏，按下快捷键时直接显示
+        self.root.bind(SCREENSHOT_EVENT, self._show_overlay)
+        self._create_overlay()
 
-    def take_screenshot(self):
-        """截图功能实现"""
+    def _create_overlay(self):
+        """创建隐藏的全屏选择窗口"""
         try:
-            # 清理之前的窗口
-            self.cleanup()
+            self.selection_root = Toplevel(self.root)
+            self.selection_root.withdraw()
+            self.selection_root.title("截图")
+            
+            # 设置窗口属性
+            self.selection_root.attributes(
+                "-fullscreen", True,
+                "-alpha", 0.3,
+                "-topmost", True
+            )
+            self.selection_root.overrideredirect(1)  # 无边框
+            
+            # 创建画布
+            self.canvas = tk.Canvas(
+                self.selection_root,
+                cursor="cross",
+                bg=DARK_THEME['CANVAS_BG'],
+                highlightthickness=0
+            )
+            self.canvas.pack(fill="both", expand=True)
+            
+            # 绑定事件
+            self.canvas.bind("<Button-1>", self.on_mouse_down)
+            self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
+            self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
+            
+            # 绑定ESC键退出
+            self.selection_root.bind("<Escape>", lambda e: self.cancel_screenshot())
             
-            # 创建新窗口
-            try:
-                self.root = tk.Tk()
-                self.root.withdraw()
-                
-                # 创建选择窗口
-                self.selection_root = Toplevel(self.root)
-                self.selection_root.title("截图")
-                
-                # 设置窗口属性
-                self.selection_root.attributes(
-                    "-fullscreen", True,
-                    "-alpha", 0.3,
-                    "-topmost", True
-                )
-                self.selection_root.overrideredirect(1)  # 无边框
-                
-                # 确保窗口在最前面
-                self.selection_root.lift()
-                self.selection_root.focus_force()
-                
-                # 创建画布
-                canvas = tk.Canvas(
-                    self.selection_root,
-                    cursor="cross",
-                    bg=DARK_THEME['CANVAS_BG'],
-                    highlightthickness=0
-                )
-                canvas.pack(fill="both", expand=True)
-                
-                # 绑定事件
-                canvas.bind("<Button-1>", self.on_mouse_down)
-                canvas.bind("<B1-Motion>", self.on_mouse_drag)
-                canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
-                
-                # 绑定ESC键退出
-                self.selection_root.bind("<Escape>", lambda e: self.cancel_screenshot())
-                
-                # 进入主循环
-                self.root.mainloop()
-                
-            except tk.TclError as e:
-                if "application has been destroyed" in str(e):
-                    logging.info("窗口已被销毁，重新创建")
-                    self.cleanup()
-                    return
-                raise
-                
         except Exception as e:
-            logging.error(f"截图功能出错: {str(e)}")
-            self.cleanup()
+            logging.error(f"创建截图选择窗口失败: {str(e)}")
+            self.selection_root = None
+            self.canvas = None
 
-    def cancel_screenshot(self):
-        """取消截图"""
+    def take_screenshot(self):
+        """截图功能实现，可在快捷键线程中调用，选择窗口在主线程中显示"""
         try:
-            if hasattr(self, 'selection_root') and self.selection_root:
-                try:
-                    self.selection_root.quit()
-                except:
-                    pass
-                try:
-                    self.selection_root.destroy()
-                except:
-                    pass
-                self.selection_root = None
-                
-            if hasattr(self, 'root') and self.root:
-                try:
-                    self.root.quit()
-                except:
-                    pass
+            if self.active:
+                return
+            # 冻结模式：在选择窗口出现、焦点变化之前截取屏幕，菜单和提示框等也能截到；
+            # 选择窗口只覆盖主显示器，因此只截取主显示器
+            self._pending_frame = None
+            if self.config.get_screenshot_mode() == SCREENSHOT_MODE_FREEZE:
                 try:
-                    self.root.destroy()
-                except:
-                    pass
-                self.root = None
-                
+                    self._pending_frame = self.capture_backend.capture_primary()
+                except Exception as e:
+                    logging.error(f"冻结屏幕失败，改为实时截图: {str(e)}")
+            self.root.event_generate(SCREENSHOT_EVENT, when='tail')
         except Exception as e:
-            logging.error(f"取消截图失败: {str(e)}")
+            logging.error(f"截图功能出错: {str(e)}")
 
-    def cleanup(self):
-        """清理资源"""
+    def _show_overlay(self, event=None):
+        """在主线程中显示选择窗口"""
         try:
-            # 先检查并清理图片资源
-            if hasattr(self, 'img'):
-                try:
-                    del self.img
-                except Exception as e:
-                    logging.error(f"清理图片资源失败: {str(e)}")
+            if self.active:
+                return
+            if not self.selection_root or not self.selection_root.winfo_exists():
+                self._create_overlay()
+                if not self.selection_root:
+                    return
+            
+            self._reset_selection()
+            self.active = True
+            pending, self._pending_frame = self._pending_frame, None
+            if pending is not None:
+                self._show_frame(pending)
+            else:
+                self.selection_root.attributes("-alpha", LIVE_OVERLAY_ALPHA)
+            self.selection_root.deiconify()
+            
+            # 确保窗口在最前面
+            self.selection_root.lift()
+            self.selection_root.focus_force()
+            
+        except Exception as e:
+            logging.error(f"显示截图选择窗口失败: {str(e)}")
+            self.cancel_screenshot()
 
-            # 检查并清理选择窗口
-            if hasattr(self, 'selection_root') and self.selection_root:
-                try:
-                    self.selection_root.destroy()
-                except Exception as e:
-                    logging.error(f"销毁选择窗口失败: {str(e)}")
-                finally:
-                    self.selection_root = None
+    def _show_frame(self, frame):
+        """在选择窗口中显示冻结的主显示器画面"""
+        self.frame = frame
+        self._frame_photo = ImageTk.PhotoImage(frame.to_image())
+        self._frame_item = self.canvas.create_image(0, 0, anchor='nw', image=self._frame_photo)
+        self.selection_root.attributes("-alpha", FREEZE_OVERLAY_ALPHA)
 
-            # 检查并清理根窗口
-            if hasattr(self, 'root') and self.root:
-                try:
-                    self.root.destroy()
-                except Exception as e:
-                    logging.error(f"销毁根窗口失败: {str(e)}")
-                finally:
-                    self.root = None
+    def _release_frame(self):
+        """释放冻结的画面"""
+        if self._frame_item is not None and self.canvas:
+            try:
+                self.canvas.delete(self._frame_item)
+            except Exception:
+                pass
+        self._frame_item = None
+        self._frame_photo = None
+        self.frame = None
 
-            # 强制垃圾回收
+    def _reset_selection(self):
+        """清除上一次的选择框"""
+        if self.rect is not None and self.canvas:
             try:
-                import gc
-                gc.collect()
-            except Exception as e:
-                logging.error(f"垃圾回收失败: {str(e)}")
+                self.canvas.delete(self.rect)
+            except Exception:
+                pass
+        self.rect = None
+
+    def cancel_screenshot(self):
+        """取消截图：隐藏选择窗口，留待下次使用"""
+        try:
+            self.active = False
+            self._reset_selection()
+            if self.selection_root:
+                self.selection_root.withdraw()
+            self._release_frame()
+        except Exception as e:
+            logging.error(f"取消截图失败: {str(e)}")
 
+    def cleanup(self):
+        """程序退出时销毁选择窗口"""
+        try:
+            self.active = False
+            self._release_frame()
+            self.clipboard.close()
+            self.root.unbind(SCREENSHOT_EVENT)
+            safe_destroy(self.selection_root)
         except Exception as e:
             logging.error(f"清理资源失败: {str(e)}")
         finally:
-            # 确保所有引用都被清除
-            for attr in ['img', 'selection_root', 'root', 'rect']:
-                if hasattr(self, attr):
-                    try:
-                        delattr(self, attr)
-                    except:
-                        pass
+            self.selection_root = None
+            self.canvas = None
+            self.rect = None
 
     def on_mouse_down(self, event):
         try:
@@ -187,52 +616,34 @@ class ScreenshotTaker:
                 self.cancel_screenshot()
                 return
             
-            # 隐藏选择窗口
-            try:
-                if self.selection_root:
-                    self.selection_root.withdraw()
-            except:
-                pass
+            left = min(self.start_x, event.x)
+            top = min(self.start_y, event.y)
             
-            # 截取屏幕
             try:
-                img = pyautogui.screenshot(region=(
-                    min(self.start_x, event.x), 
-                    min(self.start_y, event.y),
-                    width, 
-                    height
-                ))
-                
-                # 复制到剪贴板
-                self._copy_to_clipboard(img)
+                if self.frame is not None:
+                    # 冻结模式：直接从内存中的画面裁剪，不再截取屏幕
+                    capture = self.frame.crop(left, top, width, height)
+                else:
+                    # 隐藏选择窗口后截取屏幕
+                    try:
+                        if self.selection_root:
+                            self.selection_root.withdraw()
+                    except:
+                        pass
+                    capture = self.capture_backend.capture(left, top, width, height)
+                # 复制到剪贴板（后台线程中直接由像素数据生成 CF_DIB）
+                self.clipboard.submit(capture)
                 
                 # 放入队列
                 if self.screenshot_queue:
-                    self.screenshot_queue.put(img)
+                    self.screenshot_queue.put(capture.to_image())
                 
             except Exception as e:
                 logging.error(f"截取屏幕失败: {str(e)}")
             
-            # 清理窗口
-            self.cleanup()
+            # 隐藏选择窗口，留待下次使用
+            self.cancel_screenshot()
             
         except Exception as e:
             logging.error(f"鼠标释放事件处理出错: {str(e)}")
-            self.cleanup()
-
-    def _copy_to_clipboard(self, img):
-        """将图片复制到剪贴板"""
-        if img and img.width > 0 and img.height > 0:
-            try:
-                output = BytesIO()
-                img.convert('RGB').save(output, 'BMP')
-                data = output.getvalue()[14:]
-                output.close()
-                
-                OpenClipboard()
-                EmptyClipboard()
-                SetClipboardData(CF_DIB, data)
-                CloseClipboard()
-                
-            except Exception as e:
-                logging.error(f"复制到剪贴板失败: {str(e)}") 
+            self.cancel_screenshot()
@@ -0,0 +1,131 @@
+import logging
+import threading
+from collections import deque
+
+# 同时存在的截图上限（排队中 + 已打开选项窗口）
+DEFAULT_MAX_IN_FLIGHT = 3
+
+# 达到上限后的处理方式
+POLICY_DROP = 'drop'          # 丢弃新的截图（仍会复制到剪贴板）
+POLICY_COALESCE = 'coalesce'  # 保留新的截图：替换最早排队（尚未显示）的截图，不关闭已打开的窗口
+
+POLICY_LABELS = {
+    POLICY_DROP: '丢弃新截图',
+    POLICY_COALESCE: '保留新截图'
+}
+
+
+def image_nbytes(img):
+    """估算图像占用的内存（PIL 内部 RGB 每像素占 4 字节）"""
+    if img is None:
+        return 0
+    return img.width * img.height * (1 if img.mode in ('1', 'L', 'P') else 4)
+
+
+class ScreenshotSlot:
+    """流水线中的一张截图，选项窗口关闭时调用 release 归还名额"""
+
+    def __init__(self, pipeline, img):
+        self.pipeline = pipeline
+        self.img = img
+        self.nbytes = image_nbytes(img)
+        self.released = False
+
+    def release(self):
+        self.pipeline.release(self)
+
+
+class ScreenshotPipeline:
+    """有上限的截图流水线，替代无界的截图队列
+
+    截取线程调用 put 放入截图，并通过 notify 回调唤醒主线程；主线程用 get_nowait 取出截图显示，
+    显示截图的窗口关闭后 release 归还名额。排队中和已显示的截图总数不超过 max_in_flight。
+    已显示的截图窗口可能正在编辑，流水线从不关闭它们：名额都被已打开的窗口占用时，新的截图一律丢弃。
+    """
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, policy=POLICY_COALESCE, notify=None):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.policy = policy if policy in POLICY_LABELS else POLICY_COALESCE
+        self._notify = notify
+        self._listener = None
+        self._lock = threading.Lock()
+        self._queued = deque()   # 等待显示的截图
+        self._open = deque()     # 已显示、窗口尚未关闭的截图
+        self.stats = {'accepted': 0, 'dropped': 0, 'coalesced': 0}
+
+    def set_notify(self, notify):
+        """设置有新截图时的唤醒回调"""
+        self._notify = notify
+
+    def set_status_listener(self, listener):
+        """设置排队数量或内存占用变化时的回调"""
+        self._listener = listener
+
+    def put(self, img):
+        """放入截图，返回是否被接受"""
+        with self._lock:
+            if len(self._queued) + len(self._open) >= self.max_in_flight:
+                if self.policy == POLICY_COALESCE and self._queued:
+                    self._queued.popleft()
+                    self.stats['coalesced'] += 1
+                    logging.info("截图数量已达上限，替换最早排队的截图")
+                    accepted = True
+                else:
+                    # 名额都被已打开的窗口占用时同样丢弃，不关闭用户可能正在编辑的窗口
+                    self.stats['dropped'] += 1
+                    logging.info(f"截图数量已达上限 {self.max_in_flight}，丢弃新截图")
+                    accepted = False
+            else:
+                accepted = True
+            if accepted:
+                self._queued.append(ScreenshotSlot(self, img))
+                self.stats['accepted'] += 1
+        self._notify_changed(accepted)
+        return accepted
+
+    def get_nowait(self):
+        """取出一张等待显示的截图，没有时返回 None（主线程调用）"""
+        with self._lock:
+            if not self._queued:
+                return None
+            slot = self._queued.popleft()
+            self._open.append(slot)
+            return slot
+
+    def release(self, slot):
+        """截图窗口关闭后归还名额并释放图像"""
+        with self._lock:
+            if slot.released:
+                return
+            slot.released = True
+            if slot in self._open:
+                self._open.remove(slot)
+            slot.img = None
+        self._notify_changed(False)
+
+    def get_status(self):
+        """获取排队数量与截图占用的内存"""
+        with self._lock:
+            slots = list(self._queued) + list(self._open)
+            return {
+                'queued': len(self._queued),
+                'open': len(self._open),
+                'max_in_flight': self.max_in_flight,
+                'policy': self.policy,
+                'bytes': sum(slot.nbytes for slot in slots),
+                'dropped': self.stats['dropped'],
+                'coalesced': self.stats['coalesced']
+            }
+
+    def _notify_changed(self, wake):
+        """唤醒主线程并通知状态变化"""
+        if wake and self._notify is not None:
+            try:
+                self._notify()
+            except Exception as e:
+                logging.error(f"唤醒截图处理失败: {str(e)}")
+        if self._listener is not None:
+            try:
+                self._listener()
+            except Exception as e:
+                logging.error(f"通知截图状态变化失败: {str(e)}")
@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import logging
-import time
 import os
 from ..utils.config import (
     LIGHT_THEME as THEME,
@@ -9,6 +8,9 @@ from ..utils.config import (
 )
 import copy
 
+# 应用监听页资源占用显示的刷新间隔（毫秒）
+USAGE_REFRESH_MS = 2000
+
 class ConfigWindow:
     def __init__(self, root, config):
         self.root = root
@@ -418,6 +420,7 @@ class ConfigWindow:
         提示：
         1. 源按键输入单个按键，如: / 或 . 等
         2. 目标字符输入替换后的字符，如: 、 或 。等
+        3. 更多映射可在配置文件的 key_conversion.mappings 中添加
         """
         tip_label = tk.Label(
             frame,
@@ -445,31 +448,9 @@ class ConfigWindow:
                 messagebox.showerror("错误", "源按键和目标字符都必须是单个字符")
                 return
 
-            # 保存设置
+            # 保存设置，IMEMonitor 订阅了按键转换配置，会自动重新编译转换表
             self.config.set_key_conversion(source_key, target_char)
             
-            # 重启入法监控以应用新设置
-            from main import MainApplication
-            if hasattr(MainApplication, 'instance') and MainApplication.instance:
-                ime_monitor = MainApplication.instance.ime_monitor
-                if ime_monitor:
-                    # 如果功能已启用，则重启监控
-                    if ime_monitor.enabled:
-                        # 保存当前的截图快捷键状态
-                        screenshot_enabled = MainApplication.instance.hotkey_registered
-                        
-                        ime_monitor.stop_monitoring()  # 停止当前监控
-                        time.sleep(0.1)  # 短暂延迟确保清理完成
-                        ime_monitor.start_monitoring()  # 使用新设置启动监控
-                        
-                        # 如果截图功能之前是启用的，重新注册截图快键
-                        if screenshot_enabled:
-                            MainApplication.instance.toggle_screenshot(True)
-                        
-                        logging.info("已重启输入法监控以应用新设置")
-                    else:
-                        logging.info("输入法转换功能未启用，重启应用时生效")
-            
             messagebox.showinfo("成功", "按键设置已保存并生效")
             logging.info(f"已保存按键设置 - 源按键: {source_key}, 目标字符: {target_char}")
 
@@ -483,7 +464,7 @@ class ConfigWindow:
         frame.pack(fill="both", expand=True, padx=35, pady=30)
 
         # 添加说明文本
-        info_text = "添加需要监听的应用程序，如果检测到程序未运行则自动启动\n重启间隔为0表示不进行重启\n        3. 设置后需要重启程序生效"
+        info_text = "添加需要监听的应用程序，如果检测到程序未运行则自动启动\n重启间隔为0表示不进行重启\n保存设置后立即生效"
         info_label = tk.Label(
             frame,
             text=info_text,
@@ -544,12 +525,18 @@ class ConfigWindow:
         # 加载现有应用列表
         self._load_apps_list()
 
+        # 定时刷新资源占用显示
+        self.window.after(USAGE_REFRESH_MS, self._refresh_usage)
+
         return frame
 
     def _save_monitor_settings(self):
         """保存应用监听设置"""
         try:
             apps_config = []
+            
+            # 保留配置文件中界面未提供的字段（如重启策略参数）
+            existing_apps = {app['path']: app for app in self.config.get_monitored_apps()}
 
             for entry in self.app_entries:
                 try:
@@ -576,13 +563,14 @@ class ConfigWindow:
                         return
 
                     # 构建应用配置
-                    app_config = {
+                    app_config = dict(existing_apps.get(current_values['path'], {}))
+                    app_config.update({
                         'path': current_values['path'],
                         'name': os.path.basename(current_values['path']),
                         'check_interval': current_values['check_interval'],
                         'restart_interval': current_values['restart_interval'],
                         'minimize_to_tray': is_tray_launch  # 根据下拉框的值设置
-                    }
+                    })
                     
                     # 记录日志
                     logging.info(f"保存应用配置: {app_config['name']}, "
@@ -595,11 +583,12 @@ class ConfigWindow:
                     messagebox.showerror("错误", "请输入有效的时间间隔")
                     return
 
-            # 更新配置
-            new_config = {
+            # 更新配置，保留采样设置等其他字段
+            new_config = dict(self.config.config_data.get('app_monitor', {}))
+            new_config.update({
                 'enabled': True,  # 总是启用
                 'apps': apps_config
-            }
+            })
 
             # 保存配置前记录
             logging.debug(f"即将保存的配置: {new_config}")
@@ -796,9 +785,21 @@ class ConfigWindow:
         launch_mode_combo.set(initial_value)
         tray_var.set(initial_value)  # 确保StringVar也被正确设置
 
+        # 第三行：资源占用（由 _refresh_usage 定时刷新）
+        usage_label = tk.Label(
+            inner_frame,
+            text="资源占用：暂无数据",
+            bg=THEME['BG'],
+            fg="#808080",
+            font=('Microsoft YaHei UI', 9),
+            anchor="w"
+        )
+        usage_label.pack(fill="x")
+
         # 创建临时数据结构
         entry_data = {
             'frame': app_frame,
+            'usage_label': usage_label,
             'path': path_entry,
             'check_interval': interval_entry,
             'restart_interval': restart_entry,
@@ -813,6 +814,45 @@ class ConfigWindow:
 
         return entry_data
 
+    def _refresh_usage(self):
+        """刷新各应用的资源占用显示"""
+        try:
+            if not self.window or not self.window.winfo_exists():
+                return
+            
+            from main import MainApplication
+            summary = {}
+            if hasattr(MainApplication, 'instance') and MainApplication.instance:
+                if hasattr(MainApplication.instance, 'process_monitor'):
+                    summary = MainApplication.instance.process_monitor.get_telemetry_summary()
+            
+            for entry in self.app_entries:
+                process_name = os.path.basename(entry['path'].get().strip())
+                usage = summary.get(process_name)
+                if usage:
+                    text = self._format_usage(usage)
+                else:
+                    text = "资源占用：暂无数据"
+                entry['usage_label'].configure(text=text)
+        except Exception as e:
+            logging.error(f"刷新资源占用显示失败: {str(e)}")
+        
+        try:
+            if self.window and self.window.winfo_exists():
+                self.window.after(USAGE_REFRESH_MS, self._refresh_usage)
+        except Exception:
+            pass
+
+    def _format_usage(self, usage):
+        """格式化资源占用文本"""
+        uptime = int(usage['uptime'])
+        hours, remainder = divmod(uptime, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        growth_mb = usage['rss_growth'] / 1024 / 1024
+        return (f"PID {usage['pid']}  CPU {usage['cpu_percent']:.1f}%  "
+                f"内存 {usage['rss'] / 1024 / 1024:.1f} MB ({growth_mb:+.1f} MB)  "
+                f"句柄 {usage['handles']}  已运行 {hours}:{minutes:02d}:{seconds:02d}")
+
     def _remove_app_entry(self, app_frame, entry_data):
         """从UI中移除应用条目"""
         app_frame.destroy()
@@ -935,9 +975,7 @@ class ConfigWindow:
             from main import MainApplication
             if hasattr(MainApplication, 'instance') and MainApplication.instance:
                 if hasattr(MainApplication.instance, 'process_monitor'):
-                    # 先停止所有监控
-                    MainApplication.instance.process_monitor.stop_all(clear_config=False)
-                    # 重新加载配置并启动监控
+                    # 增量重新加载配置，只处理有变化的应用
                     MainApplication.instance.process_monitor.reload_config()
                 
         except Exception as e:
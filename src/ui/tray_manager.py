@@ -10,9 +10,11 @@ import queue
 import tkinter.messagebox as messagebox
 from ..utils.autostart import set_auto_start, check_auto_start
 from ..utils import get_resource_path
+from ..core.restart_policy import STATE_PARKED
 
 class TrayManager:
-    def __init__(self, screenshot_enabled_callback, ime_conversion_callback, app_monitor_callback=None):
+    def __init__(self, screenshot_enabled_callback, ime_conversion_callback, app_monitor_callback=None,
+                 app_status_callback=None, app_reset_callback=None):
         # 修改图标加载路径
         icon_path = get_resource_path(os.path.join('src', 'assets', 'icon.png'))
         image = Image.open(icon_path)
@@ -29,6 +31,17 @@ class TrayManager:
         # 从配置中读取自启动状态
         self.auto_start = self.config.get_auto_start()
         
+        # 应用监听状态查询与重启策略重置回调
+        self.app_status_callback = app_status_callback
+        self.app_reset_callback = app_reset_callback
+        
+        # 截图流水线状态查询回调（截图功能创建后设置）
+        self.screenshot_status_callback = None
+        
+        # 按键延迟统计的开关与查询回调（输入法监控创建后设置）
+        self.ime_latency_callback = None
+        self.ime_latency_summary_callback = None
+        
         # 保存配置窗口引用
         self.config_window = None
         self.config_root = None
@@ -51,16 +64,37 @@ class TrayManager:
                 lambda item: self._toggle_screenshot(screenshot_enabled_callback),
                 checked=lambda item: self.screenshot_enabled
             ),
+            pystray.MenuItem(
+                lambda item: self._screenshot_status_text(),
+                None,
+                enabled=False,
+                visible=lambda item: self.screenshot_status_callback is not None
+            ),
+            pystray.MenuItem(
+                "冻结屏幕截图",
+                lambda item: self._toggle_screenshot_mode(),
+                checked=lambda item: self.config.get_screenshot_mode() == 'freeze'
+            ),
             pystray.MenuItem(
                 "按键替换",
                 lambda item: self._toggle_ime(ime_conversion_callback),
                 checked=lambda item: self.ime_enabled
             ),
+            pystray.MenuItem(
+                "按键延迟",
+                pystray.Menu(self._build_ime_latency_items),
+                visible=lambda item: self.ime_latency_summary_callback is not None
+            ),
             pystray.MenuItem(
                 "应用监听",
                 lambda item: self._toggle_app_monitor(app_monitor_callback) if app_monitor_callback else None,
                 checked=lambda item: self.app_monitor_enabled
             ),
+            pystray.MenuItem(
+                "监听状态",
+                pystray.Menu(self._build_app_status_items),
+                visible=lambda item: self.app_status_callback is not None
+            ),
             pystray.MenuItem(
                 "开机自启",
                 self._toggle_auto_start,
@@ -188,6 +222,16 @@ class TrayManager:
         self.icon.update_menu()
         logging.info(f"截图功能状态: {'启用' if self.screenshot_enabled else '禁用'}")
     
+    def _toggle_screenshot_mode(self):
+        """切换截图方式：冻结屏幕后框选 / 在实时桌面上框选"""
+        try:
+            mode = 'live' if self.config.get_screenshot_mode() == 'freeze' else 'freeze'
+            self.config.set_screenshot_mode(mode)
+            self.icon.update_menu()
+            logging.info(f"截图方式: {mode}")
+        except Exception as e:
+            logging.error(f"切换截图方式失败: {str(e)}")
+    
     def _toggle_ime(self, callback):
         """切换输入法转换状态"""
         self.ime_enabled = not self.ime_enabled
@@ -246,6 +290,110 @@ class TrayManager:
         self.icon.update_menu()
         logging.info(f"更新应用监听状态: {'启用' if enabled else '禁用'}")
     
+    def _build_app_status_items(self):
+        """生成应用监听状态子菜单"""
+        try:
+            status = self.app_status_callback() if self.app_status_callback else {}
+        except Exception as e:
+            logging.error(f"获取应用监听状态失败: {str(e)}")
+            status = {}
+        
+        if not status:
+            return [pystray.MenuItem("没有监听中的应用", None, enabled=False)]
+        
+        items = []
+        for process_name, app_status in status.items():
+            text = f"{process_name}: {app_status['state_label']}"
+            if app_status.get('next_restart_in') is not None:
+                text += f"（{app_status['next_restart_in']:.0f} 秒后重启）"
+            if app_status.get('recent_restarts'):
+                text += f"  近期重启 {app_status['recent_restarts']} 次"
+            
+            if app_status['state'] == STATE_PARKED:
+                # 已暂停的应用点击后解除暂停
+                items.append(pystray.MenuItem(
+                    text + "  [点击恢复]",
+                    lambda item, name=process_name: self._reset_app(name)
+                ))
+            else:
+                items.append(pystray.MenuItem(text, None, enabled=False))
+        return items
+    
+    def _reset_app(self, process_name):
+        """解除应用的重启暂停状态"""
+        try:
+            if self.app_reset_callback:
+                self.app_reset_callback(process_name)
+            self.icon.update_menu()
+        except Exception as e:
+            logging.error(f"恢复应用重启失败: {str(e)}")
+    
+    def refresh_menu(self):
+        """刷新托盘菜单（监听状态变化时调用）"""
+        try:
+            self.icon.update_menu()
+        except Exception as e:
+            logging.error(f"刷新托盘菜单失败: {str(e)}")
+    
+    def set_screenshot_status_callback(self, callback):
+        """设置截图流水线状态查询回调"""
+        self.screenshot_status_callback = callback
+        self.refresh_menu()
+    
+    def _screenshot_status_text(self):
+        """截图流水线状态：排队数量、已打开窗口数与占用内存"""
+        try:
+            status = self.screenshot_status_callback() if self.screenshot_status_callback else None
+            if not status:
+                return "截图队列: 无数据"
+            return (f"截图队列: 排队 {status['queued']}  已打开 {status['open']}/{status['max_in_flight']}  "
+                    f"内存 {status['bytes'] / 1e6:.1f}MB")
+        except Exception as e:
+            logging.error(f"获取截图队列状态失败: {str(e)}")
+            return "截图队列: 获取失败"
+    
+    def set_ime_latency_callbacks(self, toggle_callback, summary_callback):
+        """设置按键延迟统计的开关与查询回调"""
+        self.ime_latency_callback = toggle_callback
+        self.ime_latency_summary_callback = summary_callback
+        self.refresh_menu()
+    
+    def _get_ime_latency_summary(self):
+        try:
+            return self.ime_latency_summary_callback() if self.ime_latency_summary_callback else None
+        except Exception as e:
+            logging.error(f"获取按键延迟统计失败: {str(e)}")
+            return None
+    
+    def _build_ime_latency_items(self):
+        """生成按键延迟统计子菜单"""
+        summary = self._get_ime_latency_summary()
+        items = [pystray.MenuItem(
+            "记录按键延迟",
+            lambda item: self._toggle_ime_latency(),
+            checked=lambda item: self._get_ime_latency_summary() is not None
+        )]
+        if summary is None:
+            return items
+        
+        for stats in summary.values():
+            if stats['count']:
+                text = (f"{stats['label']}: p50 {stats['p50']:.2f}ms  p99 {stats['p99']:.2f}ms  "
+                        f"最大 {stats['max']:.2f}ms（{stats['count']} 次）")
+            else:
+                text = f"{stats['label']}: 暂无数据"
+            items.append(pystray.MenuItem(text, None, enabled=False))
+        return items
+    
+    def _toggle_ime_latency(self):
+        """切换按键延迟统计"""
+        try:
+            if self.ime_latency_callback:
+                self.ime_latency_callback(self._get_ime_latency_summary() is None)
+            self.icon.update_menu()
+        except Exception as e:
+            logging.error(f"切换按键延迟统计失败: {str(e)}")
+    
     def set_app_monitor_callback(self, callback):
         """设置应用监听回调函数"""
         self.app_monitor_callback = callback
@@ -10,17 +10,20 @@ from ..utils.config import (
     DARK_THEME
 )
 from ..utils.utils import safe_destroy
-from ..core.screenshot import ScreenshotTaker
 
 class OptionsWindow:
-    def __init__(self, root, img, screenshot_queue=None):
+    def __init__(self, root, img, screenshot_queue=None, screenshot_taker=None, slot=None):
         self.root = root
         self.img = img
         self.screenshot_queue = screenshot_queue
+        self.screenshot_taker = screenshot_taker  # 主程序共用的截图器，重新截取时复用其选择窗口
+        self.slot = slot  # 截图流水线中的名额，窗口关闭时归还
         self.options_root = None
         self.config = Config()
         self.ocr_cache = None
         self.setup_window()
+        if self.slot is not None and self.options_root:
+            self.options_root.bind('<Destroy>', self._on_destroy, add='+')
 
     def setup_window(self):
         try:
@@ -167,14 +170,23 @@ class OptionsWindow:
             logging.error(f"显示选项窗口出错: {str(e)}")
             messagebox.showerror("错误", "显示选项窗口失败")
 
+    def _on_destroy(self, event):
+        """窗口销毁后归还流水线名额并释放图片"""
+        if event.widget is not self.options_root:
+            return  # 子控件的销毁事件
+        self.img = None
+        self.img_display = None
+        if self.slot is not None:
+            self.slot.release()
+            self.slot = None
+
     def retake(self):
         """重新截图"""
         safe_destroy(self.options_root)
-        if self.screenshot_queue:
-            screenshot_taker = ScreenshotTaker(self.screenshot_queue)
-            screenshot_taker.take_screenshot()
+        if self.screenshot_taker:
+            self.screenshot_taker.take_screenshot()
         else:
-            logging.error("没有可用的截图队列")
+            logging.error("没有可用的截图器")
 
     def _preprocess_image(self):
         """图片预处理"""
@@ -16,6 +16,7 @@ from .utils import (
     safe_destroy,
     global_exception_handler
 )
+from .hook_log import HookLogger
 
 import os
 import sys
@@ -39,5 +40,6 @@ __all__ = [
     'setup_logging',
     'cleanup_old_logs',
     'safe_destroy',
-    'global_exception_handler'
+    'global_exception_handler',
+    'HookLogger'
 ]
@@ -28,24 +28,52 @@ CONFIG_FILE = os.path.join(CONFIG_DIR, 'config.json')
 # 默认配置
 DEFAULT_CONFIG = {
     'screenshot_enabled': True,
+    'screenshot_mode': 'live',  # 截图方式: live 在实时桌面上框选, freeze 按下快捷键时冻结屏幕后框选
+    'screenshot_pipeline': {
+        'max_in_flight': 3,  # 同时存在的截图上限（排队中 + 已打开的截图窗口）
+        'policy': 'coalesce'  # 达到上限后: drop 丢弃新截图, coalesce 保留新截图并替换最早排队的截图
+    },
     'tesseract_path': '',    # 用于存储 Tesseract 路径
     'ime_conversion_enabled': False,  # 添加输入法转换功能的开关
+    'ime_latency_tracking': False,  # 是否记录按键替换的延迟统计
     'key_conversion': {
         'source_key': '/',
-        'target_char': '、'
+        'target_char': '、',
+        'mappings': [  # 额外的按键映射，格式: [{'source_key': '按键', 'target_char': '输出字符'}]
+            # 示例：
+            # {'source_key': '[', 'target_char': '【'},
+            # {'source_key': ']', 'target_char': '】'}
+        ],
+        'profiles': {  # 按前台应用覆盖，格式: {'进程名': {'enabled': True, 'mappings': [...]}}
+            # 示例：
+            # 'code.exe': {'enabled': False},     # 在编辑器中不替换
+            # 'wechat.exe': {'enabled': True, 'mappings': [{'source_key': '\\', 'target_char': '、'}]}
+        }
     },
     'log_retention_days': 7,  # 添加日志保存天数配置
     'auto_start': False,  # 添加自启动配置
     'app_monitor': {
         'enabled': False,  # 应用监听功能
+        'telemetry_interval': 5,  # 资源占用采样间隔（秒），0表示不采样
+        'telemetry_history': 120,  # 每个应用保留的资源占用样本数
         'apps': [  # 格式: [{'path': '路径', 'name': '进程名', 'check_interval': 1, 'restart_interval': 60, 'minimize_to_tray': False}]
             # 示例：
             # {
             #     'path': 'D:/Programs/App/app.exe',  # 应用程序路径
             #     'name': 'app.exe',                  # 进程名称
             #     'check_interval': 1,                # 监听间隔（秒）
-            #     'restart_interval': 60,             # 重启间隔（秒）
-            #     'minimize_to_tray': False           # 是否托盘启动
+            #     'restart_interval': 60,             # 最小重启间隔（秒），0表示不重启
+            #     'minimize_to_tray': False,          # 是否托盘启动
+            #     # 以下为可选的重启策略参数
+            #     'max_restarts': 5,                  # 统计窗口内最多重启次数，超过后暂停重启
+            #     'restart_window': 600,              # 熔断统计窗口（秒）
+            #     'backoff_base': 5,                  # 连续崩溃时的初始退避时间（秒），之后按指数增长
+            #     'backoff_max': 900,                 # 退避时间上限（秒）
+            #     'stable_after': 60,                 # 运行超过该时间视为稳定，清零崩溃计数
+            #     # 以下为可选的资源阈值，超过后主动重启
+            #     'max_memory_mb': 1024,              # 内存（RSS）上限（MB）
+            #     'max_cpu_percent': 90,              # CPU 占用上限（%）
+            #     'cpu_sustain_seconds': 60           # CPU 持续超限多长时间后重启（秒）
             # }
         ]
     }
@@ -68,9 +96,34 @@ class Config:
                 if not self._initialized:  # 双重检查锁定
                     logging.info("开始初始化Config类")
                     self._config_lock = threading.Lock()
+                    self._subscribers = {}  # 配置项 -> 变化回调列表
                     self.config_data = load_config()
                     self._initialized = True
     
+    def subscribe(self, section, callback):
+        """订阅配置项变化，配置保存后在修改配置的线程中调用 callback()"""
+        with self._config_lock:
+            callbacks = self._subscribers.setdefault(section, [])
+            if callback not in callbacks:
+                callbacks.append(callback)
+    
+    def unsubscribe(self, section, callback):
+        """取消订阅配置项变化"""
+        with self._config_lock:
+            callbacks = self._subscribers.get(section, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+    
+    def _notify(self, section):
+        """通知订阅者配置项已变化"""
+        with self._config_lock:
+            callbacks = list(self._subscribers.get(section, []))
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"通知配置变化失败 ({section}): {str(e)}")
+    
     def get_tesseract_path(self):
         """获取 Tesseract 路径"""
         return self.config_data.get('tesseract_path', '')
@@ -80,6 +133,23 @@ class Config:
         self.config_data['tesseract_path'] = path
         save_config(self.config_data)
     
+    def get_screenshot_mode(self):
+        """获取截图方式（live 或 freeze）"""
+        return self.config_data.get('screenshot_mode', 'live')
+    
+    def set_screenshot_mode(self, mode):
+        """设置截图方式（live 或 freeze）"""
+        self.config_data['screenshot_mode'] = mode
+        save_config(self.config_data)
+    
+    def get_screenshot_pipeline(self):
+        """获取截图流水线配置"""
+        pipeline = self.config_data.get('screenshot_pipeline', {})
+        return {
+            'max_in_flight': pipeline.get('max_in_flight', 3),
+            'policy': pipeline.get('policy', 'coalesce')
+        }
+    
     def get_ime_conversion_enabled(self):
         """获取输入法转换功能状态"""
         return self.config_data.get('ime_conversion_enabled', False)
@@ -89,6 +159,15 @@ class Config:
         self.config_data['ime_conversion_enabled'] = enabled
         save_config(self.config_data)
     
+    def get_ime_latency_tracking(self):
+        """获取按键延迟统计开关"""
+        return self.config_data.get('ime_latency_tracking', False)
+    
+    def set_ime_latency_tracking(self, enabled):
+        """设置按键延迟统计开关"""
+        self.config_data['ime_latency_tracking'] = enabled
+        save_config(self.config_data)
+    
     def get_source_key(self):
         """获取源按键"""
         return self.config_data.get('key_conversion', {}).get('source_key', '/')
@@ -97,13 +176,54 @@ class Config:
         """获取目标字符"""
         return self.config_data.get('key_conversion', {}).get('target_char', '、')
     
-    def set_key_conversion(self, source_key, target_char):
-        """设置按键转换配置"""
-        self.config_data['key_conversion'] = {
-            'source_key': source_key,
-            'target_char': target_char
+    def get_key_conversion(self):
+        """获取完整的按键转换配置（包括额外映射与应用覆盖）"""
+        key_conversion = self.config_data.get('key_conversion', {})
+        return {
+            'source_key': key_conversion.get('source_key', '/'),
+            'target_char': key_conversion.get('target_char', '、'),
+            'mappings': list(key_conversion.get('mappings', [])),
+            'profiles': dict(key_conversion.get('profiles', {}))
         }
+    
+    def set_key_conversion(self, source_key, target_char):
+        """设置按键转换配置，保留额外映射与应用覆盖"""
+        key_conversion = dict(self.config_data.get('key_conversion', {}))
+        key_conversion['source_key'] = source_key
+        key_conversion['target_char'] = target_char
+        self.config_data['key_conversion'] = key_conversion
+        save_config(self.config_data)
+        self._notify('key_conversion')
+    
+    def get_key_conversion_profiles(self):
+        """获取按应用覆盖的按键转换配置"""
+        return dict(self.config_data.get('key_conversion', {}).get('profiles', {}))
+    
+    def set_key_conversion_profile(self, process_name, enabled=True, mappings=None):
+        """设置指定应用的按键转换配置
+        
+        Args:
+            process_name: 进程名，如 code.exe
+            enabled: 是否在该应用中替换
+            mappings: 该应用额外的按键映射，None 表示沿用全局映射
+        """
+        key_conversion = self.config_data.setdefault('key_conversion', {})
+        profiles = key_conversion.setdefault('profiles', {})
+        profile = {'enabled': bool(enabled)}
+        if mappings:
+            profile['mappings'] = list(mappings)
+        profiles[process_name.lower()] = profile
+        save_config(self.config_data)
+        self._notify('key_conversion')
+    
+    def remove_key_conversion_profile(self, process_name):
+        """移除指定应用的按键转换配置"""
+        profiles = self.config_data.get('key_conversion', {}).get('profiles', {})
+        if profiles.pop(process_name.lower(), None) is None:
+            return False
         save_config(self.config_data)
+        self._notify('key_conversion')
+        return True
     
     def get_log_retention_days(self):
         """获取日志保存天数"""
@@ -124,6 +244,16 @@ class Config:
         with self._config_lock:
             return self.config_data.get('app_monitor', {}).get('enabled', False)
     
+    def get_telemetry_interval(self):
+        """获取资源占用采样间隔（秒）"""
+        with self._config_lock:
+            return self.config_data.get('app_monitor', {}).get('telemetry_interval', 5)
+    
+    def get_telemetry_history(self):
+        """获取每个应用保留的资源占用样本数"""
+        with self._config_lock:
+            return self.config_data.get('app_monitor', {}).get('telemetry_history', 120)
+    
     def set_app_monitor_enabled(self, enabled):
         """设置应用监听功能的启用状态"""
         with self._config_lock:
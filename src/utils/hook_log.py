@@ -0,0 +1,92 @@
+import sys
+import time
+import queue
+import logging
+import threading
+
+# 队列中最多积压的日志条数，超过后丢弃新日志
+HOOK_LOG_CAPACITY = 1024
+
+# 限流：同一类日志在统计窗口内最多输出的条数
+HOOK_LOG_BURST = 5
+HOOK_LOG_WINDOW = 10  # 统计窗口（秒）
+
+
+class HookLogger:
+    """键盘钩子使用的非阻塞日志通道
+
+    钩子中只把日志放入内存队列（不做格式化和 I/O），由后台线程取出后写入 logging。
+    相同 key 的日志按窗口限流，被省略的条数在下一条放行的日志中注明。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+            return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            with self._lock:
+                if not hasattr(self, '_initialized'):
+                    self.logger = logging.getLogger()
+                    self._queue = queue.SimpleQueue()
+                    self._windows = {}  # key -> [窗口开始时间, 本窗口已输出条数, 被省略条数]
+                    self.stats = {'queued': 0, 'dropped': 0, 'suppressed': 0}
+                    self._thread = threading.Thread(target=self._drain_loop, name="hook-log", daemon=True)
+                    self._thread.start()
+                    self._initialized = True
+
+    def debug(self, msg, key=None):
+        self._emit(logging.DEBUG, msg, key, False)
+
+    def info(self, msg, key=None):
+        self._emit(logging.INFO, msg, key, False)
+
+    def warning(self, msg, key=None):
+        self._emit(logging.WARNING, msg, key, False)
+
+    def error(self, msg, key=None, exc_info=False):
+        self._emit(logging.ERROR, msg, key, exc_info)
+
+    def _emit(self, level, msg, key, exc_info):
+        """放入队列，不会阻塞调用方"""
+        if not self.logger.isEnabledFor(level):
+            return
+        if self._queue.qsize() >= HOOK_LOG_CAPACITY:
+            self.stats['dropped'] += 1
+            return
+
+        # 限流：按 key 统计窗口内的条数
+        key = msg if key is None else key
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= HOOK_LOG_WINDOW:
+            if window is None and len(self._windows) >= HOOK_LOG_CAPACITY:
+                self._windows.clear()  # 避免 key 过多时无限增长
+            suppressed = window[2] if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+        elif window[1] < HOOK_LOG_BURST:
+            window[1] += 1
+            suppressed = 0
+        else:
+            window[2] += 1
+            self.stats['suppressed'] += 1
+            return
+
+        self._queue.put((level, msg, sys.exc_info() if exc_info else None, suppressed))
+        self.stats['queued'] += 1
+
+    def _drain_loop(self):
+        """后台线程：取出日志并写入 logging"""
+        while True:
+            level, msg, exc_info, suppressed = self._queue.get()
+            if suppressed:
+                msg = f"{msg}（此前已省略 {suppressed} 条相同日志）"
+            try:
+                self.logger.log(level, msg, exc_info=exc_info)
+            except Exception:
+                pass